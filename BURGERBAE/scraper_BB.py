@@ -1,95 +1,42 @@
 import json
+import os
+import sys
 import uuid
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
-import time
-import random
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from urllib.parse import urljoin
 
-class BurgerBaeScraper:
+# Shared crawling components live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawl_frontier import CrawlFrontier
+from http_cache import HTTPCache
+from html_parsing import BURGERBAE_COLLECTION_PAGE, BURGERBAE_PRODUCT_PAGE, make_soup
+from http_session import build_session, connection_stats
+from image_urls import normalize_images, srcset_image
+from pagination import iter_pages, page_url
+from pipeline import run_pipeline
+from product_stream import finalize_json_array, write_ndjson
+from rate_limiter import HostRateLimiter
+from shopify_json import collection_handle, html_to_text, iter_collection_products, product_fields, product_url as shopify_product_url
+from taxonomy import get_taxonomy
+
+class BurgerBaeProductExtractor:
+    """Pure HTML-to-product extraction, kept free of network and cache state so it can run in worker processes"""
+
+    # Bump whenever extraction changes, so products cached by older code are extracted again
+    EXTRACTOR_VERSION = 2
+
     def __init__(self, base_url: str = "https://www.burgerbaeclothing.com"):
         self.base_url = base_url
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
 
-    def get_page_content(self, url: str) -> BeautifulSoup:
-        """Fetch and parse a webpage"""
-        try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return BeautifulSoup(response.text, 'html.parser')
-        except Exception as e:
-            print(f"Error fetching {url}: {str(e)}")
-            return None
+    def extractor_version(self) -> str:
+        """Version of this extraction code and the taxonomy it uses, stored with cached products"""
+        return f"{self.EXTRACTOR_VERSION}:{get_taxonomy('burgerbae_tags').fingerprint}"
 
     def get_product_tags(self, name: str, description: str, category: str) -> List[str]:
         """Extract relevant tags from product details"""
-        # Define available tags
-        available_tags = [
-            "Hoodie", "Co-ords", "T-Shirts", "Baby Tees", "Cute Tops", 
-            "Tanks", "Tops", "Shades", "Bottoms", "Dresses", 
-            "Accessories", "Sweatshirts", "Camisole", "Crop Tops", "dress", "Hat", "Skirt", "Sweater","Y2K top"
-        ]
-        
-        # Convert to lowercase for case-insensitive matching
-        name_lower = name.lower()
-        desc_lower = description.lower() if description else ""
-        category_lower = category.lower() if category else ""
-        
-        # Initialize tags list
-        tags = []
-        
-        # Check for tags in name
-        for tag in available_tags:
-            if tag.lower() in name_lower:
-                tags.append(tag)
-        
-        # Check for tags in description
-        for tag in available_tags:
-            if tag.lower() in desc_lower and tag not in tags:
-                tags.append(tag)
-        
-        # Check for tags in category
-        for tag in available_tags:
-            if tag.lower() in category_lower and tag not in tags:
-                tags.append(tag)
-        
-        # Add specific tag mappings
-        tag_mappings = {
-            "hoodie": "Hoodies",
-            "hoody": "Hoodies",
-            "co ord": "Co-ords",
-            "co-ord": "Co-ords",
-            "co ords": "Co-ords",
-            "co-ords": "Co-ords",
-            "tshirt": "T-Shirts",
-            "t shirt": "T-Shirts",
-            "t-shirts": "T-Shirts",
-            "baby tee": "Baby Tees",
-            "crop top": "Cute Tops",
-            "cute top": "Cute Tops",
-            "tank top": "Tanks",
-            "tanktop": "Tanks",
-            "top": "Tops",
-            "sunglasses": "Shades",
-            "shade": "Shades",
-            "pant": "Bottoms",
-            "pants": "Bottoms",
-            "jeans": "Bottoms",
-            "dress": "Dresses",
-            "jewelry": "Accessories",
-            "jewellery": "Accessories",
-            "accessory": "Accessories",
-            "sweatshirt": "Sweatshirts",
-            "sweat shirt": "Sweatshirts"
-        }
-        
-        # Check for mapped tags
-        for key, tag in tag_mappings.items():
-            if (key in name_lower or key in desc_lower or key in category_lower) and tag not in tags:
-                tags.append(tag)
+        # Tag terms live in taxonomy.json, matched as whole words in one pass over all three fields
+        tags = get_taxonomy("burgerbae_tags").classify(name, description, category)
         
         # If no tags found, add category as tag
         if not tags and category:
@@ -97,14 +44,39 @@ class BurgerBaeScraper:
         
         return tags
 
-    def extract_product_data(self, product_element) -> Dict[str, Any]:
-        """Extract product data from a product element"""
+    def parse_product_page(self, product_soup: BeautifulSoup) -> Dict[str, Any]:
+        """Extract description and size chart from a product page"""
+        description = None
+        size_chart = None
+
+        # Get description
+        description_element = product_soup.select_one('.collapsible__content.accordion__content.rte')
+        if description_element:
+            description = description_element.get_text(" ", strip=True)
+            print("Found product description")
+        
+        # Get size chart
+        size_chart_element = product_soup.select_one('.product-popup-modal__content-info img')
+        if size_chart_element:
+            size_chart = size_chart_element.get('src', '')
+            if size_chart.startswith('//'):
+                size_chart = 'https:' + size_chart
+            elif size_chart.startswith('/'):
+                size_chart = self.base_url + size_chart
+            print("Found size chart image")
+
+        return {"description": description, "size_chart": size_chart}
+
+    def extract_product_url(self, product_element) -> Optional[str]:
+        """Product page URL linked from a collection product card"""
+        name_element = product_element.select_one('.product-card-title')
+        if not name_element:
+            return None
+        return urljoin(self.base_url, name_element.get('href', ''))
+
+    def parse_product_card(self, product_element, page_details: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the product dict from a collection product card and its product page details"""
         try:
-            print("Starting product data extraction...")
-            
-            # Hardcoded vendor ID for BurgerBae
-            VENDOR_ID = "b255da59-029c-4fe4-b502-015487736e87"
-            
             # Extract product name and URL
             name_element = product_element.select_one('.product-card-title')
             if not name_element:
@@ -115,26 +87,8 @@ class BurgerBaeScraper:
             product_url = urljoin(self.base_url, name_element.get('href', ''))
             print(f"Found product: {name} at {product_url}")
             
-            # Visit the product page to get description and size chart
-            product_soup = self.get_page_content(product_url)
-            description = None
-            size_chart = None
-            if product_soup:
-                # Get description
-                description_element = product_soup.select_one('.collapsible__content.accordion__content.rte')
-                if description_element:
-                    description = description_element.get_text(strip=True)
-                    print("Found product description")
-                
-                # Get size chart
-                size_chart_element = product_soup.select_one('.product-popup-modal__content-info img')
-                if size_chart_element:
-                    size_chart = size_chart_element.get('src', '')
-                    if size_chart.startswith('//'):
-                        size_chart = 'https:' + size_chart
-                    elif size_chart.startswith('/'):
-                        size_chart = self.base_url + size_chart
-                    print("Found size chart image")
+            description = page_details["description"]
+            size_chart = page_details["size_chart"]
             
             # Extract prices
             current_price = None
@@ -153,57 +107,13 @@ class BurgerBaeScraper:
                     original_price = float(original_price_text.text.strip().replace('Rs.', '').replace(',', '').strip())
                     print(f"Original price: {original_price}")
             
-            # Extract image URLs
-            images = []
-            # Get primary image
-            primary_img = product_element.select_one('.product-primary-image')
-            if primary_img:
-                srcset = primary_img.get('data-srcset', '')
-                if srcset:
-                    # Get the largest size
-                    largest_size = None
-                    largest_width = 0
-                    for size_info in srcset.split(','):
-                        size_info = size_info.strip()
-                        if ' ' in size_info:
-                            url, size = size_info.rsplit(' ', 1)
-                            width = int(size.replace('w', ''))
-                            if width > largest_width:
-                                largest_width = width
-                                largest_size = url
-                    
-                    if largest_size:
-                        if largest_size.startswith('//'):
-                            largest_size = 'https:' + largest_size
-                        elif largest_size.startswith('/'):
-                            largest_size = 'https://www.burgerbaeclothing.com' + largest_size
-                        images.append(largest_size)
-                        print(f"Added primary image: {largest_size}")
-
-            # Get secondary images
-            secondary_imgs = product_element.select('.product-secondary-image')
-            for img in secondary_imgs:
-                srcset = img.get('data-srcset', '')
-                if srcset:
-                    # Get the largest size
-                    largest_size = None
-                    largest_width = 0
-                    for size_info in srcset.split(','):
-                        size_info = size_info.strip()
-                        if ' ' in size_info:
-                            url, size = size_info.rsplit(' ', 1)
-                            width = int(size.replace('w', ''))
-                            if width > largest_width:
-                                largest_width = width
-                                largest_size = url
-                    
-                    if largest_size:
-                        if largest_size.startswith('//'):
-                            largest_size = 'https:' + largest_size
-                        elif largest_size.startswith('/'):
-                            largest_size = 'https://www.burgerbaeclothing.com' + largest_size
-                        images.append(largest_size)
-                        print(f"Added secondary image: {largest_size}")
+            # Extract image URLs: the largest size of the primary and secondary images
+            images = normalize_images(
+                [srcset_image(product_element.select_one('.product-primary-image'), self.base_url)]
+                + [srcset_image(img, self.base_url) for img in product_element.select('.product-secondary-image')],
+                self.base_url,
+            )
+            print(f"Added {len(images)} images")
             
             # Extract rating
             rating = None
@@ -238,60 +148,236 @@ class BurgerBaeScraper:
             tags = self.get_product_tags(name, description, category)
             print(f"Extracted tags: {tags}")
 
-            # Create meta data
-            meta = {
-                "rating": rating,
-                "available_sizes": sizes,
-                "colors": colors,
-                "tags": tags,
-                "on_sale": bool(original_price and current_price and original_price > current_price),
-                "size_chart": size_chart,
-                "productUrl": product_url
-            }
+            product = self.build_product(
+                name=name,
+                product_url=product_url,
+                description=description,
+                current_price=current_price,
+                original_price=original_price,
+                images=images,
+                rating=rating,
+                sizes=sizes,
+                colors=colors,
+                tags=tags,
+                size_chart=size_chart,
+            )
+            print("Successfully created product object")
+            return product
+        except Exception as e:
+            print(f"Error extracting product data: {str(e)}")
+            return None
 
-            # Create price object
-            price = {
-                "default": current_price,
-                "original": original_price,
-                "meta": {
-                    "CURRENCY_CODE": "INR",
-                    "CURRENCY_LOGO": "Rs."
-                }
+    def build_product(self, name: str, product_url: str, description: Optional[str],
+                      current_price: Optional[float], original_price: Optional[float], images: List[str],
+                      rating: Optional[float], sizes: List[str], colors: List[str], tags: List[str],
+                      size_chart: Optional[str], extra_meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Assemble the product dict in the format the products API expects"""
+        # Hardcoded vendor ID for BurgerBae
+        VENDOR_ID = "b255da59-029c-4fe4-b502-015487736e87"
+
+        # Create meta data
+        meta = {
+            "rating": rating,
+            "available_sizes": sizes,
+            "colors": colors,
+            "tags": tags,
+            "on_sale": bool(original_price and current_price and original_price > current_price),
+            "size_chart": size_chart,
+            "productUrl": product_url
+        }
+        if extra_meta:
+            meta.update(extra_meta)
+
+        # Create price object
+        price = {
+            "default": current_price,
+            "original": original_price,
+            "meta": {
+                "CURRENCY_CODE": "INR",
+                "CURRENCY_LOGO": "Rs."
             }
+        }
+        
+        return {
+            "label": name,
+            "description": description,
+            "images": images,
+            "price": price,
+            "meta": meta,
+            "vendor_id": VENDOR_ID
+        }
+
+
+class BurgerBaeScraper(BurgerBaeProductExtractor):
+    def __init__(self, base_url: str = "https://www.burgerbaeclothing.com",
+                 requests_per_second: float = 1.0, burst: int = 4, pool_size: int = 10,
+                 cache_path: Optional[str] = "burgerbae_http_cache.sqlite3",
+                 frontier_path: Optional[str] = "burgerbae_frontier.sqlite3"):
+        super().__init__(base_url)
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        # Long-lived keep-alive session reused for every page
+        self.session = build_session(pool_size=pool_size, headers=self.headers)
+        # Paces every request per host and adapts to 429 / Retry-After responses
+        self.rate_limiter = HostRateLimiter(requests_per_second=requests_per_second, burst=burst)
+        # Conditional-GET cache of product pages and the details extracted from them
+        self.http_cache = HTTPCache(cache_path, extractor_version=self.extractor_version()) if cache_path else None
+        # Pages and products of the current crawl, so an interrupted run can resume
+        self.frontier = CrawlFrontier(frontier_path) if frontier_path else None
+
+    def get_page_content(self, url: str, max_retries: int = 3, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Fetch and parse a webpage"""
+        response = self.get_response(url, max_retries)
+        if response is None:
+            return None
+        return make_soup(response.text, parse_only)
+
+    def get_response(self, url: str, max_retries: int = 3, headers: Optional[Dict[str, str]] = None):
+        """Fetch a webpage, retrying when rate limited"""
+        for attempt in range(max_retries):
+            try:
+                self.rate_limiter.acquire(url)
+                response = self.session.get(url, headers=headers)
+                self.rate_limiter.record_response(url, response.status_code, response.headers.get('Retry-After'))
+                if response.status_code == 429:
+                    # The limiter has already slowed down, just try again
+                    print(f"Rate limited on attempt {attempt + 1}/{max_retries}. URL: {url}")
+                    continue
+                response.raise_for_status()
+                return response
+            except Exception as e:
+                print(f"Error fetching {url}: {str(e)}")
+                return None
+
+        print(f"Max retries reached for {url}")
+        return None
+
+    def get_product_page_details(self, product_url: str) -> Dict[str, Any]:
+        """Get description and size chart from the product page, reusing cached details when unchanged"""
+        html, details = self.fetch_product_page(product_url)
+        if details is not None:
+            return details
+        if html is None:
+            return {"description": None, "size_chart": None}
+
+        details = self.parse_product_page(make_soup(html, BURGERBAE_PRODUCT_PAGE))
+        if self.http_cache:
+            self.http_cache.save_extracted(product_url, details)
+        return details
+
+    def fetch_product_page(self, product_url: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Fetch a product page through the HTTP cache: (html to parse, None) or (None, cached details)"""
+        entry = self.http_cache.lookup(product_url) if self.http_cache else None
+        if entry and entry["extracted"] is None:
+            entry = None
+        if entry and self.http_cache.is_fresh(entry):
+            return None, entry["extracted"]
+
+        response = self.get_response(product_url, headers=HTTPCache.conditional_headers(entry))
+        if response is None:
+            return None, None
+        if not self.http_cache:
+            return response.text, None
+        body, details = self.http_cache.resolve(product_url, entry, response)
+        if details is not None:
+            print("Product page unchanged, reusing cached details")
+            return None, details
+        return body, None
+
+    def extract_product_data(self, product_element) -> Dict[str, Any]:
+        """Extract product data from a product element"""
+        try:
+            print("Starting product data extraction...")
             
-            product = {
-                "label": name,
-                "description": description,
-                "images": images,
-                "price": price,
-                "meta": meta,
-                "vendor_id": VENDOR_ID
-            }
-            print("Successfully created product object")
-            return product
+            product_url = self.extract_product_url(product_element)
+            if not product_url:
+                print("No name element found")
+                return None
+
+            # Visit the product page to get description and size chart
+            page_details = self.get_product_page_details(product_url)
+            return self.parse_product_card(product_element, page_details)
         except Exception as e:
             print(f"Error extracting product data: {str(e)}")
             return None
 
-    def scrape_products(self, urls: List[str]) -> List[Dict[str, Any]]:
-        """Scrape products from multiple URLs with pagination support"""
-        all_products = []
+    def iter_products_json(self, urls: List[str], fetch_details: bool = True) -> Iterator[Dict[str, Any]]:
+        """Yield products from the collections' Shopify JSON endpoints.
+
+        Prices, images, sizes, colors and tags come from products.json; the
+        product page is only fetched (when fetch_details) for the size chart.
+        """
         total_products = 0
-        total_pages = 32  # Total number of pages
-        
+
+        for url in urls:
+            print(f"\nScraping {url} (JSON)...")
+            handle = collection_handle(url)
+            for shopify_product in iter_collection_products(self.get_response, self.base_url, handle):
+                product_data = self.product_from_json(handle, shopify_product, fetch_details)
+                if product_data:
+                    total_products += 1
+                    print(f"Successfully extracted product: {product_data.get('label')}")
+                    yield product_data
+
+        print(f"\nScraping completed! Total products scraped: {total_products}")
+        print(f"Connection stats: {connection_stats(self.session)}")
+
+    def scrape_products_json(self, urls: List[str], fetch_details: bool = True) -> List[Dict[str, Any]]:
+        """Scrape products from the collections' Shopify JSON endpoints"""
+        return list(self.iter_products_json(urls, fetch_details))
+
+    def product_from_json(self, handle: str, shopify_product: Dict[str, Any],
+                          fetch_details: bool = True) -> Optional[Dict[str, Any]]:
+        """Build the product dict from a products.json entry"""
+        try:
+            fields = product_fields(shopify_product)
+            name = fields["label"]
+            product_url = shopify_product_url(self.base_url, handle, fields["handle"])
+
+            description = html_to_text(fields["body_html"], " ") or None
+            size_chart = None
+            if fetch_details:
+                page_details = self.get_product_page_details(product_url)
+                description = page_details["description"] or description
+                size_chart = page_details["size_chart"]
+
+            return self.build_product(
+                name=name,
+                product_url=product_url,
+                description=description,
+                current_price=fields["price"],
+                original_price=fields["original_price"],
+                images=fields["images"],
+                rating=None,
+                sizes=fields["sizes"],
+                colors=fields["colors"],
+                tags=self.get_product_tags(name, description, handle),
+                size_chart=size_chart,
+                extra_meta={"vendor_tags": fields["tags"]},
+            )
+        except Exception as e:
+            print(f"Error extracting product data from JSON: {str(e)}")
+            return None
+
+    def iter_collection_pages(self, urls: List[str], page_workers: int = 4) -> Iterator[Tuple[int, str, list]]:
+        """Yield (page number, page URL, product elements) for each collection listing page not yet crawled.
+
+        The page count comes from each collection's pagination links, and
+        the pages it reveals are fetched page_workers at a time.
+        """
+        skip = self.frontier.is_done if self.frontier else None
         for url in urls:
             print(f"\nScraping {url}...")
-            page = 1
-            
-            while page <= total_pages:
-                # Add page parameter to URL
-                page_url = f"{url}?page={page}"
-                print(f"\nScraping page {page}/{total_pages}...")
-                
-                soup = self.get_page_content(page_url)
+
+            def fetch(listing_url: str):
+                soup = self.get_page_content(listing_url, parse_only=BURGERBAE_COLLECTION_PAGE)
                 if not soup:
-                    print(f"Failed to get content from {page_url}")
-                    break
+                    print(f"Failed to get content from {listing_url}")
+                return soup
+
+            for page, listing_url, soup in iter_pages(fetch, page_url(url, 1), workers=page_workers, skip=skip):
+                print(f"\nScraping page {page}...")
                 
                 # Find all product elements
                 product_elements = soup.select('.product-card')
@@ -305,40 +391,109 @@ class BurgerBaeScraper:
                 if not product_elements:
                     print("No products found on this page. Stopping pagination.")
                     break
-                
-                page_products = []
-                for element in product_elements:
-                    product_data = self.extract_product_data(element)
-                    if product_data:
-                        page_products.append(product_data)
-                        print(f"Successfully extracted product: {product_data.get('label')}")
-                    else:
-                        print("Failed to extract product data from element")
-                
-                all_products.extend(page_products)
-                total_products += len(page_products)
-                print(f"\nProgress: Page {page}/{total_pages} - Total products so far: {total_products}/512")
-                
-                # Save progress after each page
-                self.save_to_json(all_products, "burgerbae_products.json")
-                
-                # Move to next page
-                page += 1
-                
-                # Add delay between pages
-                if page <= total_pages:
-                    delay = random.uniform(2, 4)
-                    print(f"Waiting {delay:.1f} seconds before next page...")
-                    time.sleep(delay)
-            
-            # Add delay between different URLs
-            if url != urls[-1]:  # Don't wait after the last URL
-                delay = random.uniform(3, 5)
-                print(f"\nWaiting {delay:.1f} seconds before next URL...")
-                time.sleep(delay)
+
+                yield page, listing_url, product_elements
+
+    def iter_products(self, urls: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yield products from multiple URLs with pagination support, as they are extracted"""
+        total_products = 0
+        
+        for card_html, product_url in self.iter_product_cards(urls):
+            element = make_soup(card_html, BURGERBAE_COLLECTION_PAGE).find()
+            product_data = self.extract_product_data(element)
+            self._record_result(product_url, product_data)
+            if product_data:
+                total_products += 1
+                print(f"Successfully extracted product: {product_data.get('label')}")
+                yield product_data
+            else:
+                print("Failed to extract product data from element")
             
-        print(f"\nScraping completed! Total products scraped: {total_products}/512")
-        return all_products
+        print(f"\nScraping completed! Total products scraped: {total_products}")
+        print(f"Connection stats: {connection_stats(self.session)}")
+        self._finish_crawl()
+
+    def scrape_products(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """Scrape products from multiple URLs with pagination support"""
+        return list(self.iter_products(urls))
+
+    def iter_product_cards(self, urls: List[str]) -> Iterator[Tuple[str, str]]:
+        """Yield (card html, product URL) for every product card across the collection pages.
+
+        With a frontier, cards left over from an interrupted run come first,
+        finished pages aren't fetched again and finished products are skipped.
+        """
+        if self.frontier:
+            for product_url, card_html in self.frontier.pending():
+                yield card_html, product_url
+
+        for _, listing_url, product_elements in self.iter_collection_pages(urls):
+            cards = []
+            for element in product_elements:
+                product_url = self.extract_product_url(element)
+                if product_url:
+                    cards.append((str(element), product_url))
+            if self.frontier:
+                self.frontier.queue_page(listing_url, [(product_url, card_html) for card_html, product_url in cards])
+                cards = [(card_html, product_url) for product_url, card_html in self.frontier.pending(parent=listing_url)]
+            yield from cards
+
+    def _record_result(self, product_url: str, product_data: Optional[Dict[str, Any]]):
+        """Mark product_url done or failed in the frontier"""
+        if not self.frontier:
+            return
+        if product_data:
+            self.frontier.mark_done(product_url)
+        else:
+            self.frontier.mark_failed(product_url, "no product extracted")
+
+    def _finish_crawl(self):
+        """Clear the frontier once nothing is left to retry, so the next run starts a fresh crawl"""
+        if not self.frontier:
+            return
+        retry = self.frontier.pending()
+        if retry:
+            print(f"{len(retry)} products failed and will be retried on the next run")
+            return
+        for product_url, attempts, error in self.frontier.failures():
+            print(f"Gave up on {product_url} after {attempts} attempts: {error}")
+        print(f"Crawl frontier: {self.frontier.counts()}")
+        self.frontier.reset()
+
+    def _fetch_for_pipeline(self, card: Tuple[str, str]):
+        """Fetch stage: the arguments for extract_product"""
+        card_html, product_url = card
+        page_html, page_details = self.fetch_product_page(product_url)
+        return card_html, page_html, page_details, self.base_url
+
+    def iter_products_parallel(self, urls: List[str], fetch_workers: int = 8,
+                               parse_workers: Optional[int] = None, queue_size: int = 64) -> Iterator[Dict[str, Any]]:
+        """Yield products with fetching on threads and HTML extraction on a process pool"""
+        total_products = 0
+
+        for (_, product_url), (product_data, parsed_details) in run_pipeline(
+            self.iter_product_cards(urls),
+            fetch=self._fetch_for_pipeline,
+            extract=extract_product,
+            fetch_workers=fetch_workers,
+            parse_workers=parse_workers,
+            queue_size=queue_size,
+        ):
+            if parsed_details and self.http_cache:
+                self.http_cache.save_extracted(product_url, parsed_details)
+            self._record_result(product_url, product_data)
+            if product_data:
+                total_products += 1
+                yield product_data
+
+        print(f"\nScraping completed! Total products scraped: {total_products}")
+        print(f"Connection stats: {connection_stats(self.session)}")
+        self._finish_crawl()
+
+    def scrape_products_parallel(self, urls: List[str], fetch_workers: int = 8,
+                                 parse_workers: Optional[int] = None, queue_size: int = 64) -> List[Dict[str, Any]]:
+        """Scrape products with fetching on threads and HTML extraction on a process pool"""
+        return list(self.iter_products_parallel(urls, fetch_workers, parse_workers, queue_size))
 
     def save_to_json(self, products: List[Dict[str, Any]], filename: str = "burgerbae_products.json"):
         """Save scraped products to a JSON file"""
@@ -349,6 +504,23 @@ class BurgerBaeScraper:
         except Exception as e:
             print(f"Error saving to JSON: {str(e)}")
 
+def extract_product(card_html: str, page_html: Optional[str], page_details: Optional[Dict[str, Any]],
+                    base_url: str = "https://www.burgerbaeclothing.com") -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Card and product page HTML in, (product dict, details parsed from page_html) out.
+
+    Picklable entry point for the parse worker processes. page_details is
+    used instead of page_html when the page was unchanged and its details
+    came from the cache.
+    """
+    extractor = BurgerBaeProductExtractor(base_url)
+    parsed_details = None
+    if page_html is not None:
+        parsed_details = extractor.parse_product_page(make_soup(page_html, BURGERBAE_PRODUCT_PAGE))
+        page_details = parsed_details
+    card = make_soup(card_html, BURGERBAE_COLLECTION_PAGE).find()
+    product = extractor.parse_product_card(card, page_details or {"description": None, "size_chart": None})
+    return product, parsed_details
+
 def main():
     # Example usage
     urls = [
@@ -356,9 +528,21 @@ def main():
         # Add more collection URLs as needed
     ]
     
+    # "json" reads prices, images and sizes from the Shopify JSON endpoints instead of listing HTML
+    extraction_engine = "html"
+
     scraper = BurgerBaeScraper()
-    products = scraper.scrape_products(urls)
-    scraper.save_to_json(products)
+    # An interrupted HTML crawl picks up where it stopped and appends to its earlier output
+    resuming = False
+    if extraction_engine == "json":
+        products = scraper.iter_products_json(urls)
+    else:
+        resuming = not scraper.frontier.is_empty()
+        products = scraper.iter_products_parallel(urls)
+    # Products are appended as they arrive; the pretty JSON array is rebuilt from that file at the end
+    write_ndjson(products, "burgerbae_products.ndjson", append=resuming)
+    count = finalize_json_array("burgerbae_products.ndjson", "burgerbae_products.json")
+    print(f"Successfully saved {count} products to burgerbae_products.json")
 
 if __name__ == "__main__":
     main()
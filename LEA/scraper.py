@@ -1,72 +1,55 @@
+import asyncio
 import json
+import os
+import sys
 import uuid
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import time
-import random
-from urllib.parse import urljoin
+from functools import partial
+from urllib.parse import urljoin, urlparse
 import logging
 import re
 
-class LeaClothingScraper:
+# Shared crawling components live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawl_frontier import CrawlFrontier
+from http_cache import HTTPCache
+from html_parsing import LEA_COLLECTION_PAGE, LEA_PRODUCT_PAGE, make_soup
+from http_session import build_session, connection_stats
+from image_urls import canonical_image_url, normalize_images, srcset_image
+from pagination import iter_pages
+from pipeline import run_pipeline
+from product_stream import finalize_json_array, write_ndjson
+from rate_limiter import HostRateLimiter
+from shopify_json import collection_handle, html_to_text, iter_collection_products, product_fields, product_url as shopify_product_url
+from taxonomy import get_taxonomy
+
+class LeaProductExtractor:
+    """Pure HTML-to-product extraction, kept free of network and cache state so it can run in worker processes"""
+
+    # Bump whenever extraction changes, so products cached by older code are extracted again
+    EXTRACTOR_VERSION = 2
+
     def __init__(self, base_url: str = "https://www.leaclothingco.com"):
         self.base_url = base_url
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        # Configure logging
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
-    def get_page_content(self, url: str, max_retries: int = 3) -> BeautifulSoup:
-        """Fetch and parse a webpage with retry logic and rate limiting"""
-        for attempt in range(max_retries):
-            try:
-                # Add delay between requests (increasing with each retry)
-                if attempt > 0:
-                    delay = min(30, 5 * (2 ** attempt))  # Exponential backoff, max 30 seconds
-                    self.logger.info(f"Waiting {delay} seconds before retry...")
-                    time.sleep(delay)
-                
-                response = requests.get(url, headers=self.headers)
-                response.raise_for_status()
-                
-                # Add a random delay between 3-7 seconds after successful requests
-                time.sleep(random.uniform(3, 7))
-                
-                return BeautifulSoup(response.text, 'html.parser')
-                
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:
-                    self.logger.warning(f"Rate limited on attempt {attempt + 1}/{max_retries}. URL: {url}")
-                    if attempt == max_retries - 1:
-                        self.logger.error(f"Max retries reached for {url}")
-                        return None
-                else:
-                    self.logger.error(f"HTTP error fetching {url}: {str(e)}")
-                    return None
-            except Exception as e:
-                self.logger.error(f"Error fetching {url}: {str(e)}")
-                return None
-        
-        return None
-
-    def extract_product_data(self, product_element) -> Dict[str, Any]:
-        """Extract product data from a product element"""
-        try:
-            # Extract product name and URL
-            name_element = product_element.select_one('.ProductItem__Title a')
-            name = name_element.text.strip() if name_element else None
-            product_url = urljoin(self.base_url, name_element['href']) if name_element else None
-            VENDOR_ID = "7c9e130b-8920-4914-853e-64ee867bb3b4"
+    def extractor_version(self) -> str:
+        """Version of this extraction code and the taxonomy it uses, stored with cached products"""
+        return f"{self.EXTRACTOR_VERSION}:{get_taxonomy('lea_colors').fingerprint}"
 
+    def extract_listing_data(self, product_element) -> Tuple[Optional[str], Optional[str]]:
+        """Extract the product name and product page URL from a collection listing element"""
+        name_element = product_element.select_one('.ProductItem__Title a')
+        name = name_element.text.strip() if name_element else None
+        product_url = urljoin(self.base_url, name_element['href']) if name_element else None
+        return name, product_url
 
-            # Visit the individual product page
-            product_soup = self.get_page_content(product_url)
-            if not product_soup:
-                return None
-
+    def parse_product_page(self, name: str, product_url: str, product_soup: BeautifulSoup) -> Dict[str, Any]:
+        """Build the product dict from an already fetched product page"""
+        try:
             # Extract prices
             current_price = None
             original_price = None
@@ -132,23 +115,13 @@ class LeaClothingScraper:
                 # Get image element
                 img = slide.select_one('.Image--fadeIn.lazyautosizes.Image--lazyLoaded, .Image--lazyLoad.Image--fadeIn')
                 if img:
-                    # Get the original image URL
+                    # The original image URL, else data-src with {width} set to the largest width offered
                     original_src = img.get('data-original-src')
-                    if not original_src:
-                        # Try to get from data-src
-                        data_src = img.get('data-src')
-                        if data_src:
-                            # Replace {width} with max width
-                            max_width = img.get('data-max-width', '800')
-                            original_src = data_src.replace('{width}x', f'{max_width}x')
-                    
                     if original_src:
-                        # Convert relative URL to absolute
-                        if original_src.startswith('//'):
-                            original_src = 'https:' + original_src
-                        elif original_src.startswith('/'):
-                            original_src = 'https://www.leaclothingco.com' + original_src
-                        images.append(original_src)
+                        images.append(canonical_image_url(original_src, self.base_url))
+                    elif img.get('data-src'):
+                        max_width = img.get('data-max-width', '800')
+                        images.append(canonical_image_url(img['data-src'], self.base_url, int(max_width) if max_width.isdigit() else None))
             
             # If no slides found, try to get images from the product listing
             if not images:
@@ -157,245 +130,622 @@ class LeaClothingScraper:
                     # Get main and alternate images
                     image_wrapper = product_item.select_one('.ProductItem__ImageWrapper')
                     if image_wrapper:
-                        # Get main image
-                        main_image = image_wrapper.select_one('.ProductItem__Image:not(.ProductItem__Image--alternate)')
-                        if main_image:
-                            # Get all available sizes from srcset
-                            srcset = main_image.get('data-srcset', '')
-                            if srcset:
-                                # Get the largest size
-                                largest_size = None
-                                largest_width = 0
-                                for size_info in srcset.split(','):
-                                    size_info = size_info.strip()
-                                    if ' ' in size_info:
-                                        url, size = size_info.rsplit(' ', 1)
-                                        width = int(size.replace('w', ''))
-                                        if width > largest_width:
-                                            largest_width = width
-                                            largest_size = url
-                                
-                                if largest_size:
-                                    if largest_size.startswith('//'):
-                                        largest_size = 'https:' + largest_size
-                                    elif largest_size.startswith('/'):
-                                        largest_size = 'https://www.leaclothingco.com' + largest_size
-                                    images.append(largest_size)
-                        
-                        # Get alternate image
-                        alt_image = image_wrapper.select_one('.ProductItem__Image--alternate')
-                        if alt_image:
-                            # Get all available sizes from srcset
-                            srcset = alt_image.get('data-srcset', '')
-                            if srcset:
-                                # Get the largest size
-                                largest_size = None
-                                largest_width = 0
-                                for size_info in srcset.split(','):
-                                    size_info = size_info.strip()
-                                    if ' ' in size_info:
-                                        url, size = size_info.rsplit(' ', 1)
-                                        width = int(size.replace('w', ''))
-                                        if width > largest_width:
-                                            largest_width = width
-                                            largest_size = url
-                                
-                                if largest_size:
-                                    if largest_size.startswith('//'):
-                                        largest_size = 'https:' + largest_size
-                                    elif largest_size.startswith('/'):
-                                        largest_size = 'https://www.leaclothingco.com' + largest_size
-                                    images.append(largest_size)
-            
-            # Extract rating and reviews from product page
-            rating = None
-            review_count = None
-            rating_element = product_soup.select_one('.jdgm-prev-badge')
-            if rating_element:
-                rating = float(rating_element.get('data-average-rating'))
-                review_count = int(rating_element.get('data-number-of-reviews'))
+                        images = [
+                            srcset_image(image_wrapper.select_one('.ProductItem__Image:not(.ProductItem__Image--alternate)'), self.base_url),
+                            srcset_image(image_wrapper.select_one('.ProductItem__Image--alternate'), self.base_url),
+                        ]
+            images = normalize_images(images, self.base_url)
             
             # Extract category from URL
             category = None
             if product_url:
                 category = product_url.split('/products/')[0].split('/')[-1] if '/products/' in product_url else None
 
-            # Extract description from product page
-            description = ""
-            desc_section = product_soup.select_one('#description')
-            if desc_section:
-                # Extract main description
-                main_desc = desc_section.select_one('p')
-                if main_desc:
-                    description += main_desc.get_text(strip=True) + "\n\n"
-                
-                # Extract features
-                features = desc_section.select('ul li')
-                if features:
-                    description += "Features:\n"
-                    for feature in features:
-                        description += f"- {feature.get_text(strip=True)}\n"
-                
-                # Extract usage suggestions
-                usage = desc_section.select('p:not(:first-child)')
-                if usage:
-                    description += "\nUsage Suggestions:\n"
-                    for p in usage:
-                        text = p.get_text(strip=True)
-                        if text:
-                            description += f"{text}\n"
-
-            # Extract product details from product page
-            product_details = {}
-            details_section = product_soup.select_one('#pro-details')
-            if details_section:
-                details_items = details_section.select('li')
-                for item in details_items:
-                    text = item.text.strip()
-                    if ':' in text:
-                        key, value = text.split(':', 1)
-                        product_details[key.strip()] = value.strip()
-                    else:
-                        product_details[text] = True
-
-            # Extract vendor details from product page
-            vendor_details = {}
-            vendor_section = product_soup.select_one('#vendor-details')
-            if vendor_section:
-                vendor_items = vendor_section.select('li')
-                for item in vendor_items:
-                    text = item.text.strip()
-                    if ':' in text:
-                        key, value = text.split(':', 1)
-                        vendor_details[key.strip()] = value.strip()
-                    else:
-                        vendor_details[text] = True
-
-            # Extract available sizes from product page
-            available_sizes = []
-            size_elements = product_soup.select('.SizeSwatchList .SizeSwatch')
-            for size in size_elements:
-                available_sizes.append(size.text.strip())
-
-            # Extract color options from product page
-            colors = []
-            color_elements = product_soup.select('.ColorSwatchList .ColorSwatch')
-            for color in color_elements:
-                color_text = color.text.strip()
-                if color_text:
-                    colors.append(color_text)
+            details = self.extract_page_details(name, product_soup)
+
+            return self.build_product(
+                name=name,
+                product_url=product_url,
+                category=category,
+                current_price=current_price,
+                original_price=original_price,
+                images=images,
+                details=details,
+                available_sizes=list(details["size_chart"]["inches"].keys()),
+                tags=[category] if category else [],
+            )
+        except Exception as e:
+            print(f"Error extracting product data: {str(e)}")
+            return None
+
+    def extract_page_details(self, name: Optional[str], product_soup: BeautifulSoup) -> Dict[str, Any]:
+        """Extract the fields only the product page HTML has: rating, description, details, size chart and colors"""
+        # Extract rating and reviews from product page
+        rating = None
+        review_count = None
+        rating_element = product_soup.select_one('.jdgm-prev-badge')
+        if rating_element:
+            rating = float(rating_element.get('data-average-rating'))
+            review_count = int(rating_element.get('data-number-of-reviews'))
+        
+        # Extract description from product page
+        description = ""
+        desc_section = product_soup.select_one('#description')
+        if desc_section:
+            # Extract main description
+            main_desc = desc_section.select_one('p')
+            if main_desc:
+                description += main_desc.get_text(" ", strip=True) + "\n\n"
             
-            # Extract size chart from product page
-            size_chart = {
-                "inches": {},
-                "cm": {}
-            }
-            size_chart_element = product_soup.select_one('.ks-table-wrapper')
-            if size_chart_element:
-                # Extract headers
-                headers = [th.text.strip() for th in size_chart_element.select('.ks-table-header-cell')]
-                
-                # Extract inches measurements
-                inch_table = size_chart_element.select_one('.inch-table')
-                if inch_table:
-                    for row in inch_table.select('tr')[1:]:  # Skip header row
-                        cells = row.select('td')
-                        if cells:
-                            size = cells[0].text.strip()
-                            measurements = {}
-                            for i in range(1, len(cells)):
-                                measurements[headers[i]] = cells[i].text.strip()
-                            size_chart["inches"][size] = measurements
-                
-                # Extract cm measurements
-                cm_table = size_chart_element.select_one('.cm-table')
-                if cm_table:
-                    for row in cm_table.select('tr')[1:]:  # Skip header row
-                        cells = row.select('td')
-                        if cells:
-                            size = cells[0].text.strip()
-                            measurements = {}
-                            for i in range(1, len(cells)):
-                                measurements[headers[i]] = cells[i].text.strip()
-                            size_chart["cm"][size] = measurements
-
-            # Extract colors from product name and description
-            colors = set()
-            if name:
-                # Look for color in product name
-                color_keywords = ['Black', 'White', 'Red', 'Blue', 'Green', 'Yellow', 'Pink', 'Purple', 'Orange', 'Brown', 'Grey', 'Beige']
-                for color in color_keywords:
-                    if color.lower() in name.lower():
-                        colors.add(color)
+            # Extract features
+            features = desc_section.select('ul li')
+            if features:
+                description += "Features:\n"
+                for feature in features:
+                    description += f"- {feature.get_text(' ', strip=True)}\n"
             
-            # Extract from description
-            desc_section = product_soup.select_one('#description')
-            if desc_section:
-                desc_text = desc_section.get_text()
-                for color in color_keywords:
-                    if color.lower() in desc_text.lower():
-                        colors.add(color)
-
-            # Create meta data
-            meta = {
-                "category": category,
-                "rating": rating,
-                "review_count": review_count,
-                "available_sizes": list(size_chart["inches"].keys()),
-                "colors": list(colors),
-                "product_details": product_details,
-                "vendor_details": vendor_details,
-                "size_chart": size_chart,
-                "tags": [category] if category else [],
-                "productUrl": product_url,
-            }
+            # Extract usage suggestions
+            usage = desc_section.select('p:not(:first-child)')
+            if usage:
+                description += "\nUsage Suggestions:\n"
+                for p in usage:
+                    text = p.get_text(" ", strip=True)
+                    if text:
+                        description += f"{text}\n"
 
-            # Create price object
-            price = {
-                "default": current_price,
-                "original": original_price,
-                "meta": {
-                    "CURRENCY_CODE": "INR",
-                    "CURRENCY_LOGO": "Rs."
-                }
-            }
+        # Extract product details from product page
+        product_details = {}
+        details_section = product_soup.select_one('#pro-details')
+        if details_section:
+            details_items = details_section.select('li')
+            for item in details_items:
+                text = item.text.strip()
+                if ':' in text:
+                    key, value = text.split(':', 1)
+                    product_details[key.strip()] = value.strip()
+                else:
+                    product_details[text] = True
+
+        # Extract vendor details from product page
+        vendor_details = {}
+        vendor_section = product_soup.select_one('#vendor-details')
+        if vendor_section:
+            vendor_items = vendor_section.select('li')
+            for item in vendor_items:
+                text = item.text.strip()
+                if ':' in text:
+                    key, value = text.split(':', 1)
+                    vendor_details[key.strip()] = value.strip()
+                else:
+                    vendor_details[text] = True
+
+        # Extract available sizes from product page
+        available_sizes = []
+        size_elements = product_soup.select('.SizeSwatchList .SizeSwatch')
+        for size in size_elements:
+            available_sizes.append(size.text.strip())
+
+        # Extract color options from product page
+        colors = []
+        color_elements = product_soup.select('.ColorSwatchList .ColorSwatch')
+        for color in color_elements:
+            color_text = color.text.strip()
+            if color_text:
+                colors.append(color_text)
+        
+        # Extract size chart from product page
+        size_chart = {
+            "inches": {},
+            "cm": {}
+        }
+        size_chart_element = product_soup.select_one('.ks-table-wrapper')
+        if size_chart_element:
+            # Extract headers
+            headers = [th.text.strip() for th in size_chart_element.select('.ks-table-header-cell')]
             
-            product = {
-                "label": name,
-                "description": description,
-                "images": images,
-                "price": price,
-                "meta": meta,
-                # "url": product_url,
-                "vendor_id": VENDOR_ID
+            # Extract inches measurements
+            inch_table = size_chart_element.select_one('.inch-table')
+            if inch_table:
+                for row in inch_table.select('tr')[1:]:  # Skip header row
+                    cells = row.select('td')
+                    if cells:
+                        size = cells[0].text.strip()
+                        measurements = {}
+                        for i in range(1, len(cells)):
+                            measurements[headers[i]] = cells[i].text.strip()
+                        size_chart["inches"][size] = measurements
+            
+            # Extract cm measurements
+            cm_table = size_chart_element.select_one('.cm-table')
+            if cm_table:
+                for row in cm_table.select('tr')[1:]:  # Skip header row
+                    cells = row.select('td')
+                    if cells:
+                        size = cells[0].text.strip()
+                        measurements = {}
+                        for i in range(1, len(cells)):
+                            measurements[headers[i]] = cells[i].text.strip()
+                        size_chart["cm"][size] = measurements
+
+        # Extract colors from product name and description
+        colors = self.extract_colors(name, desc_section.get_text(" ") if desc_section else "")
+
+        return {
+            "rating": rating,
+            "review_count": review_count,
+            "description": description,
+            "product_details": product_details,
+            "vendor_details": vendor_details,
+            "size_chart": size_chart,
+            "colors": list(colors),
+        }
+
+    def extract_colors(self, name: Optional[str], description_text: str) -> List[str]:
+        """Find color keywords (taxonomy.json) as whole words in the product name and description text"""
+        return get_taxonomy("lea_colors").classify(name, description_text)
+
+    def build_product(self, name: Optional[str], product_url: Optional[str], category: Optional[str],
+                      current_price: Optional[float], original_price: Optional[float], images: List[str],
+                      details: Dict[str, Any], available_sizes: List[str], tags: List[str]) -> Dict[str, Any]:
+        """Assemble the product dict in the format the products API expects"""
+        VENDOR_ID = "7c9e130b-8920-4914-853e-64ee867bb3b4"
+
+        # Create meta data
+        meta = {
+            "category": category,
+            "rating": details["rating"],
+            "review_count": details["review_count"],
+            "available_sizes": available_sizes,
+            "colors": details["colors"],
+            "product_details": details["product_details"],
+            "vendor_details": details["vendor_details"],
+            "size_chart": details["size_chart"],
+            "tags": tags,
+            "productUrl": product_url,
+        }
+
+        # Create price object
+        price = {
+            "default": current_price,
+            "original": original_price,
+            "meta": {
+                "CURRENCY_CODE": "INR",
+                "CURRENCY_LOGO": "Rs."
             }
-            return product
+        }
+        
+        product = {
+            "label": name,
+            "description": details["description"],
+            "images": images,
+            "price": price,
+            "meta": meta,
+            # "url": product_url,
+            "vendor_id": VENDOR_ID
+        }
+        return product
+
+
+
+class LeaClothingScraper(LeaProductExtractor):
+    def __init__(self, base_url: str = "https://www.leaclothingco.com", max_concurrency_per_host: int = 8,
+                 requests_per_second: float = 1.0, burst: int = 4, pool_size: int = 10,
+                 cache_path: Optional[str] = "lea_http_cache.sqlite3",
+                 frontier_path: Optional[str] = "lea_frontier.sqlite3"):
+        super().__init__(base_url)
+        # Paces every request per host and adapts to 429 / Retry-After responses
+        self.rate_limiter = HostRateLimiter(requests_per_second=requests_per_second, burst=burst)
+        # Upper bound on simultaneous product page fetches against one host in async mode
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        # Long-lived keep-alive session, sized so every async worker can hold a connection
+        self.session = build_session(pool_size=max(pool_size, max_concurrency_per_host), headers=self.headers)
+        # Conditional-GET cache of product pages and the products extracted from them
+        self.http_cache = HTTPCache(cache_path, extractor_version=self.extractor_version()) if cache_path else None
+        # Collections and products of the current crawl, so an interrupted run can resume
+        self.frontier = CrawlFrontier(frontier_path) if frontier_path else None
+        # Configure logging
+        logging.basicConfig(level=logging.INFO)
+
+    def _fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Perform a single GET request, raising for HTTP error statuses.
+
+        Callers must take a slot from the rate limiter first; the response
+        status is reported back so the limiter can adapt its rate.
+        """
+        response = self.session.get(url, headers=headers)
+        self.rate_limiter.record_response(url, response.status_code, response.headers.get('Retry-After'))
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _retry_delay(attempt: int) -> int:
+        """Exponential backoff before a retry, max 30 seconds"""
+        return min(30, 5 * (2 ** attempt))
+
+    def get_page_content(self, url: str, max_retries: int = 3, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Fetch and parse a webpage with retry logic and rate limiting"""
+        response = self.get_response(url, max_retries)
+        if response is None:
+            return None
+        return make_soup(response.text, parse_only)
+
+    def get_response(self, url: str, max_retries: int = 3,
+                     headers: Optional[Dict[str, str]] = None) -> Optional[requests.Response]:
+        """Fetch a webpage with retry logic and rate limiting"""
+        for attempt in range(max_retries):
+            try:
+                # Add delay between requests (increasing with each retry)
+                if attempt > 0:
+                    delay = self._retry_delay(attempt)
+                    self.logger.info(f"Waiting {delay} seconds before retry...")
+                    time.sleep(delay)
+                
+                self.rate_limiter.acquire(url)
+                return self._fetch(url, headers)
+                
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code == 429:
+                    self.logger.warning(f"Rate limited on attempt {attempt + 1}/{max_retries}. URL: {url}")
+                    if attempt == max_retries - 1:
+                        self.logger.error(f"Max retries reached for {url}")
+                        return None
+                else:
+                    self.logger.error(f"HTTP error fetching {url}: {str(e)}")
+                    return None
+            except Exception as e:
+                self.logger.error(f"Error fetching {url}: {str(e)}")
+                return None
+        
+        return None
+
+    def extract_product_data(self, product_element) -> Dict[str, Any]:
+        """Extract product data from a product element"""
+        try:
+            # Extract product name and URL
+            name, product_url = self.extract_listing_data(product_element)
+            return self.scrape_listing(name, product_url)
+        except Exception as e:
+            print(f"Error extracting product data: {str(e)}")
+            return None
+
+    def scrape_listing(self, name: Optional[str], product_url: str) -> Optional[Dict[str, Any]]:
+        """Extract product data for a listing found on a collection page"""
+        try:
+            # Visit the individual product page, unless it hasn't changed since the last run
+            html, cached_product = self.fetch_product_html(product_url)
+            if cached_product is not None:
+                return cached_product
+            if not html:
+                return None
+
+            product_soup = make_soup(html, LEA_PRODUCT_PAGE)
+            return self._remember_product(product_url, self.parse_product_page(name, product_url, product_soup))
         except Exception as e:
             print(f"Error extracting product data: {str(e)}")
             return None
 
+    def _cache_lookup(self, url: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, str]]:
+        """Find the cached entry holding an extracted product for url, and its revalidation headers"""
+        if not self.http_cache:
+            return None, {}
+        entry = self.http_cache.lookup(url)
+        if entry and entry['extracted'] is None:
+            entry = None
+        return entry, HTTPCache.conditional_headers(entry)
+
+    def fetch_product_html(self, url: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Fetch a product page through the HTTP cache, see _resolve_product_html"""
+        entry, headers = self._cache_lookup(url)
+        if entry and self.http_cache.is_fresh(entry):
+            return None, entry['extracted']
+        response = self.get_response(url, headers=headers)
+        return self._resolve_product_html(url, entry, response)
+
+    def _resolve_product_html(self, url: str, entry: Optional[Dict[str, Any]],
+                              response: Optional[requests.Response]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Return (html to parse, None) for a changed page or (None, cached product) for an unchanged one"""
+        if response is None:
+            return None, None
+        if not self.http_cache:
+            return response.text, None
+        body, cached_product = self.http_cache.resolve(url, entry, response)
+        if cached_product is not None:
+            self.logger.info(f"Product page unchanged, reusing cached product: {url}")
+            return None, cached_product
+        return body, None
+
+    def _remember_product(self, url: str, product: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Store the product extracted from url next to its cached page"""
+        if product and self.http_cache:
+            self.http_cache.save_extracted(url, product)
+        return product
+
+    def iter_products(self, urls: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yield products from multiple URLs, as they are extracted"""
+        for name, product_url in self.iter_listings(urls):
+            product_data = self.scrape_listing(name, product_url)
+            self._record_result(product_url, product_data)
+            if product_data:
+                yield product_data
+
+        self.logger.info(f"Connection stats: {connection_stats(self.session)}")
+        self._finish_crawl()
+
     def scrape_products(self, urls: List[str]) -> List[Dict[str, Any]]:
         """Scrape products from multiple URLs"""
-        all_products = []
-        
+        return list(self.iter_products(urls))
+
+    def iter_listings(self, urls: List[str]) -> Iterator[Tuple[Optional[str], str]]:
+        """Yield (name, product URL) for every product card on the given collection pages.
+
+        With a frontier, listings left over from an interrupted run come
+        first, finished collection pages aren't fetched again and finished
+        products are skipped.
+        """
+        if self.frontier:
+            for product_url, name in self.frontier.pending():
+                yield name, product_url
+
+        for page, listing_url, soup in self.iter_collection_pages(urls):
+            listings = []
+            for element in soup.select('.ProductItem'):
+                name, product_url = self.extract_listing_data(element)
+                if product_url:
+                    listings.append((name, product_url))
+            if self.frontier:
+                self.frontier.queue_page(listing_url, [(product_url, name) for name, product_url in listings])
+                listings = [(name, product_url) for product_url, name in self.frontier.pending(parent=listing_url)]
+            yield from listings
+
+    def iter_collection_pages(self, urls: List[str], page_workers: int = 4) -> Iterator[Tuple[int, str, BeautifulSoup]]:
+        """Yield (page number, page URL, soup) for every page of the given collections not yet crawled.
+
+        Pages past the first are found through the pagination links and
+        fetched page_workers at a time.
+        """
+        skip = self.frontier.is_done if self.frontier else None
+        fetch = partial(self.get_page_content, parse_only=LEA_COLLECTION_PAGE)
         for url in urls:
             self.logger.info(f"Scraping {url}...")
-            soup = self.get_page_content(url)
-            
-            if not soup:
-                continue
-                
-            # Find all product elements
-            product_elements = soup.select('.ProductItem')
-            for element in product_elements:
-                product_data = self.extract_product_data(element)
+            for page, listing_url, soup in iter_pages(fetch, url, workers=page_workers, skip=skip):
+                if page > 1:
+                    self.logger.info(f"Scraping page {page} of {url}...")
+                yield page, listing_url, soup
+
+    def _record_result(self, product_url: str, product_data: Optional[Dict[str, Any]]):
+        """Mark product_url done or failed in the frontier"""
+        if not self.frontier:
+            return
+        if product_data:
+            self.frontier.mark_done(product_url)
+        else:
+            self.frontier.mark_failed(product_url, "no product extracted")
+
+    def _finish_crawl(self):
+        """Clear the frontier once nothing is left to retry, so the next run starts a fresh crawl"""
+        if not self.frontier:
+            return
+        retry = self.frontier.pending()
+        if retry:
+            self.logger.warning(f"{len(retry)} products failed and will be retried on the next run")
+            return
+        for product_url, attempts, error in self.frontier.failures():
+            self.logger.error(f"Gave up on {product_url} after {attempts} attempts: {error}")
+        self.logger.info(f"Crawl frontier: {self.frontier.counts()}")
+        self.frontier.reset()
+
+    def _fetch_for_pipeline(self, listing: Tuple[Optional[str], str]):
+        """Fetch stage: a cached product dict, or the arguments for extract_product"""
+        name, product_url = listing
+        html, cached_product = self.fetch_product_html(product_url)
+        if cached_product is not None:
+            return cached_product
+        if not html:
+            self._record_result(product_url, None)
+            return None
+        return html, name, product_url, self.base_url
+
+    def iter_products_parallel(self, urls: List[str], fetch_workers: Optional[int] = None,
+                               parse_workers: Optional[int] = None, queue_size: int = 64) -> Iterator[Dict[str, Any]]:
+        """Yield products with fetching on threads and HTML extraction on a process pool"""
+        for (name, product_url), product_data in run_pipeline(
+            self.iter_listings(urls),
+            fetch=self._fetch_for_pipeline,
+            extract=extract_product,
+            fetch_workers=fetch_workers or self.max_concurrency_per_host,
+            parse_workers=parse_workers,
+            queue_size=queue_size,
+        ):
+            self._record_result(product_url, product_data)
+            if product_data:
+                yield self._remember_product(product_url, product_data)
+
+        self.logger.info(f"Connection stats: {connection_stats(self.session)}")
+        self._finish_crawl()
+
+    def scrape_products_parallel(self, urls: List[str], fetch_workers: Optional[int] = None,
+                                 parse_workers: Optional[int] = None, queue_size: int = 64) -> List[Dict[str, Any]]:
+        """Scrape products with fetching on threads and HTML extraction on a process pool"""
+        return list(self.iter_products_parallel(urls, fetch_workers, parse_workers, queue_size))
+
+    def iter_products_json(self, urls: List[str], fetch_details: bool = True) -> Iterator[Dict[str, Any]]:
+        """Yield products from the collections' Shopify JSON endpoints.
+
+        Price, compare-at price, images, sizes and tags come from
+        products.json; the product page is only fetched (when fetch_details)
+        for rating, description, product/vendor details and the size chart.
+        """
+        for url in urls:
+            self.logger.info(f"Scraping {url} (JSON)...")
+            handle = collection_handle(url)
+            for shopify_product in iter_collection_products(self.get_response, self.base_url, handle):
+                product_data = self.product_from_json(handle, shopify_product, fetch_details)
                 if product_data:
-                    all_products.append(product_data)
-                    
-            # Add longer delay between collection pages
-            time.sleep(random.uniform(5, 10))
-            
-        return all_products
+                    yield product_data
+
+        self.logger.info(f"Connection stats: {connection_stats(self.session)}")
+
+    def scrape_products_json(self, urls: List[str], fetch_details: bool = True) -> List[Dict[str, Any]]:
+        """Scrape products from the collections' Shopify JSON endpoints"""
+        return list(self.iter_products_json(urls, fetch_details))
+
+    def product_from_json(self, handle: str, shopify_product: Dict[str, Any],
+                          fetch_details: bool = True) -> Optional[Dict[str, Any]]:
+        """Build the product dict from a products.json entry"""
+        try:
+            fields = product_fields(shopify_product)
+            name = fields["label"]
+            product_url = shopify_product_url(self.base_url, handle, fields["handle"])
+
+            details = None
+            if fetch_details:
+                product_soup = self.get_page_content(product_url, parse_only=LEA_PRODUCT_PAGE)
+                if product_soup:
+                    details = self.extract_page_details(name, product_soup)
+            if details is None:
+                description = html_to_text(fields["body_html"], "\n")
+                details = {
+                    "rating": None,
+                    "review_count": None,
+                    "description": description,
+                    "product_details": {},
+                    "vendor_details": {},
+                    "size_chart": {"inches": {}, "cm": {}},
+                    "colors": self.extract_colors(name, description),
+                }
+
+            tags = [handle]
+            for tag in fields["tags"]:
+                if tag not in tags:
+                    tags.append(tag)
+
+            return self.build_product(
+                name=name,
+                product_url=product_url,
+                category=handle,
+                current_price=fields["price"],
+                original_price=fields["original_price"],
+                images=fields["images"],
+                details=details,
+                available_sizes=fields["sizes"] or list(details["size_chart"]["inches"].keys()),
+                tags=tags,
+            )
+        except Exception as e:
+            print(f"Error extracting product data from JSON: {str(e)}")
+            return None
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Get the semaphore limiting concurrent fetches against the host of url"""
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_concurrency_per_host)
+        return self._host_semaphores[host]
+
+    async def get_page_content_async(self, url: str, max_retries: int = 3,
+                                     parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Async variant of get_page_content with the same 429 backoff and rate limiting"""
+        response = await self.get_response_async(url, max_retries)
+        if response is None:
+            return None
+        return make_soup(response.text, parse_only)
+
+    async def get_response_async(self, url: str, max_retries: int = 3,
+                                 headers: Optional[Dict[str, str]] = None) -> Optional[requests.Response]:
+        """Async variant of get_response"""
+        for attempt in range(max_retries):
+            try:
+                if attempt > 0:
+                    delay = self._retry_delay(attempt)
+                    self.logger.info(f"Waiting {delay} seconds before retry...")
+                    await asyncio.sleep(delay)
+
+                await asyncio.sleep(self.rate_limiter.reserve(url))
+
+                # Only the network call holds a slot, backoff sleeps don't
+                async with self._host_semaphore(url):
+                    return await asyncio.to_thread(self._fetch, url, headers)
+
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code == 429:
+                    self.logger.warning(f"Rate limited on attempt {attempt + 1}/{max_retries}. URL: {url}")
+                    if attempt == max_retries - 1:
+                        self.logger.error(f"Max retries reached for {url}")
+                        return None
+                else:
+                    self.logger.error(f"HTTP error fetching {url}: {str(e)}")
+                    return None
+            except Exception as e:
+                self.logger.error(f"Error fetching {url}: {str(e)}")
+                return None
+
+        return None
+
+    async def _product_worker(self, queue: asyncio.Queue, results: Dict[int, Dict[str, Any]]):
+        """Consume (index, name, url) items from the queue and extract product data"""
+        while True:
+            index, name, product_url = await queue.get()
+            try:
+                entry, headers = self._cache_lookup(product_url)
+                if entry and self.http_cache.is_fresh(entry):
+                    results[index] = entry['extracted']
+                    continue
+                response = await self.get_response_async(product_url, headers=headers)
+                html, product_data = self._resolve_product_html(product_url, entry, response)
+                if html:
+                    product_soup = make_soup(html, LEA_PRODUCT_PAGE)
+                    product_data = self._remember_product(
+                        product_url, self.parse_product_page(name, product_url, product_soup)
+                    )
+                if product_data:
+                    results[index] = product_data
+            except Exception as e:
+                self.logger.error(f"Error processing {product_url}: {str(e)}")
+            finally:
+                queue.task_done()
+
+    async def scrape_products_async(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """Scrape products from multiple URLs, fetching product pages concurrently"""
+        # Semaphores are bound to the running event loop
+        self._host_semaphores = {}
+        queue: asyncio.Queue = asyncio.Queue()
+        results: Dict[int, Dict[str, Any]] = {}
+        workers = [
+            asyncio.create_task(self._product_worker(queue, results))
+            for _ in range(self.max_concurrency_per_host)
+        ]
+
+        index = 0
+        fetch = partial(self.get_page_content, parse_only=LEA_COLLECTION_PAGE)
+        for url in urls:
+            self.logger.info(f"Scraping {url}...")
+            # Pagination is discovered page by page, so walk it on a thread while the workers run
+            pages = await asyncio.to_thread(list, iter_pages(fetch, url, workers=self.max_concurrency_per_host))
+
+            # Hand product URLs to the workers instead of fetching them inline
+            for _, _, soup in pages:
+                for element in soup.select('.ProductItem'):
+                    name, product_url = self.extract_listing_data(element)
+                    if not product_url:
+                        continue
+                    queue.put_nowait((index, name, product_url))
+                    index += 1
+
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self.logger.info(f"Connection stats: {connection_stats(self.session)}")
+
+        # Keep the listing order of the sequential crawl
+        return [results[i] for i in sorted(results)]
+
+    def scrape_products_concurrently(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """Blocking entry point for scrape_products_async"""
+        return asyncio.run(self.scrape_products_async(urls))
 
     def save_to_json(self, products: List[Dict[str, Any]], filename: str = "lea_products.json"):
         """Save scraped products to a JSON file"""
@@ -406,6 +756,12 @@ class LeaClothingScraper:
         except Exception as e:
             print(f"Error saving to JSON: {str(e)}")
 
+def extract_product(html: str, name: Optional[str], product_url: str,
+                    base_url: str = "https://www.leaclothingco.com") -> Optional[Dict[str, Any]]:
+    """Product page HTML in, product dict out. Picklable entry point for the parse worker processes"""
+    extractor = LeaProductExtractor(base_url)
+    return extractor.parse_product_page(name, product_url, make_soup(html, LEA_PRODUCT_PAGE))
+
 def main():
     # Example usage
     urls = [
@@ -427,9 +783,22 @@ def main():
 
     ]
     
+    # "json" reads prices, images and sizes from the Shopify JSON endpoints instead of product HTML
+    extraction_engine = "html"
+
     scraper = LeaClothingScraper()
-    products = scraper.scrape_products(urls)
-    scraper.save_to_json(products)
+    # An interrupted HTML crawl picks up where it stopped and appends to its earlier output
+    resuming = False
+    if extraction_engine == "json":
+        products = scraper.iter_products_json(urls)
+    else:
+        resuming = not scraper.frontier.is_empty()
+        products = scraper.iter_products_parallel(urls)
+    # Checkpoint every product to NDJSON so a crash keeps what was scraped so far
+    count = write_ndjson(products, "lea_products.ndjson", append=resuming)
+    scraper.logger.info(f"Scraped {count} products")
+    saved = finalize_json_array("lea_products.ndjson", "lea_products.json")
+    scraper.logger.info(f"Saved {saved} products to lea_products.json")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,143 @@
+import codecs
+import csv
+import logging
+import re
+import time
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from product_stream import NDJSONWriter, iter_products
+
+logger = logging.getLogger(__name__)
+
+# Bytes of the CSV looked at to decide its encoding
+ENCODING_SAMPLE_BYTES = 1 << 20
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_label(label: Optional[str]) -> str:
+    """'Malea Wine Off-Shoulder Top  CL' -> 'malea wine off shoulder top cl'"""
+    if not label:
+        return ""
+    # Accents and case don't matter, nor does punctuation or spacing
+    decomposed = unicodedata.normalize('NFKD', label)
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+    return _NON_WORD.sub(' ', folded).strip()
+
+
+def normalize_url(url: Optional[str]) -> Optional[str]:
+    """A product URL reduced to its product handle, so collection and plain product URLs agree"""
+    if not url:
+        return None
+    path = urlparse(url.strip()).path.rstrip('/').lower()
+    if '/products/' in path:
+        return 'products/' + path.rsplit('/products/', 1)[-1]
+    return path or None
+
+
+def detect_encoding(path: str, sample_size: int = ENCODING_SAMPLE_BYTES) -> str:
+    """Encoding of a text file, decided once from its first sample_size bytes.
+
+    UTF-8 (with or without BOM) or UTF-16 when the sample decodes as such,
+    otherwise the Windows Western encoding spreadsheet exports use, falling
+    back to latin-1 which accepts any byte.
+    """
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # final=False: the sample may end in the middle of a character
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def read_index(csv_path: str, id_column: str = "ID", label_column: str = "Label",
+               url_column: Optional[str] = None) -> Tuple[Dict[str, str], Dict[str, str], str]:
+    """(normalized label -> id, normalized URL -> id, encoding) for the rows of a CSV export.
+
+    The indexes keep the CSV row order. A label (or URL) repeated in the
+    export keeps its first position and the id of its last row, as the
+    label dict f_products.py used to build did. url_column must name a
+    column of the export: the database export has none, so it's only
+    given for exports that do.
+    """
+    encoding = detect_encoding(csv_path)
+    by_label: Dict[str, str] = {}
+    by_url: Dict[str, str] = {}
+    with open(csv_path, 'r', encoding=encoding, newline='') as f:
+        reader = csv.DictReader(f)
+        if url_column and url_column not in (reader.fieldnames or []):
+            raise ValueError(f"{csv_path} has no {url_column!r} column to match product URLs on")
+        for row in reader:
+            row_id = row.get(id_column)
+            label = normalize_label(row.get(label_column))
+            if label:
+                by_label[label] = row_id
+            url = normalize_url(row.get(url_column)) if url_column else None
+            if url:
+                by_url[url] = row_id
+    return by_label, by_url, encoding
+
+
+def join_catalog(csv_path: str, catalog_path: str, output_path: str, id_column: str = "ID",
+                 label_column: str = "Label", url_column: Optional[str] = None,
+                 id_field: Optional[str] = None) -> Dict[str, Any]:
+    """Write the catalog products that match a row of the CSV export to output_path as NDJSON.
+
+    Only the CSV (the smaller side, e.g. a database export) is indexed and
+    the catalog is streamed, so memory is bounded by the export: at most
+    one product is held per CSV row. A product matches on its product URL
+    when url_column is given and the URL is in the export, otherwise on its
+    normalized label. When several products match the same row (the scrape
+    lists a product once per collection), the last one wins, as in the old
+    label dict of f_products.py, and the label is logged. Matches are
+    written in CSV row order. With id_field, the row's id is copied into
+    the product under that key.
+    """
+    started = time.monotonic()
+    by_label, by_url, encoding = read_index(csv_path, id_column, label_column, url_column)
+    # row id -> its last matching product, in CSV row order
+    matches: Dict[str, Optional[Dict[str, Any]]] = dict.fromkeys([*by_label.values(), *by_url.values()])
+    duplicates: Dict[str, int] = {}
+    stats = {"csv_ids": len(matches), "encoding": encoding, "scanned": 0, "matched": 0, "duplicates": 0}
+
+    for product in iter_products(catalog_path):
+        stats["scanned"] += 1
+        url = normalize_url((product.get("meta") or {}).get("productUrl")) if url_column else None
+        row_id = by_url.get(url) if url else None
+        if row_id is None:
+            row_id = by_label.get(normalize_label(product.get("label")))
+        if row_id is None:
+            continue
+        if matches[row_id] is not None:
+            label = product.get("label")
+            duplicates[label] = duplicates.get(label, 1) + 1
+        matches[row_id] = product
+
+    for label, count in duplicates.items():
+        logger.info(f"{count} products match {label!r}; keeping the last one")
+    stats["duplicates"] = sum(count - 1 for count in duplicates.values())
+
+    with NDJSONWriter(output_path, flush_every=1000, fsync=False) as writer:
+        for row_id, product in matches.items():
+            if product is None:
+                continue
+            if id_field:
+                product = {**product, id_field: row_id}
+            writer.write(product)
+
+    stats["matched"] = writer.count
+    stats["elapsed_s"] = round(time.monotonic() - started, 2)
+    return stats
@@ -1,39 +1,202 @@
-from flask import request, jsonify
+import base64
+import hashlib
+import json
+import logging
+
+from flask import Response, request, jsonify, stream_with_context
 
 from auth.controllers import get_current_user
 from products.models import Product
 from app import db
 from closets.models import Closet
+from etags import catalog_version, is_fresh, not_modified, tagged
+from feed_engine import feed_engine
+from instrumentation import count_rows, instrumentation, instrumented
+from catalog_join import normalize_url
+from serialization_cache import INTERNAL_META_KEYS, encode_json, product_cache, product_version, public_fields
+from swipes.models import NEGATIVE, POSITIVE, closet_swipe_ids, record_swipes
 import uuid
 
+logger = logging.getLogger(__name__)
+
+# Default price meta if not provided
+DEFAULT_PRICE_META = {
+    "CURRENCY_CODE": "INR",
+    "CURRENCY_LOGO": "Rs."
+}
+
+# Rows handed to the database per bulk insert statement
+BULK_INSERT_CHUNK = 1000
+
+# Page sizes for ?limit= on the product list endpoints
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Cards returned per feed request
+FEED_PAGE_SIZE = 20
+
+# Rows fetched per round trip when streaming a full product list
+YIELD_PER = 500
+
+# Encoded bytes buffered before a chunk of a streamed response is sent
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def normalize_price(price_data):
+    """Flatten the scrapers' price dict into {"default", "original", "meta"}"""
+    price_data = price_data or {}
+    # Extract the actual price values from the nested structure
+    default_price = price_data.get("default", {}).get("default", 0) if isinstance(price_data.get("default"), dict) else price_data.get("default", 0)
+    original_price = price_data.get("original", {}).get("default") if isinstance(price_data.get("original"), dict) else price_data.get("original")
+    price_meta = price_data.get("meta", {}).get("meta", DEFAULT_PRICE_META) if isinstance(price_data.get("meta"), dict) else price_data.get("meta", DEFAULT_PRICE_META)
+
+    return {
+        "default": default_price,
+        "original": original_price,
+        "meta": price_meta
+    }
+
+def content_hash(row):
+    """Fingerprint of a product's content, ignoring its id and the internal meta keys"""
+    meta = {key: value for key, value in (row.get("meta") or {}).items() if key not in INTERNAL_META_KEYS}
+    content = {
+        "label": row.get("label"),
+        "description": row.get("description"),
+        "images": row.get("images"),
+        "price": row.get("price"),
+        "meta": meta,
+        "vendor_id": str(row.get("vendor_id")),
+    }
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def with_content_hash(row):
+    """row with meta.contentHash and meta.productKey set, so later upserts can match it and tell whether it changed"""
+    row["meta"] = dict(row.get("meta") or {})
+    row["meta"]["contentHash"] = content_hash(row)
+    # The same product is listed under every collection it belongs to
+    product_key = normalize_url(row["meta"].get("productUrl"))
+    if product_key:
+        row["meta"]["productKey"] = product_key
+    else:
+        row["meta"].pop("productKey", None)
+    return row
+
+def _encode_cursor(product_id):
+    return base64.urlsafe_b64encode(str(product_id).encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor):
+    return uuid.UUID(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+
+def _requested_fields():
+    """Columns listed in ?fields=, always including id; None when not given"""
+    fields = request.args.get("fields")
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = set(names) - set(Product.__table__.columns.keys())
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return ["id"] + [name for name in names if name != "id"]
+
+def _list_products(query):
+    """Serialize the products matched by query.
+
+    Without paging parameters this is the legacy full list, streamed from
+    the database in chunks. ?limit= and ?cursor= return one keyset page
+    ordered by id, as {"products": [...], "nextCursor": ...}; ?fields=
+    selects only the given columns in either form.
+    """
+    try:
+        fields = _requested_fields()
+        limit = min(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        cursor = request.args.get("cursor")
+        after_id = _decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+
+    # Taken before reading, so a write racing with the query only makes the tag older
+    etag = catalog_version.etag(_wants_ndjson())
+    if is_fresh(etag):
+        return _varies_on_accept(not_modified(etag))
+
+    if fields:
+        query = query.with_entities(*[getattr(Product, name) for name in fields])
+        encode = lambda row: encode_json(public_fields(dict(row._mapping)))
+    else:
+        # Whole products come out of the serialization cache
+        encode = product_cache.encode
+
+    if "limit" not in request.args and cursor is None:
+        return _varies_on_accept(tagged(_stream_products(query.yield_per(YIELD_PER), encode), etag))
+
+    query = query.order_by(Product.id)
+    if after_id is not None:
+        query = query.filter(Product.id > after_id)
+    rows = query.limit(limit + 1).all()
+    next_cursor = _encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    count_rows(min(len(rows), limit))
+    products = b",".join(encode(row) for row in rows[:limit])
+    return _varies_on_accept(tagged(
+        _json_response(b'{"nextCursor":' + encode_json(next_cursor) + b',"products":[' + products + b']}'), etag
+    ))
+
+def _json_response(body, status=200):
+    """Response for JSON that is already encoded, terminated by a newline like jsonify's"""
+    return Response(body + b"\n", status=status, mimetype="application/json")
+
+def _varies_on_accept(response):
+    """Mark a list response as negotiated on Accept (JSON or NDJSON), so shared caches key on it"""
+    response.vary.add("Accept")
+    return response
+
+def _wants_ndjson():
+    return request.args.get("format") == "ndjson" or "application/x-ndjson" in request.headers.get("Accept", "")
+
+def _stream_products(rows, encode):
+    """Stream rows as a chunked JSON array, or NDJSON when asked for, encoding one product at a time"""
+    ndjson = _wants_ndjson()
+
+    def generate():
+        buffer = bytearray(b"" if ndjson else b"[")
+        first = True
+        count = 0
+        for row in rows:
+            count += 1
+            if ndjson:
+                buffer += encode(row) + b"\n"
+            else:
+                if not first:
+                    buffer += b","
+                buffer += encode(row)
+            first = False
+            if len(buffer) >= STREAM_CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+        if not ndjson:
+            buffer += b"]\n"
+        count_rows(count)
+        if buffer:
+            yield bytes(buffer)
+
+    mimetype = "application/x-ndjson" if ndjson else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+@instrumented("products.list")
 def list_all_products_controller():
-    return jsonify([product.toDict() for product in Product.query.all()])
+    return _list_products(Product.query)
 
+@instrumented("products.create")
 def create_product_controller():
     request_form = request.json
     content_type = request.headers.get('Content-Type')
     dev = False
     if dev:
-        print(request_form.keys())
+        logger.debug("Create product keys: %s", list(request_form.keys()))
         return jsonify({'message': 'ok', 'data': request_form})
     else:
-        price_data = request_form.get("price", {})
-        # Extract the actual price values from the nested structure
-        default_price = price_data.get("default", {}).get("default", 0) if isinstance(price_data.get("default"), dict) else price_data.get("default", 0)
-        original_price = price_data.get("original", {}).get("default") if isinstance(price_data.get("original"), dict) else price_data.get("original")
-        
-        # Default price meta if not provided
-        default_price_meta = {
-            "CURRENCY_CODE": "INR",
-            "CURRENCY_LOGO": "Rs."
-        }
-        price_meta = price_data.get("meta", {}).get("meta", default_price_meta) if isinstance(price_data.get("meta"), dict) else price_data.get("meta", default_price_meta)
-        
-        price = {
-            "default": default_price,
-            "original": original_price,
-            "meta": price_meta
-        }
+        price = normalize_price(request_form.get("price", {}))
         label = request_form.get("label")
         description = request_form.get("description")
         meta = request_form.get("meta")
@@ -44,55 +207,239 @@ def create_product_controller():
                 return jsonify({'message': 'Not Implemented'})
             case _:
                 images = []
-        new_product = Product(
-            label=label,
-            description=description,
-            images=images,
-            price=price,
-            meta=meta,
-            vendor_id=request_form.get("vendor_id"),
-        )
+        if request.args.get("mode") == "upsert":
+            row = with_content_hash({
+                "id": uuid.uuid4(),
+                "label": label,
+                "description": description,
+                "images": images,
+                "price": price,
+                "meta": meta,
+                "vendor_id": request_form.get("vendor_id"),
+            })
+            (product_id, status), = _upsert_rows([row])
+            if status != "unchanged":
+                catalog_version.bump()
+            db.session.commit()
+            if status == "created":
+                feed_engine.product_added(product_id, row["vendor_id"])
+            return jsonify({"id": str(product_id), "status": status})
+
+        new_product = Product(**with_content_hash({
+            "label": label,
+            "description": description,
+            "images": images,
+            "price": price,
+            "meta": meta,
+            "vendor_id": request_form.get("vendor_id"),
+        }))
         db.session.add(new_product)
+        catalog_version.bump()
         db.session.commit()
+        feed_engine.product_added(new_product.id, new_product.vendor_id)
+
+        return _json_response(product_cache.encode(new_product))
+
+def _iter_bulk_products():
+    """Products from the request body: a JSON array, {"products": [...]} or NDJSON.
 
-        response = Product.query.get(new_product.id).toDict()
-        return jsonify(response)
+    A JSON body of any other shape raises ValueError before anything is
+    read; NDJSON lines are parsed as they are consumed.
+    """
+    content_type = request.headers.get('Content-Type', '')
+    if content_type.startswith(('application/x-ndjson', 'application/jsonl')):
+        return _iter_ndjson(request.stream)
+    payload = request.get_json()
+    if isinstance(payload, dict):
+        payload = payload.get("products", [])
+    if not isinstance(payload, list):
+        raise ValueError('body must be a JSON array of products or {"products": [...]}')
+    return iter(payload)
 
+def _iter_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def _product_row(item):
+    """Column values for a scraped product, with a client-side id"""
+    if not isinstance(item, dict):
+        raise ValueError("each product must be a JSON object")
+    return with_content_hash({
+        "id": uuid.uuid4(),
+        "label": item.get("label"),
+        "description": item.get("description"),
+        "images": item.get("images") or [],
+        "price": normalize_price(item.get("price", {})),
+        "meta": item.get("meta"),
+        "vendor_id": item.get("vendor_id"),
+    })
+
+def _upsert_key(row):
+    """(vendor, products/<handle>), or (vendor, content hash) for products without a URL"""
+    product_key = row["meta"].get("productKey")
+    if product_key:
+        return str(row.get("vendor_id")), product_key
+    return str(row.get("vendor_id")), "#" + row["meta"]["contentHash"]
+
+def _upsert_rows(rows):
+    """Insert new products, update changed ones and leave unchanged ones alone.
+
+    Products are matched on vendor_id and meta.productKey, the product URL
+    reduced to products/<handle> so a product listed under several
+    collections is one product, falling back to the content hash. Products
+    stored before productKey existed are found by their exact URL. Matches
+    are compared through meta.contentHash, so only the rows that really
+    changed are written. Returns (id, status) per row.
+    """
+    product_url = Product.meta["productUrl"].as_string()
+    product_key = Product.meta["productKey"].as_string()
+    stored_hash = Product.meta["contentHash"].as_string()
+    vendor_ids = {row.get("vendor_id") for row in rows}
+    keys = [row["meta"]["productKey"] for row in rows if row["meta"].get("productKey")]
+    urls = [row["meta"]["productUrl"] for row in rows if row["meta"].get("productKey")]
+    hashes = [row["meta"]["contentHash"] for row in rows if not row["meta"].get("productKey")]
+
+    existing = {}
+    columns = (Product.id, Product.vendor_id, product_url, stored_hash)
+    if keys:
+        for product_id, vendor_id, url, row_hash in db.session.query(*columns).filter(
+            Product.vendor_id.in_(vendor_ids), db.or_(product_key.in_(keys), product_url.in_(urls))
+        ):
+            existing[(str(vendor_id), normalize_url(url))] = (product_id, row_hash)
+    if hashes:
+        for product_id, vendor_id, _, row_hash in db.session.query(*columns).filter(
+            Product.vendor_id.in_(vendor_ids), stored_hash.in_(hashes)
+        ):
+            existing[(str(vendor_id), "#" + row_hash)] = (product_id, row_hash)
+
+    # Key -> (row to write, whether it is new); a product repeated in one batch keeps its last version
+    writes = {}
+    results = []
+    for row in rows:
+        key = _upsert_key(row)
+        if key in writes:
+            previous, is_new = writes[key]
+            row["id"] = previous["id"]
+            writes[key] = (row, is_new)
+            results.append((row["id"], "created" if is_new else "updated"))
+            continue
+        if key not in existing:
+            writes[key] = (row, True)
+            results.append((row["id"], "created"))
+            continue
+        product_id, row_hash = existing[key]
+        if row_hash == row["meta"]["contentHash"]:
+            results.append((product_id, "unchanged"))
+            continue
+        row["id"] = product_id
+        writes[key] = (row, False)
+        results.append((product_id, "updated"))
+
+    inserts = [row for row, is_new in writes.values() if is_new]
+    updates = [row for row, is_new in writes.values() if not is_new]
+    if inserts:
+        db.session.bulk_insert_mappings(Product, inserts)
+    if updates:
+        db.session.bulk_update_mappings(Product, updates)
+        product_cache.invalidate(row["id"] for row in updates)
+    return results
+
+@instrumented("products.bulk_create")
+def bulk_create_products_controller():
+    """Insert many products in one transaction and return their ids.
+
+    Ids are generated here, so nothing has to be read back after the insert.
+    With ?mode=upsert, products already stored (same vendor and product URL)
+    are updated when their content changed and skipped otherwise.
+    """
+    upsert = request.args.get("mode") == "upsert"
+    counts = {"created": 0, "updated": 0, "unchanged": 0}
+    # (id, vendor_id) of new products, handed to the feed engine once committed
+    created = []
+    ids = []
+    rows = []
+    try:
+        items = _iter_bulk_products()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid body: {e}"}), 400
+    try:
+        for index, item in enumerate(items):
+            try:
+                rows.append(_product_row(item))
+            except ValueError as e:
+                db.session.rollback()
+                return jsonify({"error": f"Invalid product at index {index}: {e}"}), 400
+            if len(rows) >= BULK_INSERT_CHUNK:
+                ids.extend(_write_rows(rows, upsert, counts, created))
+                rows = []
+        if rows:
+            ids.extend(_write_rows(rows, upsert, counts, created))
+        if counts["created"] or counts["updated"]:
+            catalog_version.bump()
+        db.session.commit()
+        for product_id, vendor_id in created:
+            feed_engine.product_added(product_id, vendor_id)
+    except json.JSONDecodeError as e:
+        db.session.rollback()
+        return jsonify({"error": f"Invalid NDJSON: {e}"}), 400
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if not upsert:
+        return jsonify({"created": len(ids), "ids": [str(product_id) for product_id in ids]})
+    return jsonify({**counts, "ids": [str(product_id) for product_id in ids]})
+
+def _write_rows(rows, upsert, counts, created):
+    """Write one chunk of bulk rows, returning their ids"""
+    if not upsert:
+        db.session.bulk_insert_mappings(Product, rows)
+        counts["created"] += len(rows)
+        created.extend((row["id"], row["vendor_id"]) for row in rows)
+        return [row["id"] for row in rows]
+    ids = []
+    for row, (product_id, status) in zip(rows, _upsert_rows(rows)):
+        counts[status] += 1
+        if status == "created":
+            created.append((product_id, row["vendor_id"]))
+        ids.append(product_id)
+    return ids
+
+@instrumented("products.retrieve")
 def retrieve_product_controller(product_id):
-    product = Product.query.get(product_id).toDict()
-    return jsonify(product)
+    if request.if_none_match:
+        # The stored content hash is the product's ETag: revalidating reads nothing else
+        stored_hash = db.session.query(Product.meta["contentHash"].as_string()).filter(Product.id == product_id).scalar()
+        if stored_hash and is_fresh(stored_hash):
+            return not_modified(stored_hash)
+    product = Product.query.get(product_id)
+    return tagged(_json_response(product_cache.encode(product)), product_version(product) or None)
 
+@instrumented("products.feed")
 def external_retrieve_products_controller():
     user, status = get_current_user()
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
-    print(f"Fetching for user: {user.id}")
+    logger.debug("Fetching feed for user %s", user.id)
     current_user_preferred_brand_ids = user.meta.get("PREFERRED_BRANDS", [])
     closet = Closet.query.get(user.currentClosetId)
     if not closet:
         return jsonify({"error": "Closet not found"}), 404
-    current_user_closet = closet.toDict()
-    print(f"Current user closet: {current_user_closet}")
-    positive_ids = current_user_closet.get("positiveIds", []) or []
-    negative_ids = current_user_closet.get("negativeIds", []) or []
-    if positive_ids is None:
-        positive_ids = []
-    if negative_ids is None:
-        negative_ids = []
-    print(f"Positive ids: {positive_ids}")
-    print(f"Negative ids: {negative_ids}")
-    products = Product.query.filter(
-        Product.vendor_id.in_(current_user_preferred_brand_ids),
-        Product.id.notin_(positive_ids),
-        Product.id.notin_(negative_ids)
-    ).all()
-    print(f"Filtered products: {len(products)}")
-    products_output = [product.toDict() for product in products]
-    if len(products_output) == 0:
+    try:
+        limit = min(int(request.args.get("limit", FEED_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # The feed engine knows which products the closet has already swiped on
+    feed_ids = feed_engine.next_page(closet, current_user_preferred_brand_ids, limit)
+    products = Product.query.filter(Product.id.in_([uuid.UUID(product_id) for product_id in feed_ids])).all()
+    count_rows(len(products))
+    feed_order = {product_id: index for index, product_id in enumerate(feed_ids)}
+    products.sort(key=lambda product: feed_order.get(str(product.id), len(feed_order)))
+    if len(products) == 0:
         # return random 50 from list all
-        products_output = Product.query.limit(50).all()
-        products_output = [product.toDict() for product in products_output]
-        return jsonify(products_output), 200
+        return _json_response(product_cache.encode_list(Product.query.limit(50).all()))
     # tags = []
     # colors = []
     # for p in products_output:
@@ -107,8 +454,9 @@ def external_retrieve_products_controller():
     #     "tags": list(set(tags)),
     #     "colors": list(set(colors))
     # }), 200
-    return jsonify(products_output), 200
+    return _json_response(product_cache.encode_list(products))
 
+@instrumented("products.feed_no_filter")
 def external_retrieve_products_controller_no_filter(filters, user, start_index=0):
     # start_index = user.meta.get("CURRENT_PAGE_INDEX", 0)
     # products = Product.query.limit(20).offset(start_index * 20).all()
@@ -120,27 +468,50 @@ def external_retrieve_products_controller_no_filter(filters, user, start_index=0
     # user.meta["CURRENT_VISIT_IDS"] = visited_products
     # user.meta["CURRENT_PAGE_INDEX"] = start_index + 1
     # db.session.commit()
-    return jsonify([p.toDict() for p in Product.query.all()])
+    return _list_products(Product.query)
 
 
+@instrumented("products.update")
 def update_product_controller(product_id):
     request_form = request.json
     product = Product.query.get(product_id)
 
     for key, value in request_form.items():
         setattr(product, key, value)
+    # A new content hash gives the product a new version in every process's serialization cache
+    product.meta = with_content_hash({
+        "label": product.label,
+        "description": product.description,
+        "images": product.images,
+        "price": product.price,
+        "meta": product.meta,
+        "vendor_id": product.vendor_id,
+    })["meta"]
+    catalog_version.bump()
     db.session.commit()
+    product_cache.invalidate([product_id])
 
-    response = Product.query.get(product_id).toDict()
-    return jsonify(response)
+    return _json_response(product_cache.encode(product))
 
+@instrumented("products.delete")
 def delete_product_controller(product_id):
     product = Product.query.get(product_id)
     db.session.delete(product)
+    catalog_version.bump()
     db.session.commit()
+    feed_engine.product_removed(product_id)
+    product_cache.invalidate([product_id])
 
     return 'Product with Id "{}" deleted successfully!'.format(product_id)
 
+def _parse_swipe(item):
+    """(product UUID, response) from a {"productId", "response"} dict"""
+    response = item.get("response")
+    if response not in (POSITIVE, NEGATIVE):
+        raise ValueError("response must be 1 or -1")
+    return uuid.UUID(str(item["productId"])), response
+
+@instrumented("closets.swipe")
 def update_closet_product_ids_controller():
     request_form = request.json
     user, status = get_current_user()
@@ -148,26 +519,53 @@ def update_closet_product_ids_controller():
         return jsonify({"error": "Unauthorized"}), 401
 
     current_closet_id = user.currentClosetId
-    current_closet = Closet.query.get(current_closet_id)
-    product_id = uuid.UUID(request_form["productId"])
-
-    if request_form.get("response") == 1:
-        print("current_closet.positiveIds", current_closet.positiveIds)
-        if current_closet.positiveIds is None:
-            current_closet.positiveIds = [product_id]
-        else:
-            current_closet.positiveIds = current_closet.positiveIds + [product_id]  # New list assignment
-        print("current_closet.positiveIds", current_closet.positiveIds)
-    elif request_form.get("response") == -1:
-        print("current_closet.negativeIds", current_closet.negativeIds)
-        if current_closet.negativeIds is None:
-            current_closet.negativeIds = [product_id]
-        else:
-            current_closet.negativeIds = current_closet.negativeIds + [product_id]  # New list assignment
-        print("current_closet.negativeIds", current_closet.negativeIds)
-
-    print("current_closet.positiveIds", current_closet.positiveIds)
-    print("current_closet.negativeIds", current_closet.negativeIds)
+    try:
+        product_id, response = _parse_swipe(request_form)
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Invalid swipe: {e}"}), 400
 
+    # Appends one row; the closet's positive/negative ids are derived from these rows
+    record_swipes(current_closet_id, [(product_id, response)])
     db.session.commit()
-    return jsonify({"message": "Closet updated successfully"})
\ No newline at end of file
+    feed_engine.mark_seen(current_closet_id, [product_id])
+    return jsonify({"message": "Closet updated successfully"})
+
+@instrumented("closets.swipes_record")
+def record_closet_swipes_controller():
+    """Record many swipes for the current closet in one request: [{"productId", "response"}, ...]"""
+    user, status = get_current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    payload = request.json
+    if isinstance(payload, dict):
+        payload = payload.get("swipes", [])
+    try:
+        swipes = [_parse_swipe(item) for item in payload or []]
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid swipe: {e}"}), 400
+
+    recorded = record_swipes(user.currentClosetId, swipes)
+    db.session.commit()
+    feed_engine.mark_seen(user.currentClosetId, [product_id for product_id, _ in swipes])
+    return jsonify({"message": "Closet updated successfully", "recorded": recorded})
+
+@instrumented("closets.swipes_retrieve")
+def retrieve_closet_swipes_controller():
+    """positiveIds / negativeIds of the current closet, derived from its swipes"""
+    user, status = get_current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+    closet = Closet.query.get(user.currentClosetId)
+    if not closet:
+        return jsonify({"error": "Closet not found"}), 404
+
+    positive_ids, negative_ids = closet_swipe_ids(closet)
+    return jsonify({
+        "positiveIds": [str(product_id) for product_id in positive_ids],
+        "negativeIds": [str(product_id) for product_id in negative_ids],
+    })
+
+def metrics_controller():
+    """Latency histograms, query counts and bytes served per endpoint since the process started"""
+    return jsonify(instrumentation.snapshot())
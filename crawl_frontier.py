@@ -0,0 +1,127 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class CrawlFrontier:
+    """Persistent record of which collection pages and product URLs a crawl still has to visit.
+
+    Listing pages are marked done once their products have been queued, so a
+    resumed crawl skips straight to the products it hadn't finished. Each
+    product keeps a payload (whatever the scraper needs besides the URL, e.g.
+    the card HTML) and an attempt count; failed entries are retried until
+    they reach max_attempts.
+    """
+
+    def __init__(self, path: str = "crawl_frontier.sqlite3", max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                kind TEXT NOT NULL,
+                parent TEXT,
+                payload TEXT,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS frontier_state ON frontier (kind, state)")
+        self._conn.commit()
+
+    def is_empty(self) -> bool:
+        """True when there is no crawl to resume"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM frontier LIMIT 1").fetchone() is None
+
+    def queue_page(self, page_url: str, entries: Iterable[Tuple[str, Any]], kind: str = "product"):
+        """Queue the (url, payload) entries found on a listing page and mark the page done, in one transaction.
+
+        URLs already in the frontier (e.g. a product listed on two pages) keep
+        their state and parent.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, kind, parent, payload, state, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(url, kind, page_url, json.dumps(payload), PENDING, now) for url, payload in entries],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO frontier (url, kind, state, attempts, updated_at) VALUES (?, ?, ?, 1, ?)",
+                (page_url, "page", DONE, now),
+            )
+            self._conn.commit()
+
+    def is_done(self, url: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM frontier WHERE url = ?", (url,)).fetchone()
+        return bool(row and row[0] == DONE)
+
+    def mark_done(self, url: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE frontier SET state = ?, attempts = attempts + 1, last_error = NULL, updated_at = ? WHERE url = ?",
+                (DONE, time.time(), url),
+            )
+            self._conn.commit()
+
+    def mark_failed(self, url: str, error: str = ""):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE frontier SET state = ?, attempts = attempts + 1, last_error = ?, updated_at = ? WHERE url = ?",
+                (FAILED, error, time.time(), url),
+            )
+            self._conn.commit()
+
+    def pending(self, kind: str = "product", parent: Optional[str] = None) -> List[Tuple[str, Any]]:
+        """(url, payload) of every entry still to visit, in the order they were queued"""
+        query = (
+            "SELECT url, payload FROM frontier WHERE kind = ? "
+            "AND (state = ? OR (state = ? AND attempts < ?))"
+        )
+        params: list = [kind, PENDING, FAILED, self.max_attempts]
+        if parent is not None:
+            query += " AND parent = ?"
+            params.append(parent)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY seq", params).fetchall()
+        return [(url, json.loads(payload) if payload else None) for url, payload in rows]
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """{kind: {state: count}}"""
+        counts: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, state, COUNT(*) FROM frontier GROUP BY kind, state").fetchall()
+        for kind, state, count in rows:
+            counts.setdefault(kind, {})[state] = count
+        return counts
+
+    def failures(self) -> List[Tuple[str, int, Optional[str]]]:
+        """(url, attempts, last error) of entries that are still failed"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, attempts, last_error FROM frontier WHERE state = ? ORDER BY seq", (FAILED,)
+            ).fetchall()
+
+    def reset(self):
+        """Forget everything, so the next crawl starts from the first page"""
+        with self._lock:
+            self._conn.execute("DELETE FROM frontier")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,73 @@
+from sqlalchemy.schema import CreateIndex
+
+from app import app, db
+from catalog_join import normalize_url
+from etags import CATALOG_STATE_ID, CatalogState
+from products.models import Product
+from swipes.models import ClosetSwipe, import_legacy_swipes
+
+# Tables owned by this repository's modules, created in dependency order
+TABLES = [
+    CatalogState.__table__,
+    ClosetSwipe.__table__,
+]
+
+# Expression indexes on the products table, for the bulk upsert's lookups by product key and URL
+PRODUCT_INDEXES = [
+    db.Index("products_vendor_product_key", Product.vendor_id, Product.meta["productKey"].as_string()),
+    db.Index("products_vendor_product_url", Product.vendor_id, Product.meta["productUrl"].as_string()),
+]
+
+# Products updated per commit while backfilling meta.productKey
+BACKFILL_BATCH = 1000
+
+
+def create_tables():
+    """Create the missing tables and indexes and seed the catalog counter; existing ones are left alone"""
+    for table in TABLES:
+        table.create(db.engine, checkfirst=True)
+    # Indexes added to a table after it was created, and the products table's; expression indexes
+    # aren't reflected by every dialect, so the database itself skips the existing ones
+    indexes = [index for table in TABLES for index in table.indexes] + PRODUCT_INDEXES
+    with db.engine.begin() as connection:
+        for index in indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+    # The catalog's change counter starts at 0
+    if db.session.get(CatalogState, CATALOG_STATE_ID) is None:
+        db.session.add(CatalogState(id=CATALOG_STATE_ID, version=0))
+        db.session.commit()
+
+
+def backfill_product_keys() -> int:
+    """Set meta.productKey on products stored before it existed; returns how many were updated"""
+    product_key = Product.meta["productKey"].as_string()
+    product_url = Product.meta["productUrl"].as_string()
+    updated = 0
+    last_id = None
+    while True:
+        query = Product.query.filter(product_key.is_(None), product_url.isnot(None))
+        if last_id is not None:
+            query = query.filter(Product.id > last_id)
+        batch = query.order_by(Product.id).limit(BACKFILL_BATCH).all()
+        if not batch:
+            return updated
+        for product in batch:
+            key = normalize_url(product.meta["productUrl"])
+            if key:
+                # productKey isn't part of the content hash, so the products keep their versions
+                product.meta = {**product.meta, "productKey": key}
+                updated += 1
+        db.session.commit()
+        last_id = batch[-1].id
+
+
+def main():
+    with app.app_context():
+        create_tables()
+        print(f"Tables ready: {', '.join(table.name for table in TABLES)}")
+        print(f"Product keys backfilled: {backfill_product_keys()}")
+        print(f"Legacy closet swipes imported: {import_legacy_swipes()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import hashlib
+from typing import Any, Optional
+
+from flask import Response, request
+
+from app import db
+
+
+class CatalogState(db.Model):
+    """Single row holding the catalog's change counter, shared by every worker process"""
+    __tablename__ = "catalog_state"
+
+    id = db.Column(db.SmallInteger, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+# Primary key of the one CatalogState row
+CATALOG_STATE_ID = 1
+
+
+class CatalogVersion:
+    """Change counter for the product catalog, kept in the database.
+
+    Every product write bumps it inside its own transaction, so all
+    processes derive the same list ETags from it and a tag changes exactly
+    when the catalog does. Matching a tag costs one primary-key read.
+    """
+
+    def bump(self):
+        """Count a catalog change; call it before the write's commit"""
+        updated = db.session.execute(
+            db.update(CatalogState).where(CatalogState.id == CATALOG_STATE_ID).values(version=CatalogState.version + 1)
+        )
+        if updated.rowcount == 0:
+            db.session.add(CatalogState(id=CATALOG_STATE_ID, version=1))
+
+    def current(self) -> int:
+        version = db.session.query(CatalogState.version).filter(CatalogState.id == CATALOG_STATE_ID).scalar()
+        return version or 0
+
+    def etag(self, *variant: Any) -> str:
+        """Tag for the current catalog state; variant tells apart representations of the same URL"""
+        parts = [str(self.current())] + [str(part) for part in variant]
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def is_fresh(etag: str) -> bool:
+    """True when the request's If-None-Match already names etag"""
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def tagged(response: Response, etag: Optional[str] = None) -> Response:
+    """Set a weak ETag on response (derived from its body when none is given), answering 304 if the client has it"""
+    if etag is None:
+        etag = hashlib.sha1(response.get_data()).hexdigest()[:20]
+    response.set_etag(etag, weak=True)
+    return response.make_conditional(request)
+
+
+# Shared by the controllers
+catalog_version = CatalogVersion()
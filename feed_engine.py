@@ -0,0 +1,251 @@
+import datetime
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app import db
+from products.models import Product
+from swipes.models import swipes_since
+
+# How often the catalog index is reconciled with products written by other processes
+CATALOG_REFRESH_SECONDS = 60
+
+# Closets whose seen-bitmaps are kept in memory (least recently used are dropped)
+MAX_CACHED_CLOSETS = 10000
+
+
+class CatalogIndex:
+    """Stable small-integer ordinals for products, grouped by vendor.
+
+    Ordinals are handed out in the order products are first seen and never
+    reused, so every per-vendor list only ever grows at the end and bitmaps
+    built over ordinals stay valid while products come and go. version
+    changes whenever a product is added or removed.
+    """
+
+    def __init__(self):
+        self.ordinals: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self.by_vendor: Dict[str, List[int]] = {}
+        self.live: Set[str] = set()
+        self.version = 0
+        self.refreshed_at = float('-inf')
+
+    def add(self, product_id: Any, vendor_id: Any):
+        key = str(product_id)
+        ordinal = self.ordinals.get(key)
+        if ordinal is not None:
+            if self.ids[ordinal] is None:
+                self.ids[ordinal] = key
+                self.live.add(key)
+                self.version += 1
+            return
+        ordinal = len(self.ids)
+        self.ids.append(key)
+        self.ordinals[key] = ordinal
+        self.live.add(key)
+        self.by_vendor.setdefault(str(vendor_id), []).append(ordinal)
+        self.version += 1
+
+    def remove(self, product_id: Any):
+        ordinal = self.ordinals.get(str(product_id))
+        if ordinal is not None and self.ids[ordinal] is not None:
+            # Left as a hole so later ordinals don't move
+            self.ids[ordinal] = None
+            self.live.discard(str(product_id))
+            self.version += 1
+
+    @staticmethod
+    def changes(rows: Iterable[Tuple[Any, Any]], live: Set[str]) -> Tuple[List[Tuple[str, str]], Set[str]]:
+        """(added (id, vendor_id) rows, removed ids) between (id, vendor_id) rows read from the database and live ids"""
+        present = set()
+        added = []
+        for product_id, vendor_id in rows:
+            key = str(product_id)
+            present.add(key)
+            if key not in live:
+                added.append((key, str(vendor_id)))
+        return added, live - present
+
+    def apply(self, added: Iterable[Tuple[Any, Any]], removed: Iterable[Any]):
+        for product_id, vendor_id in added:
+            self.add(product_id, vendor_id)
+        for product_id in removed:
+            self.remove(product_id)
+        self.refreshed_at = time.monotonic()
+
+    def sync(self, rows: Iterable[Tuple[Any, Any]]):
+        """Reconcile with (id, vendor_id) rows read from the database"""
+        self.apply(*self.changes(rows, set(self.live)))
+
+
+class FeedEngine:
+    """Serves each closet the next unseen products of its preferred vendors.
+
+    Seen products are a bitmap over catalog ordinals per closet, built from
+    the closet's swipe history and then brought up to date on every page
+    with the swipes recorded since (by any process), so the cost of a page
+    doesn't depend on how many swipes a user has made. Candidates (the
+    ordinals of a set of vendors, in order) are shared between closets and
+    only extended when new products arrive. Each closet keeps a position in
+    its candidate list; products served but not swiped come round again after
+    the list wraps.
+    """
+
+    def __init__(self, refresh_seconds: float = CATALOG_REFRESH_SECONDS,
+                 max_closets: int = MAX_CACHED_CLOSETS):
+        self.refresh_seconds = refresh_seconds
+        self.max_closets = max_closets
+        self.catalog = CatalogIndex()
+        self._closets: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._candidates: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        # Held for the duration of a catalog scan, which runs outside _lock
+        self._refresh_lock = threading.Lock()
+
+    def next_page(self, closet: Any, vendor_ids: Iterable[Any], limit: int) -> List[str]:
+        """Ids of up to limit products the closet hasn't swiped on, in feed order"""
+        self._refresh_catalog()
+        key = str(closet.id)
+        while True:
+            with self._lock:
+                state = self._closets.get(key)
+                after = state["swipe_id"] if state is not None else 0
+                read_at = state["read_at"] if state is not None else None
+            # Taken before the query, so swipes still uncommitted during it are read again next time
+            now = datetime.datetime.utcnow()
+            # Read without the lock, so other closets' pages aren't held up by this query
+            swipes = swipes_since(closet.id, after, read_at)
+            with self._lock:
+                if self._closets.get(key) is not state:
+                    # Built or dropped by a concurrent request meanwhile; start over from its state
+                    continue
+                if state is None:
+                    state = self._new_closet_state(key)
+                self._closets.move_to_end(key)
+                for swipe_id, product_id in swipes:
+                    self._mark(state, product_id)
+                    state["swipe_id"] = max(state["swipe_id"], swipe_id)
+                state["read_at"] = now
+                if state["pending"] and state["catalog_version"] != self.catalog.version:
+                    for product_id in state["pending"].copy():
+                        self._mark(state, product_id)
+                state["catalog_version"] = self.catalog.version
+                return self._page(state, vendor_ids, limit)
+
+    def mark_seen(self, closet_id: Any, product_ids: Iterable[Any]):
+        """Record swipes for a closet whose bitmap is cached"""
+        with self._lock:
+            state = self._closets.get(str(closet_id))
+            if state is None:
+                # Built from the stored swipe history on the next request
+                return
+            for product_id in product_ids:
+                self._mark(state, product_id)
+
+    def product_added(self, product_id: Any, vendor_id: Any):
+        with self._lock:
+            self.catalog.add(product_id, vendor_id)
+
+    def product_removed(self, product_id: Any):
+        with self._lock:
+            self.catalog.remove(product_id)
+
+    def forget_closet(self, closet_id: Any):
+        """Drop a cached bitmap, e.g. after the closet's swipes were reset"""
+        with self._lock:
+            self._closets.pop(str(closet_id), None)
+
+    def _refresh_catalog(self):
+        """Pick up products written by other processes, scanning the ids without holding the lock"""
+        if time.monotonic() - self.catalog.refreshed_at < self.refresh_seconds:
+            return
+        # One scan at a time; other requests carry on with the current index,
+        # except before the first scan, when there is nothing to serve yet
+        if not self._refresh_lock.acquire(blocking=self.catalog.refreshed_at == float('-inf')):
+            return
+        try:
+            if time.monotonic() - self.catalog.refreshed_at < self.refresh_seconds:
+                return
+            with self._lock:
+                # Taken before the scan: products added meanwhile are never mistaken for removed ones
+                live = set(self.catalog.live)
+            added, removed = CatalogIndex.changes(
+                db.session.query(Product.id, Product.vendor_id).yield_per(5000), live
+            )
+            with self._lock:
+                self.catalog.apply(added, removed)
+        finally:
+            self._refresh_lock.release()
+
+    def _new_closet_state(self, key: str) -> Dict[str, Any]:
+        # pending: swiped products not in the catalog index yet, marked once they arrive
+        state = {"seen": bytearray(), "position": 0, "swipe_id": 0, "read_at": None, "pending": set(),
+                 "catalog_version": self.catalog.version}
+        self._closets[key] = state
+        while len(self._closets) > self.max_closets:
+            self._closets.popitem(last=False)
+        return state
+
+    def _mark(self, state: Dict[str, Any], product_id: Any):
+        key = str(product_id)
+        ordinal = self.catalog.ordinals.get(key)
+        if ordinal is None:
+            state["pending"].add(key)
+            return
+        _set_bit(state["seen"], ordinal)
+        state["pending"].discard(key)
+
+    def _page(self, state: Dict[str, Any], vendor_ids: Iterable[Any], limit: int) -> List[str]:
+        candidates = self._vendor_candidates(vendor_ids)
+        seen = state["seen"]
+        ids = self.catalog.ids
+
+        page = []
+        total = len(candidates)
+        position = state["position"] % total if total else 0
+        for _ in range(total):
+            ordinal = candidates[position]
+            position = (position + 1) % total
+            if ids[ordinal] is not None and not _has_bit(seen, ordinal):
+                page.append(ids[ordinal])
+                if len(page) >= limit:
+                    break
+        state["position"] = position
+        return page
+
+    def _vendor_candidates(self, vendor_ids: Iterable[Any]) -> List[int]:
+        """Ordinals of the given vendors' products, extended with products added since the last call"""
+        vendors = tuple(sorted({str(vendor_id) for vendor_id in vendor_ids}))
+        entry = self._candidates.get(vendors)
+        if entry is None:
+            entry = {"ordinals": [], "indexed": {vendor: 0 for vendor in vendors}}
+            self._candidates[vendors] = entry
+        if entry.get("version") != self.catalog.version:
+            # Each vendor list only grows at the end, so only the new tail needs merging in
+            new = []
+            for vendor in vendors:
+                ordinals = self.catalog.by_vendor.get(vendor, [])
+                new.append(ordinals[entry["indexed"][vendor]:])
+                entry["indexed"][vendor] = len(ordinals)
+            entry["ordinals"].extend(heapq.merge(*new))
+            entry["version"] = self.catalog.version
+        return entry["ordinals"]
+
+
+def _set_bit(bitmap: bytearray, ordinal: int):
+    index = ordinal >> 3
+    if index >= len(bitmap):
+        bitmap.extend(bytes(index + 1 - len(bitmap)))
+    bitmap[index] |= 1 << (ordinal & 7)
+
+
+def _has_bit(bitmap: bytearray, ordinal: int) -> bool:
+    index = ordinal >> 3
+    return index < len(bitmap) and bool(bitmap[index] & (1 << (ordinal & 7)))
+
+
+# One engine per process, shared by the controllers
+feed_engine = FeedEngine()
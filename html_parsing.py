@@ -0,0 +1,82 @@
+from typing import Iterable, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from pagination import PAGINATION_CLASSES
+
+# lxml is several times faster than the stdlib parser; fall back when it isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+class SubtreeStrainer(SoupStrainer):
+    """Only build the subtrees rooted at elements with one of the given classes, ids or attributes.
+
+    Everything outside those subtrees (scripts, header, footer, recommendations...)
+    is skipped by the tree builder, so it never becomes Tag objects.
+    """
+
+    def __init__(self, classes: Iterable[str] = (), ids: Iterable[str] = (), attributes: Iterable[str] = ()):
+        super().__init__()
+        self.classes = frozenset(classes)
+        self.ids = frozenset(ids)
+        self.attributes = frozenset(attributes)
+
+    def _wanted(self, attrs) -> bool:
+        if not attrs:
+            return False
+        if attrs.get('id') in self.ids:
+            return True
+        if any(attribute in attrs for attribute in self.attributes):
+            return True
+        classes = attrs.get('class') or ()
+        if isinstance(classes, str):
+            classes = classes.split()
+        return not self.classes.isdisjoint(classes)
+
+    # beautifulsoup4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return self._wanted(attrs)
+
+    def allow_string_creation(self, string) -> bool:
+        return False
+
+    # beautifulsoup4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        if not isinstance(markup_attrs, dict):
+            markup_attrs = dict(markup_attrs or ())
+        return markup_name if self._wanted(markup_attrs) else None
+
+    def search(self, markup):
+        return None
+
+
+def make_soup(markup: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse markup with the fastest available parser, optionally restricted to parse_only"""
+    return BeautifulSoup(markup, HTML_PARSER, parse_only=parse_only)
+
+
+# Everything LeaClothingScraper.extract_product_data reads from a product page
+LEA_PRODUCT_PAGE = SubtreeStrainer(
+    classes=[
+        'ProductMeta__PriceList', 'ProductMeta__Price', 'price', 'compare-at-price',
+        'Product__SlideItem', 'ProductItem',
+        'jdgm-prev-badge', 'ks-table-wrapper',
+        'SizeSwatchList', 'ColorSwatchList',
+    ],
+    ids=['description', 'pro-details', 'vendor-details'],
+    attributes=['data-product-price', 'data-compare-price'],
+)
+
+# Product cards and pagination links on a Lea collection page
+LEA_COLLECTION_PAGE = SubtreeStrainer(classes=['ProductItem'] + PAGINATION_CLASSES, attributes=['rel'])
+
+# Description and size chart on a BurgerBae product page
+BURGERBAE_PRODUCT_PAGE = SubtreeStrainer(classes=['collapsible__content', 'product-popup-modal__content-info'])
+
+# Product cards and pagination links on a BurgerBae collection page
+BURGERBAE_COLLECTION_PAGE = SubtreeStrainer(classes=['product-card', 'product-item'] + PAGINATION_CLASSES,
+                                            attributes=['rel'])
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+
+class HTTPCache:
+    """On-disk response cache with validators, a freshness TTL and size-bounded LRU eviction.
+
+    Besides the compressed body, each entry can hold the dict a scraper
+    extracted from it, so an unchanged page never has to be parsed again.
+    Extracted dicts are stored with extractor_version and only handed back
+    while it matches, so a change to the extraction code or its taxonomy
+    gets every page parsed again.
+    """
+
+    def __init__(self, path: str = "http_cache.sqlite3", ttl: float = 3600,
+                 max_bytes: int = 256 * 1024 * 1024, extractor_version: Optional[str] = None):
+        self.path = path
+        # Entries younger than ttl seconds are reused without asking the server
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.extractor_version = extractor_version
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                body BLOB,
+                extracted TEXT,
+                extractor_version TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(responses)")]
+        if "extractor_version" not in columns:
+            # Caches written before versioning; their extracted dicts never match a version
+            self._conn.execute("ALTER TABLE responses ADD COLUMN extractor_version TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for url, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body_hash, body, extracted, extractor_version, fetched_at"
+                " FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if not row:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        etag, last_modified, body_hash, body, extracted, extractor_version, fetched_at = row
+        if extractor_version != self.extractor_version:
+            # Extracted by other code, the body has to be parsed again
+            extracted = None
+        return {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_hash": body_hash,
+            "body": zlib.decompress(body).decode("utf-8") if body else "",
+            "extracted": json.loads(extracted) if extracted else None,
+            "fetched_at": fetched_at,
+        }
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidating entry"""
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def touch(self, url: str):
+        """Mark url as revalidated and recently used"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url)
+            )
+            self._conn.commit()
+
+    def store(self, url: str, response: requests.Response) -> bool:
+        """Store a 200 response; returns True when the body hash matches the cached one"""
+        text = response.text
+        body_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        body = zlib.compress(text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body_hash, extracted, extractor_version, size FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            unchanged = bool(row and row[0] == body_hash)
+            # The extracted dict is only still valid if the page didn't change
+            extracted, extractor_version = (row[1], row[2]) if unchanged else (None, None)
+            old_size = row[3] if row else 0
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (url, etag, last_modified, body_hash, body, extracted, extractor_version, size,
+                     fetched_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    url,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    body_hash,
+                    body,
+                    extracted,
+                    extractor_version,
+                    len(body) + len(extracted or ""),
+                    now,
+                    now,
+                ),
+            )
+            self._total_bytes += len(body) + len(extracted or "") - old_size
+            self._evict()
+            self._conn.commit()
+        return unchanged
+
+    def save_extracted(self, url: str, extracted: Dict[str, Any]):
+        """Attach the dict extracted from the cached body of url, tagged with the extractor version"""
+        data = json.dumps(extracted, ensure_ascii=False)
+        with self._lock:
+            row = self._conn.execute("SELECT size, extracted FROM responses WHERE url = ?", (url,)).fetchone()
+            if not row:
+                return
+            size = row[0] - len(row[1] or "") + len(data)
+            self._conn.execute(
+                "UPDATE responses SET extracted = ?, extractor_version = ?, size = ? WHERE url = ?",
+                (data, self.extractor_version, size, url),
+            )
+            self._total_bytes += size - row[0]
+            self._evict()
+            self._conn.commit()
+
+    def resolve(self, url: str, entry: Optional[Dict[str, Any]],
+                response: requests.Response) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Turn a (possibly conditional) response into (body to parse, previously extracted dict).
+
+        Exactly one of the two is set: the extracted dict when the page is
+        unchanged (304 or same body hash), otherwise the body text.
+        """
+        if response.status_code == 304 and entry is not None:
+            self.touch(url)
+            if entry["extracted"] is not None:
+                return None, entry["extracted"]
+            return entry["body"], None
+
+        unchanged = self.store(url, response)
+        if unchanged and entry is not None and entry["extracted"] is not None:
+            return None, entry["extracted"]
+        return response.text, None
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes (lock held)"""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT url, size FROM responses ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for url, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    return
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
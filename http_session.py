@@ -0,0 +1,89 @@
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that keeps connection counters of pools it has already discarded"""
+
+    def __init__(self, *args, **kwargs):
+        self._stats_lock = threading.Lock()
+        self._disposed = {"requests": 0, "connections": 0}
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        pools = self.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def dispose_and_count(pool):
+            with self._stats_lock:
+                self._disposed["requests"] += pool.num_requests
+                self._disposed["connections"] += pool.num_connections
+            if dispose:
+                dispose(pool)
+
+        pools.dispose_func = dispose_and_count
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Requests sent, TCP connections opened and connections reused through this adapter"""
+        with self._stats_lock:
+            sent = self._disposed["requests"]
+            opened = self._disposed["connections"]
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                sent += pool.num_requests
+                opened += pool.num_connections
+        return {"requests": sent, "connections": opened, "reused": max(0, sent - opened)}
+
+
+class TransportRetry(Retry):
+    """Retry that hands 429 back to the caller even when it carries Retry-After"""
+
+    RETRY_AFTER_STATUS_CODES = frozenset({413, 503})
+
+
+def build_session(pool_size: int = 10, max_retries: int = 3, backoff_factor: float = 0.5,
+                  headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """Create a keep-alive session with a bounded connection pool and transport-level retries.
+
+    Connection errors and 500/502/503/504 on idempotent requests are retried
+    by urllib3. 429 is left to the caller so the rate limiter can react to it.
+    """
+    retries = TransportRetry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = PooledHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def connection_stats(session: requests.Session) -> Dict[str, int]:
+    """Aggregate connection reuse counters across every pooled adapter mounted on session"""
+    totals = {"requests": 0, "connections": 0, "reused": 0}
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen or not isinstance(adapter, PooledHTTPAdapter):
+            continue
+        seen.add(id(adapter))
+        for key, value in adapter.connection_stats().items():
+            totals[key] += value
+    return totals
@@ -0,0 +1,296 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+
+from http_session import build_session, connection_stats
+from pipeline import run_pipeline
+from product_stream import NDJSONWriter, finalize_json_array, iter_products
+from rate_limiter import HostRateLimiter
+
+# Pillow is only needed by the worker processes that resize images
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Renditions made of every product image: cropped to fill exactly size (width, height)
+DERIVATIVES = {
+    "card": {"size": (720, 960), "format": "WEBP", "quality": 80},
+    "card_jpeg": {"size": (720, 960), "format": "JPEG", "quality": 82},
+    "thumb": {"size": (240, 320), "format": "WEBP", "quality": 75},
+}
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg", "PNG": "png"}
+
+# Products whose images are processed together; output keeps the input order
+BATCH_SIZE = 500
+
+
+def original_path(root: str, digest: str) -> str:
+    return os.path.join(root, "originals", digest[:2], digest)
+
+
+def derivative_path(root: str, digest: str, name: str, spec: Dict[str, Any]) -> str:
+    return os.path.join(root, "derivatives", name, digest[:2], f"{digest}.{EXTENSIONS[spec['format']]}")
+
+
+def _write_atomic(path: str, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def stored_derivatives(root: str, digest: str, specs: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, str]]:
+    """make_derivatives' result when every derivative already exists, None otherwise"""
+    paths = {name: derivative_path(root, digest, name, spec) for name, spec in specs.items()}
+    if not all(os.path.exists(path) for path in paths.values()):
+        return None
+    return {"hash": digest, **{name: os.path.relpath(path, root) for name, path in paths.items()}}
+
+
+def make_derivatives(root: str, digest: str, specs: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """Render the missing derivatives of a stored original; returns {"hash", name: path relative to root}"""
+    if Image is None:
+        raise RuntimeError("Pillow is required to make image derivatives (pip install Pillow)")
+    paths = {name: derivative_path(root, digest, name, spec) for name, spec in specs.items()}
+    missing = {name: spec for name, spec in specs.items() if not os.path.exists(paths[name])}
+    if missing:
+        with Image.open(original_path(root, digest)) as image:
+            # JPEG can decode straight at a reduced scale when the targets are much smaller
+            largest = max(spec["size"] for spec in missing.values())
+            image.draft("RGB", largest)
+            image = ImageOps.exif_transpose(image)
+            for name, spec in missing.items():
+                rendition = ImageOps.fit(image, spec["size"], Image.Resampling.LANCZOS)
+                if spec["format"] == "JPEG" and rendition.mode != "RGB":
+                    rendition = rendition.convert("RGB")
+                elif rendition.mode not in ("RGB", "RGBA"):
+                    rendition = rendition.convert("RGBA")
+                _write_atomic(paths[name], lambda path: rendition.save(
+                    path, spec["format"], quality=spec.get("quality", 80)
+                ))
+    return {"hash": digest, **{name: os.path.relpath(path, root) for name, path in paths.items()}}
+
+
+class ImageStore:
+    """Content-addressed image files plus an index of which URL holds which content.
+
+    Originals are stored once per SHA-256 of their bytes, so the same image
+    served under several URLs (variants, sizes) is kept and resized once.
+    """
+
+    def __init__(self, root: str = "image_store"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS images (url TEXT PRIMARY KEY, digest TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Digest of the content already downloaded from url"""
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM images WHERE url = ?", (url,)).fetchone()
+        if row and os.path.exists(original_path(self.root, row[0])):
+            return row[0]
+        return None
+
+    def put(self, url: str, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = original_path(self.root, digest)
+        if not os.path.exists(path):
+            def write(tmp_path):
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+            _write_atomic(path, write)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO images (url, digest, fetched_at) VALUES (?, ?, ?)", (url, digest, time.time())
+            )
+            self._conn.commit()
+        return digest
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ImagePipeline:
+    """Downloads product images once and renders fixed-size derivatives on a process pool.
+
+    Downloads run on fetch_workers threads through a pooled session and the
+    per-host rate limiter; resizing runs in worker processes, one pool kept
+    for every batch until close(). Local paths and file:// URLs are read from
+    disk, which is how fixture images are run through it.
+    """
+
+    def __init__(self, store_root: str = "image_store", specs: Optional[Dict[str, Dict[str, Any]]] = None,
+                 fetch_workers: int = 8, parse_workers: Optional[int] = None,
+                 requests_per_second: float = 10.0, timeout: float = 30.0):
+        self.store = ImageStore(store_root)
+        self.specs = specs or DERIVATIVES
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.timeout = timeout
+        self.session = build_session(pool_size=fetch_workers)
+        self.rate_limiter = HostRateLimiter(requests_per_second=requests_per_second, burst=fetch_workers)
+        self.stats = {"images": 0, "downloaded": 0, "reused": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+
+    def process_urls(self, urls: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        """{url: {"hash", derivative name: path}} for every image that could be fetched and decoded"""
+        # digest -> the URL whose fetch renders it, so content seen under several URLs is resized once
+        claimed: Dict[str, str] = {}
+        results = dict(run_pipeline(
+            dict.fromkeys(urls), partial(self._fetch, claimed), make_derivatives,
+            fetch_workers=self.fetch_workers, parse_pool=self._pool(),
+        ))
+        for url, result in list(results.items()):
+            if "same_as" in result:
+                rendered = results.get(result["same_as"])
+                if rendered is None:
+                    del results[url]
+                else:
+                    results[url] = rendered
+        return results
+
+    def process_products(self, products: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield products with meta.imageDerivatives set, one entry per image in images order"""
+        batch: List[Dict[str, Any]] = []
+        for product in products:
+            batch.append(product)
+            if len(batch) >= BATCH_SIZE:
+                yield from self._annotate(batch)
+                batch = []
+        if batch:
+            yield from self._annotate(batch)
+
+    def process_catalog(self, input_path: str, output_path: str) -> Dict[str, Any]:
+        """Run a catalog dump (JSON array or NDJSON) through the pipeline into NDJSON or a JSON array"""
+        started = time.monotonic()
+        ndjson_path = output_path + '.ndjson.tmp'
+        with NDJSONWriter(ndjson_path, flush_every=BATCH_SIZE, fsync=False) as writer:
+            for product in self.process_products(iter_products(input_path)):
+                writer.write(product)
+        if output_path.endswith('.json'):
+            finalize_json_array(ndjson_path, output_path)
+            os.remove(ndjson_path)
+        else:
+            os.replace(ndjson_path, output_path)
+        return self.report(time.monotonic() - started)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        return {**self.stats, "elapsed_s": round(elapsed, 2), "connections": connection_stats(self.session)}
+
+    def _annotate(self, batch: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        urls = [url for product in batch for url in product.get("images") or []]
+        results = self.process_urls(urls)
+        for product in batch:
+            meta = dict(product.get("meta") or {})
+            meta["imageDerivatives"] = [
+                {"src": url, **results[url]} for url in product.get("images") or [] if url in results
+            ]
+            yield {**product, "meta": meta}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers or os.cpu_count())
+        return self._parse_pool
+
+    def _fetch(self, claimed: Dict[str, str],
+               url: str) -> Union[None, Dict[str, str], Tuple[str, str, Dict[str, Dict[str, Any]]]]:
+        """Make sure url's content is in the store; returns its derivatives if they exist, else make_derivatives arguments.
+
+        When another URL of this run already renders the same content, returns
+        {"hash", "same_as": that URL} and process_urls copies its result.
+        """
+        self._count("images")
+        digest = self.store.lookup(url)
+        if digest is not None:
+            self._count("reused")
+            stored = stored_derivatives(self.store.root, digest, self.specs)
+            if stored is not None:
+                return stored
+        else:
+            try:
+                data = self._download(url)
+            except (OSError, requests.RequestException) as e:
+                logger.warning(f"Error downloading image {url}: {str(e)}")
+                data = None
+            if data is None:
+                self._count("failed")
+                return None
+            self._count("downloaded")
+            digest = self.store.put(url, data)
+        # setdefault is atomic, so exactly one of the fetch threads claims a digest
+        owner = claimed.setdefault(digest, url)
+        if owner != url:
+            return {"hash": digest, "same_as": owner}
+        return self.store.root, digest, self.specs
+
+    def _download(self, url: str) -> Optional[bytes]:
+        parts = urlparse(url)
+        if parts.scheme in ('', 'file'):
+            path = parts.path if parts.scheme == 'file' else url
+            with open(path, 'rb') as f:
+                return f.read()
+        self.rate_limiter.acquire(url)
+        response = self.session.get(url, timeout=self.timeout)
+        self.rate_limiter.record_response(url, response.status_code, response.headers.get('Retry-After'))
+        if response.status_code != 200:
+            logger.warning(f"Status {response.status_code} downloading image {url}")
+            return None
+        return response.content
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def close(self):
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+        self.store.close()
+        self.session.close()
+
+
+def main():
+    # Configuration
+    INPUT_PATH = "./LEA/lea_products.json"
+    OUTPUT_PATH = "./LEA/lea_products_images.ndjson"
+    STORE_ROOT = "./image_store"
+
+    pipeline = ImagePipeline(STORE_ROOT)
+    try:
+        report = pipeline.process_catalog(INPUT_PATH, OUTPUT_PATH)
+        logger.info(
+            f"Images: {report['images']} ({report['downloaded']} downloaded, {report['reused']} already stored, "
+            f"{report['failed']} failed) in {report['elapsed_s']} s"
+        )
+        logger.info(f"Connection stats: {report['connections']}")
+    finally:
+        pipeline.close()
+
+
+if __name__ == "__main__":
+    main()
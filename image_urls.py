@@ -0,0 +1,90 @@
+import re
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# Width substituted for Shopify's {width} placeholder when the page doesn't give one
+DEFAULT_IMAGE_WIDTH = 800
+
+# Query parameters Shopify's CDN only uses for cache busting
+CACHE_BUSTING_PARAMS = {'v'}
+
+# Size parameters and filename suffixes that select a rendition of the same image
+_SIZE_PARAMS = {'width', 'height', 'crop'}
+_SIZE_SUFFIX = re.compile(r'_(?:\{width\}|\d+)x\d*(?=\.\w+$)')
+
+
+def largest_from_srcset(srcset: Optional[str]) -> Optional[str]:
+    """URL of the widest candidate in a srcset ("url 400w, url 800w" or "url 1x, url 2x")"""
+    largest_url = None
+    largest_width = -1.0
+    for candidate in (srcset or '').split(','):
+        parts = candidate.split()
+        if not parts:
+            continue
+        width = 0.0
+        if len(parts) > 1 and parts[-1][-1:] in ('w', 'x'):
+            try:
+                width = float(parts[-1][:-1])
+            except ValueError:
+                pass
+        if width > largest_width:
+            largest_width = width
+            largest_url = parts[0]
+    return largest_url
+
+
+def shopify_cdn(url: str) -> bool:
+    parts = urlparse(url)
+    return parts.netloc == 'cdn.shopify.com' or parts.path.startswith('/cdn/shop/')
+
+
+@lru_cache(maxsize=65536)
+def canonical_image_url(url: str, base_url: Optional[str] = None, width: Optional[int] = None) -> str:
+    """Absolute https URL, with Shopify's {width} placeholder filled in and cache-busting parameters dropped"""
+    url = url.strip()
+    if url.startswith('//'):
+        url = 'https:' + url
+    elif url.startswith('/') and base_url:
+        url = base_url.rstrip('/') + url
+    if '{width}' in url:
+        url = url.replace('{width}', str(width or DEFAULT_IMAGE_WIDTH))
+    if not shopify_cdn(url):
+        return url
+    parts = urlparse(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key not in CACHE_BUSTING_PARAMS]
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+@lru_cache(maxsize=65536)
+def image_identity(url: str) -> str:
+    """The image a URL shows, whatever rendition size it asks for"""
+    parts = urlparse(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key not in _SIZE_PARAMS and key not in CACHE_BUSTING_PARAMS]
+    return urlunparse(parts._replace(path=_SIZE_SUFFIX.sub('', parts.path), query=urlencode(query)))
+
+
+def normalize_images(urls: Iterable[Optional[str]], base_url: Optional[str] = None,
+                     width: Optional[int] = None) -> List[str]:
+    """Canonical URLs in order, keeping only the first rendition of each image"""
+    images = []
+    seen = set()
+    for url in urls:
+        if not url:
+            continue
+        canonical = canonical_image_url(url, base_url, width)
+        identity = image_identity(canonical)
+        if identity not in seen:
+            seen.add(identity)
+            images.append(canonical)
+    return images
+
+
+def srcset_image(element: Any, base_url: Optional[str] = None) -> Optional[str]:
+    """Largest image in an <img>'s data-srcset (or srcset), as a canonical URL"""
+    if element is None:
+        return None
+    url = largest_from_srcset(element.get('data-srcset') or element.get('srcset'))
+    return canonical_image_url(url, base_url) if url else None
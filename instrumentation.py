@@ -0,0 +1,195 @@
+import bisect
+import functools
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from flask import g, has_request_context, make_response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in milliseconds (the last bucket is unbounded)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Fraction of ordinary requests written to the log; slow and failed ones always are
+LOG_SAMPLE_RATE = 0.01
+
+# Requests slower than this are logged at WARNING
+SLOW_REQUEST_MS = 500
+
+
+class Histogram:
+    """Fixed-bucket histogram: constant memory and an O(log buckets) observe"""
+
+    def __init__(self, bounds: Iterable[float] = LATENCY_BUCKETS_MS):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of observations"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 2) if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": round(self.max, 2),
+            "buckets": {str(bound): count for bound, count in zip(self.bounds + ["+Inf"], self.counts)},
+        }
+
+
+class Instrumentation:
+    """Per-endpoint request metrics: latency, database queries, rows and response bytes.
+
+    Controllers are wrapped with instrumented(); database queries are
+    counted through SQLAlchemy engine events and attributed to the request
+    running them. Streamed responses are measured when they finish.
+    """
+
+    def __init__(self, sample_rate: float = LOG_SAMPLE_RATE, slow_ms: float = SLOW_REQUEST_MS):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.started = time.time()
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def instrumented(self, name: str) -> Callable:
+        def decorator(controller: Callable) -> Callable:
+            @functools.wraps(controller)
+            def wrapper(*args, **kwargs):
+                stats = {"endpoint": name, "queries": 0, "query_ms": 0.0, "rows": 0, "bytes": 0,
+                         "started": time.perf_counter()}
+                g.request_stats = stats
+                try:
+                    response = make_response(controller(*args, **kwargs))
+                except Exception:
+                    stats["status"] = 500
+                    self._record(stats)
+                    raise
+                stats["status"] = response.status_code
+                if response.is_streamed:
+                    response.response = _counting(response.response, stats)
+                    response.call_on_close(lambda: self._record(stats))
+                else:
+                    stats["bytes"] = response.content_length or 0
+                    self._record(stats)
+                return response
+            return wrapper
+        return decorator
+
+    def _record(self, stats: Dict[str, Any]):
+        latency_ms = (time.perf_counter() - stats["started"]) * 1000
+        with self._lock:
+            endpoint = self._endpoints.get(stats["endpoint"])
+            if endpoint is None:
+                endpoint = self._endpoints[stats["endpoint"]] = {
+                    "requests": 0, "errors": 0, "queries": 0, "query_ms": 0.0, "rows": 0, "bytes": 0,
+                    "latency_ms": Histogram(), "query_ms_per_request": Histogram(),
+                }
+            endpoint["requests"] += 1
+            endpoint["errors"] += int(stats["status"] >= 500)
+            for key in ("queries", "query_ms", "rows", "bytes"):
+                endpoint[key] += stats[key]
+            endpoint["latency_ms"].observe(latency_ms)
+            endpoint["query_ms_per_request"].observe(stats["query_ms"])
+
+        if stats["status"] >= 500 or latency_ms >= self.slow_ms:
+            level = logging.WARNING
+        elif random.random() < self.sample_rate:
+            level = logging.INFO
+        else:
+            return
+        if logger.isEnabledFor(level):
+            fields = {key: value for key, value in stats.items() if key != "started"}
+            fields["query_ms"] = round(fields["query_ms"], 2)
+            fields["latency_ms"] = round(latency_ms, 2)
+            logger.log(level, json.dumps(fields))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {
+                name: {
+                    key: value.snapshot() if isinstance(value, Histogram) else (round(value, 2) if isinstance(value, float) else value)
+                    for key, value in endpoint.items()
+                }
+                for name, endpoint in self._endpoints.items()
+            }
+        return {"uptime_s": round(time.time() - self.started, 1), "endpoints": endpoints}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+def count_rows(count: int):
+    """Add to the rows reported for the current request"""
+    stats = _request_stats()
+    if stats is not None:
+        stats["rows"] += count
+
+
+def _request_stats() -> Optional[Dict[str, Any]]:
+    return g.get("request_stats") if has_request_context() else None
+
+
+def _counting(chunks: Iterable[bytes], stats: Dict[str, Any]):
+    for chunk in chunks:
+        stats["bytes"] += len(chunk)
+        yield chunk
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's execution context, which goes away with it even when the statement fails
+    if context is not None and _request_stats() is not None:
+        context._instrumentation_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _count_query(context)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't run for a statement that raised; it still counts
+    _count_query(exception_context.execution_context)
+
+
+def _count_query(context):
+    stats = _request_stats()
+    started = getattr(context, "_instrumentation_started", None)
+    if stats is not None and started is not None:
+        del context._instrumentation_started
+        stats["queries"] += 1
+        stats["query_ms"] += (time.perf_counter() - started) * 1000
+
+
+# One registry per process, shared by the controllers
+instrumentation = Instrumentation()
+instrumented = instrumentation.instrumented
@@ -0,0 +1,96 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse, urlunparse
+
+from bs4 import BeautifulSoup
+
+# Upper bound when following next links, in case a theme links pages in a cycle
+MAX_PAGES = 500
+
+# Pagination containers used by Shopify themes (Prestige, Dawn, Debut...)
+PAGINATION_CLASSES = [
+    'pagination', 'Pagination', 'Pagination__Nav', 'pagination__list', 'pagination-wrapper',
+]
+
+_NEXT_SELECTORS = 'link[rel~="next"], a[rel~="next"], a.pagination__next, a.Pagination__NavItem--next'
+
+
+def page_url(url: str, page: int) -> str:
+    """url with its ?page= query parameter set to page, keeping other parameters"""
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+    query['page'] = [str(page)]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+
+def page_number(url: str) -> int:
+    """Value of the ?page= parameter, 1 when absent"""
+    values = parse_qs(urlparse(url).query).get('page')
+    if values and re.fullmatch(r'\d+', values[0]):
+        return int(values[0])
+    return 1
+
+
+def discover_pages(soup: BeautifulSoup, url: str) -> Tuple[Optional[int], Optional[str]]:
+    """Find (last page number, next page URL) in a collection page's markup.
+
+    The last page is the highest ?page=N among links to the same collection;
+    themes that only render a "next" link give (None, next URL).
+    """
+    path = urlparse(url).path.rstrip('/')
+    last_page = None
+    for link in soup.find_all('a', href=True):
+        href = urljoin(url, link['href'])
+        if urlparse(href).path.rstrip('/') != path or 'page=' not in href:
+            continue
+        number = page_number(href)
+        if last_page is None or number > last_page:
+            last_page = number
+
+    next_url = None
+    next_link = soup.select_one(_NEXT_SELECTORS)
+    if next_link and next_link.get('href'):
+        next_url = urljoin(url, next_link['href'])
+    return last_page, next_url
+
+
+def iter_pages(fetch: Callable[[str], Any], first_url: str, workers: int = 4,
+               skip: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[int, str, Any]]:
+    """Yield (page number, page URL, soup) for every page of a paginated collection, in page order.
+
+    fetch(url) returns a parsed page or None. Whenever a page links to pages
+    further ahead, all pages up to the furthest one are fetched concurrently
+    on workers threads; otherwise next links are followed one by one. Pages
+    for which skip(url) is true are not yielded, and only fetched when their
+    links are needed to carry on.
+    """
+    number, url = 1, first_url
+    soup = fetch(first_url)
+    seen = {first_url}
+    if soup is not None and not (skip and skip(first_url)):
+        yield number, url, soup
+
+    while soup is not None and number < MAX_PAGES:
+        last_page, next_url = discover_pages(soup, url)
+        if last_page and last_page > number + 1:
+            batch = [page_url(first_url, n) for n in range(number + 1, min(last_page, MAX_PAGES) + 1)]
+            # The last page of the batch is always fetched, it may link further on
+            wanted = [u for u in batch[:-1] if not (skip and skip(u))] + batch[-1:]
+            seen.update(batch)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for batch_url, batch_soup in zip(wanted, pool.map(fetch, wanted)):
+                    if batch_soup is not None and not (skip and skip(batch_url)):
+                        yield page_number(batch_url), batch_url, batch_soup
+            number, url, soup = page_number(batch[-1]), batch[-1], batch_soup
+            continue
+
+        if not next_url and last_page == number + 1:
+            next_url = page_url(first_url, last_page)
+        if not next_url or next_url in seen:
+            return
+        seen.add(next_url)
+        number, url = number + 1, next_url
+        soup = fetch(next_url)
+        if soup is not None and not (skip and skip(next_url)):
+            yield number, url, soup
@@ -0,0 +1,92 @@
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def run_pipeline(items: Iterable[Any], fetch: Callable[[Any], Any], extract: Callable[..., Any],
+                 fetch_workers: int = 8, parse_workers: Optional[int] = None,
+                 queue_size: int = 64, parse_pool: Optional[Executor] = None) -> Iterator[Tuple[Any, Any]]:
+    """Fetch items on a thread pool and extract them on a process pool, yielding (item, result).
+
+    fetch(item) runs in a thread and returns one of:
+      - None: skip the item,
+      - a dict: already extracted (e.g. from a cache), yielded as is,
+      - a tuple: arguments for extract, which runs in a worker process.
+    extract must be a picklable module-level function. Both stages are
+    bounded by queue_size, so a slow parse stage stalls fetching instead of
+    buffering pages in memory. Results are yielded in completion order.
+
+    parse_pool is an executor owned by the caller, for running several
+    pipelines on the same worker processes; it is left running. Without it,
+    a process pool of parse_workers is started and shut down for this call.
+    """
+    fetched: queue.Queue = queue.Queue(maxsize=queue_size)
+
+    def produce():
+        slots = threading.BoundedSemaphore(fetch_workers)
+
+        def run(item):
+            try:
+                out = fetch(item)
+            except Exception as e:
+                logger.error(f"Error fetching {item!r}: {str(e)}")
+                out = None
+            finally:
+                slots.release()
+            # Blocks while the parse stage is behind
+            fetched.put((item, out))
+
+        try:
+            with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool:
+                for item in items:
+                    slots.acquire()
+                    fetch_pool.submit(run, item)
+        except Exception as e:
+            logger.error(f"Error producing pipeline items: {str(e)}")
+        finally:
+            fetched.put(_DONE)
+
+    producer = threading.Thread(target=produce, name="pipeline-fetch", daemon=True)
+    producer.start()
+
+    with ExitStack() as stack:
+        if parse_pool is None:
+            parse_pool = stack.enter_context(ProcessPoolExecutor(max_workers=parse_workers or os.cpu_count()))
+        pending = {}
+
+        def drain(return_when):
+            done, _ = wait(pending, timeout=0 if return_when is None else None,
+                           return_when=return_when or FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    yield item, future.result()
+                except Exception as e:
+                    logger.error(f"Error extracting {item!r}: {str(e)}")
+
+        while True:
+            entry = fetched.get()
+            if entry is _DONE:
+                break
+            item, out = entry
+            if out is None:
+                continue
+            if isinstance(out, dict):
+                yield item, out
+                continue
+            pending[parse_pool.submit(extract, *out)] = item
+            # Wait for a free slot when full, otherwise just hand over what's already done
+            yield from drain(FIRST_COMPLETED if len(pending) >= queue_size else None)
+
+        if pending:
+            yield from drain(ALL_COMPLETED)
+
+    producer.join()
@@ -1,9 +1,16 @@
 import json
+import os
 import requests
+import threading
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Iterable, List, Optional
 import logging
 
+from http_session import build_session, connection_stats
+from product_stream import NDJSONWriter, iter_ndjson
+from rate_limiter import HostRateLimiter
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,56 +31,163 @@ def load_products(file_path: str) -> list:
         logger.error(f"Error loading products from {file_path}: {str(e)}")
         raise
 
-def post_product(product: Dict[str, Any], api_url: str) -> bool:
-    """
-    Post a single product to the API
+class BulkPoster:
+    """Posts products on a pool of worker threads sharing one keep-alive session.
+
+    Requests are paced by an adaptive rate limiter that slows down on 429 and
+    503 responses (honouring Retry-After) and speeds up again while the API
+    keeps up; other 5xx responses and connection errors back off exponentially
+    for the product concerned only. Products that still fail after
+    max_attempts are appended to an NDJSON retry queue so a later run can
+    re-post just those.
     """
-    try:
-        logger.info(f"Posting product: {product['label']}")
-        response = requests.post(api_url, json=product)
-        
-        if response.status_code == 200:
-            logger.info(f"Successfully posted product: {product['label']}")
-            return True
-        else:
-            logger.error(f"Failed to post product {product['label']}. Status code: {response.status_code}")
+
+    def __init__(self, api_url: str, workers: int = 8, requests_per_second: float = 50.0,
+                 max_attempts: int = 5, backoff_factor: float = 0.5,
+                 retry_queue_path: str = "post_retry_queue.ndjson"):
+        self.api_url = api_url
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.retry_queue_path = retry_queue_path
+        self.session = build_session(pool_size=workers)
+        self.rate_limiter = HostRateLimiter(
+            requests_per_second=requests_per_second, burst=workers, increase_step=2.0
+        )
+        self._lock = threading.Lock()
+        self._retry_queue: Optional[NDJSONWriter] = None
+        self.stats = {"posted": 0, "failed": 0, "retries": 0, "throttled": 0}
+        self.latencies: List[float] = []
+
+    def post(self, product: Dict[str, Any]) -> bool:
+        """Post one product, retrying throttled or failed requests with backoff"""
+        label = product.get('label')
+        for attempt in range(self.max_attempts):
+            if attempt > 0:
+                self._count("retries")
+            self.rate_limiter.acquire(self.api_url)
+            started = time.monotonic()
+            try:
+                response = self.session.post(self.api_url, json=product)
+            except requests.RequestException as e:
+                logger.warning(f"Error posting product {label} (attempt {attempt + 1}/{self.max_attempts}): {str(e)}")
+                self._backoff(attempt)
+                continue
+            with self._lock:
+                self.latencies.append(time.monotonic() - started)
+
+            if response.status_code == 200:
+                self.rate_limiter.on_success(self.api_url)
+                return True
+            if response.status_code == 429 or response.status_code >= 500:
+                self._count("throttled")
+                logger.warning(
+                    f"Status {response.status_code} posting product {label} "
+                    f"(attempt {attempt + 1}/{self.max_attempts}), backing off"
+                )
+                if response.status_code in (429, 503):
+                    # The API is overloaded: every worker slows down
+                    self.rate_limiter.on_throttle(self.api_url, response.headers.get('Retry-After'))
+                else:
+                    self._backoff(attempt)
+                continue
+
+            # Other client errors won't succeed on a retry
+            logger.error(f"Failed to post product {label}. Status code: {response.status_code}")
             logger.error(f"Response: {response.text}")
             return False
-    except Exception as e:
-        logger.error(f"Error posting product {product['label']}: {str(e)}")
+
+        logger.error(f"Giving up on product {label} after {self.max_attempts} attempts")
         return False
 
+    def post_all(self, products: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Post every product concurrently and return the throughput report"""
+        started = time.monotonic()
+        self._retry_queue = NDJSONWriter(self.retry_queue_path, flush_every=1, append=True)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self.post, product): product for product in products}
+                for index, future in enumerate(as_completed(futures), 1):
+                    if future.result():
+                        self._count("posted")
+                    else:
+                        self._count("failed")
+                        with self._lock:
+                            self._retry_queue.write(futures[future])
+                    if index % 100 == 0:
+                        logger.info(f"Processed {index}/{len(futures)} products")
+        finally:
+            self._retry_queue.close()
+        return self.report(time.monotonic() - started)
+
+    def retry_failed(self) -> Dict[str, Any]:
+        """Re-post the products in the retry queue; those failing again are queued anew"""
+        if not os.path.exists(self.retry_queue_path):
+            logger.info("Retry queue is empty")
+            return self.report(0.0)
+        # Move the queue aside first so new failures don't mix with the ones being retried
+        processing_path = self.retry_queue_path + ".processing"
+        os.replace(self.retry_queue_path, processing_path)
+        report = self.post_all(list(iter_ndjson(processing_path)))
+        os.remove(processing_path)
+        return report
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        total = self.stats["posted"] + self.stats["failed"]
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000, 1)
+
+        return {
+            "total": total,
+            **self.stats,
+            "elapsed_s": round(elapsed, 2),
+            "products_per_s": round(total / elapsed, 1) if elapsed else None,
+            "latency_p50_ms": percentile(0.5),
+            "latency_p95_ms": percentile(0.95),
+            "final_rate": round(self.rate_limiter.current_rate(self.api_url), 1),
+            "connections": connection_stats(self.session),
+        }
+
+    def _backoff(self, attempt: int):
+        time.sleep(min(30, self.backoff_factor * (2 ** attempt)))
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+
 def main():
     # Configuration
     JSON_FILE_PATH = "./LEA/filtered_products.json"
-    API_URL = "http://127.0.0.1:5000/products"
+    # Upsert mode updates changed products and skips unchanged ones instead of inserting duplicates
+    API_URL = "http://127.0.0.1:5000/products?mode=upsert"
+    WORKERS = 8
+    # "retry" re-posts only the products left in the retry queue by earlier runs
+    MODE = "all"
     
+    poster = BulkPoster(API_URL, workers=WORKERS)
     try:
-        # Load products
-        products = load_products(JSON_FILE_PATH)
-        
-        # Track success/failure
-        total_products = len(products)
-        successful_posts = 0
-        failed_posts = 0
-        
-        # Post each product
-        for index, product in enumerate(products, 1):
-            logger.info(f"Processing product {index}/{total_products}")
-            
-            if post_product(product, API_URL):
-                successful_posts += 1
-            else:
-                failed_posts += 1
-            
-            # Add a small delay to avoid overwhelming the server
-            time.sleep(0.5)
+        if MODE == "retry":
+            report = poster.retry_failed()
+        else:
+            report = poster.post_all(load_products(JSON_FILE_PATH))
         
         # Print summary
         logger.info("\nPosting Summary:")
-        logger.info(f"Total products processed: {total_products}")
-        logger.info(f"Successful posts: {successful_posts}")
-        logger.info(f"Failed posts: {failed_posts}")
+        logger.info(f"Total products processed: {report['total']}")
+        logger.info(f"Successful posts: {report['posted']}")
+        logger.info(f"Failed posts: {report['failed']} (queued in {poster.retry_queue_path})")
+        logger.info(f"Retries: {report['retries']}, throttled responses: {report['throttled']}")
+        logger.info(
+            f"Throughput: {report['products_per_s']} products/s over {report['elapsed_s']} s "
+            f"(latency p50 {report['latency_p50_ms']} ms, p95 {report['latency_p95_ms']} ms, "
+            f"final rate {report['final_rate']} req/s)"
+        )
+        logger.info(f"Connection stats: {report['connections']}")
         
     except Exception as e:
         logger.error(f"An error occurred in the main process: {str(e)}")
@@ -0,0 +1,135 @@
+import json
+import os
+import textwrap
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+class NDJSONWriter:
+    """Append-only product writer: one JSON document per line, flushed and fsynced every flush_every products.
+
+    A crash loses at most the last flush_every products, and memory use
+    doesn't depend on how many products have been written.
+    """
+
+    def __init__(self, path: str, flush_every: int = 20, fsync: bool = True, append: bool = False):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.fsync = fsync
+        self.count = 0
+        self._unflushed = 0
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, product: Dict[str, Any]):
+        self._file.write(json.dumps(product, ensure_ascii=False))
+        self._file.write('\n')
+        self.count += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._unflushed = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_ndjson(products: Iterable[Optional[Dict[str, Any]]], path: str, flush_every: int = 20,
+                 append: bool = False) -> int:
+    """Stream products into an NDJSON file as they are produced; returns how many were written"""
+    with NDJSONWriter(path, flush_every=flush_every, append=append) as writer:
+        for product in products:
+            if product:
+                writer.write(product)
+    return writer.count
+
+
+def iter_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield products from an NDJSON file, skipping a torn last line left by a crash"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def iter_json_array(path: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the elements of a JSON array file one by one, reading it in chunks.
+
+    Memory use is bounded by the largest element rather than the file size.
+    Elements are expected to be objects or arrays, as in the product dumps.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip('\ufeff')
+        pos = 0
+        opened = False
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or (opened and buffer[pos] == ',')):
+                pos += 1
+            if pos >= len(buffer):
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise ValueError(f"Unexpected end of JSON array in {path}")
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            if not opened:
+                if buffer[pos] != '[':
+                    raise ValueError(f"{path} does not contain a JSON array")
+                opened = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The element runs past the buffer: read on and decode it again
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield element
+            pos = end
+
+
+def iter_products(path: str) -> Iterator[Dict[str, Any]]:
+    """Products from a JSON array dump or an NDJSON file, streamed"""
+    if path.endswith(('.ndjson', '.jsonl')):
+        return iter_ndjson(path)
+    return iter_json_array(path)
+
+
+def finalize_json_array(ndjson_path: str, json_path: str, ensure_ascii: bool = False) -> int:
+    """Stream an NDJSON file into the legacy pretty-printed JSON array; returns the product count.
+
+    The output is byte-for-byte what json.dump(products, f, indent=2,
+    ensure_ascii=ensure_ascii) would produce, without holding the list in
+    memory.
+    """
+    count = 0
+    tmp_path = json_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        for product in iter_ndjson(ndjson_path):
+            out.write('[\n' if count == 0 else ',\n')
+            out.write(textwrap.indent(json.dumps(product, indent=2, ensure_ascii=ensure_ascii), '  '))
+            count += 1
+        out.write('\n]' if count else '[]')
+    os.replace(tmp_path, json_path)
+    return count
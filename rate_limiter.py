@@ -0,0 +1,142 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a Retry-After header (seconds or HTTP date) into seconds to wait"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Token bucket with an adaptive refill rate (additive increase, multiplicative decrease)"""
+
+    def __init__(self, rate: float, burst: int, min_rate: float, max_rate: float,
+                 decrease_factor: float = 0.5, increase_step: float = 0.05, decrease_cooldown: float = 1.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        # Throttles arriving within this many seconds of a cut come from requests
+        # already in flight at the old rate, so they don't cut it again
+        self.decrease_cooldown = decrease_cooldown
+        self.decreased_at = float('-inf')
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        # Nothing refills before the end of a Retry-After block
+        if now <= self.updated_at:
+            return
+        elapsed = now - self.updated_at
+        self.tokens = min(float(self.burst), self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds the caller must wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            # Counted from the end of any block, so waiters are released one refill interval apart
+            return max(0.0, self.updated_at - now) + wait
+
+    def on_success(self):
+        """Slowly raise the rate while the server keeps accepting requests"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Cut the rate and drain the bucket after a 429 / Retry-After"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now - self.decreased_at >= self.decrease_cooldown:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self.decreased_at = now
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                self.updated_at = max(self.updated_at, self.blocked_until)
+
+
+class HostRateLimiter:
+    """Keeps one adaptive token bucket per host so every scraper request is paced per site"""
+
+    def __init__(self, requests_per_second: float = 1.0, burst: int = 3,
+                 min_rate: float = 0.05, max_rate: Optional[float] = None,
+                 decrease_factor: float = 0.5, increase_step: float = 0.05,
+                 decrease_cooldown: float = 1.0):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else requests_per_second * 4
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.decrease_cooldown = decrease_cooldown
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Get (or create) the bucket for the host of url"""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(
+                    rate=self.requests_per_second,
+                    burst=self.burst,
+                    min_rate=self.min_rate,
+                    max_rate=self.max_rate,
+                    decrease_factor=self.decrease_factor,
+                    increase_step=self.increase_step,
+                    decrease_cooldown=self.decrease_cooldown,
+                )
+            return self._buckets[host]
+
+    def reserve(self, url: str) -> float:
+        """Reserve a request slot for url and return the delay before it may be sent"""
+        return self.bucket(url).reserve()
+
+    def acquire(self, url: str):
+        """Block until a request to url is allowed"""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_success(self, url: str):
+        self.bucket(url).on_success()
+
+    def on_throttle(self, url: str, retry_after: Optional[str] = None):
+        self.bucket(url).on_throttle(parse_retry_after(retry_after))
+
+    def record_response(self, url: str, status_code: int, retry_after: Optional[str] = None):
+        """Feed a response status back into the limiter for the host of url"""
+        if status_code == 429 or (status_code == 503 and retry_after):
+            self.on_throttle(url, retry_after)
+        elif status_code < 400:
+            self.on_success(url)
+
+    def current_rate(self, url: str) -> float:
+        return self.bucket(url).rate
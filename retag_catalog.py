@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from product_stream import NDJSONWriter, finalize_json_array, iter_products
+from taxonomy import get_taxonomy
+
+# The scrapers' extractors are reused so a retag gives exactly what a new crawl would
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT, "BURGERBAE"))
+sys.path.append(os.path.join(ROOT, "LEA"))
+from scraper import LeaProductExtractor
+from scraper_BB import BurgerBaeProductExtractor
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+BURGERBAE_VENDOR_ID = "b255da59-029c-4fe4-b502-015487736e87"
+LEA_VENDOR_ID = "7c9e130b-8920-4914-853e-64ee867bb3b4"
+
+# Taxonomy each vendor's products are enriched from
+VENDOR_TAXONOMIES = {
+    BURGERBAE_VENDOR_ID: "burgerbae_tags",
+    LEA_VENDOR_ID: "lea_colors",
+}
+
+# Products handed to the worker pool at a time; output keeps the input order
+BATCH_SIZE = 2000
+
+_burgerbae = BurgerBaeProductExtractor()
+_lea = LeaProductExtractor()
+
+
+def burgerbae_category(product_url: Optional[str]) -> Optional[str]:
+    """Collection handle in a BurgerBae product URL, as the scraper derives it"""
+    if product_url and '/products/' in product_url:
+        return product_url.split('/products/')[0].split('/')[-1]
+    return None
+
+
+def retag_product(product: Dict[str, Any]) -> Dict[str, Any]:
+    """product with meta.tags / meta.colors recomputed from its stored text"""
+    meta = dict(product.get("meta") or {})
+    vendor_id = str(product.get("vendor_id"))
+    name = product.get("label") or ""
+    description = product.get("description") or ""
+    if vendor_id == BURGERBAE_VENDOR_ID:
+        meta["tags"] = _burgerbae.get_product_tags(name, description, burgerbae_category(meta.get("productUrl")))
+    elif vendor_id == LEA_VENDOR_ID:
+        meta["colors"] = _lea.extract_colors(name, description)
+    return {**product, "meta": meta}
+
+
+def product_fingerprint(product: Dict[str, Any]) -> str:
+    """Changes when the text tags are computed from, or the vendor's taxonomy, changes"""
+    meta = product.get("meta") or {}
+    taxonomy = VENDOR_TAXONOMIES.get(str(product.get("vendor_id")))
+    content = [
+        product.get("vendor_id"),
+        product.get("label"),
+        product.get("description"),
+        meta.get("productUrl"),
+        get_taxonomy(taxonomy).fingerprint if taxonomy else None,
+    ]
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def load_state(path: Optional[str]) -> Set[str]:
+    """Fingerprints of the products tagged by the last run"""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        return set(json.load(f)["fingerprints"])
+
+
+def save_state(path: str, fingerprints: Set[str]):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"fingerprints": sorted(fingerprints)}, f)
+    os.replace(tmp_path, path)
+
+
+def retag_catalog(input_path: str, output_path: str, state_path: Optional[str] = None,
+                  workers: Optional[int] = None) -> Dict[str, Any]:
+    """Recompute tags and colors for every product in a catalog dump, without any network access.
+
+    Products are read and written as a stream and enriched on a process
+    pool. With state_path, only products whose text or taxonomy changed
+    since the run that wrote the state are re-processed; the others are
+    copied through. The output is NDJSON, or a JSON array when output_path
+    ends in .json. Returns counts of processed, skipped and changed products.
+    """
+    started = time.monotonic()
+    previous = load_state(state_path)
+    state: Set[str] = set()
+    stats = {"total": 0, "processed": 0, "skipped": 0, "changed": 0}
+
+    # Written aside first, so the output may replace the input
+    ndjson_path = output_path + '.ndjson.tmp'
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            NDJSONWriter(ndjson_path, flush_every=BATCH_SIZE, fsync=False) as writer:
+
+        def flush(batch: List[Tuple[Dict[str, Any], bool]]):
+            todo = [product for product, fresh in batch if not fresh]
+            results = pool.map(retag_product, todo, chunksize=64)
+            for product, fresh in batch:
+                if fresh:
+                    writer.write(product)
+                    continue
+                retagged = next(results)
+                stats["changed"] += int(retagged["meta"] != (product.get("meta") or {}))
+                writer.write(retagged)
+
+        batch: List[Tuple[Dict[str, Any], bool]] = []
+        for product in iter_products(input_path):
+            stats["total"] += 1
+            fingerprint = product_fingerprint(product)
+            state.add(fingerprint)
+            fresh = fingerprint in previous
+            stats["skipped" if fresh else "processed"] += 1
+            batch.append((product, fresh))
+            if len(batch) >= BATCH_SIZE:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+    if output_path.endswith('.json'):
+        finalize_json_array(ndjson_path, output_path)
+        os.remove(ndjson_path)
+    else:
+        os.replace(ndjson_path, output_path)
+    if state_path:
+        save_state(state_path, state)
+    stats["elapsed_s"] = round(time.monotonic() - started, 2)
+    return stats
+
+
+def main():
+    # Configuration
+    INPUT_PATH = "./BURGERBAE/burgerbae_products.json"
+    OUTPUT_PATH = "./BURGERBAE/burgerbae_products.json"
+    # Remembers what each product was tagged from; None re-processes everything
+    STATE_PATH = "./BURGERBAE/retag_state.json"
+
+    stats = retag_catalog(INPUT_PATH, OUTPUT_PATH, STATE_PATH)
+    logger.info(
+        f"Retagged {stats['processed']} of {stats['total']} products "
+        f"({stats['skipped']} unchanged since the last run, {stats['changed']} with new tags or colors) "
+        f"in {stats['elapsed_s']} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+from controller import (
+    bulk_create_products_controller,
+    metrics_controller,
+    record_closet_swipes_controller,
+    retrieve_closet_swipes_controller,
+)
+
+# (rule, endpoint, controller, methods) of the controllers added next to the
+# ones the API already routes (product CRUD, feed and single swipes)
+ROUTES = [
+    ("/products/bulk", "bulk_create_products", bulk_create_products_controller, ["POST"]),
+    ("/closets/swipes", "record_closet_swipes", record_closet_swipes_controller, ["POST"]),
+    ("/closets/swipes", "retrieve_closet_swipes", retrieve_closet_swipes_controller, ["GET"]),
+    ("/metrics", "metrics", metrics_controller, ["GET"]),
+]
+
+
+def register_routes(app):
+    """Add ROUTES to a Flask app or blueprint; call it where the product and closet routes are registered"""
+    for rule, endpoint, controller, methods in ROUTES:
+        app.add_url_rule(rule, endpoint, view_func=controller, methods=methods)
@@ -0,0 +1,161 @@
+import dataclasses
+import decimal
+import json
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Iterable, Tuple
+
+from werkzeug.http import http_date
+
+
+def json_default(obj: Any) -> Any:
+    """Encode what JSON has no type for the way jsonify does: dates as RFC 1123 HTTP dates"""
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _encode_stdlib(obj: Any) -> bytes:
+    # jsonify's settings outside debug mode: sorted keys, compact, ASCII only
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True, default=json_default).encode("ascii")
+
+
+# What json.dumps(ensure_ascii=True) escapes that orjson writes as is
+_UNESCAPED = re.compile(r"[^\x00-\x7e]")
+
+
+def _escape(match: "re.Match") -> str:
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return "\\u%04x\\u%04x" % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return "\\u%04x" % code
+
+
+def _has_exponent(obj: Any) -> bool:
+    """Whether a float in obj is written with an exponent, which orjson writes as 1e-7 where json writes 1e-07"""
+    if isinstance(obj, float):
+        return "e" in repr(obj)
+    if isinstance(obj, dict):
+        return any(_has_exponent(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_exponent(value) for value in obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return _has_exponent(dataclasses.asdict(obj))
+    return False
+
+# orjson encodes several times faster than the stdlib; fall back when it isn't installed.
+# Either way the bytes are the ones jsonify produces for the same value (short of
+# NaN and Infinity, which the database's JSON columns can't hold).
+try:
+    import orjson
+
+    _ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def encode_json(obj: Any) -> bytes:
+        if _has_exponent(obj):
+            return _encode_stdlib(obj)
+        try:
+            encoded = orjson.dumps(obj, default=json_default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, non-string keys...
+            return _encode_stdlib(obj)
+        if encoded.isascii() and b"\x7f" not in encoded:
+            return encoded
+        return _UNESCAPED.sub(_escape, encoded.decode("utf-8")).encode("ascii")
+except ImportError:
+    encode_json = _encode_stdlib
+
+# Upper bound on the encoded products kept in memory
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+# Bookkeeping kept in products' meta that isn't part of the API representation
+INTERNAL_META_KEYS = frozenset({"contentHash", "productKey"})
+
+
+def public_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """A product's serialized fields without the internal meta keys"""
+    meta = fields.get("meta")
+    if isinstance(meta, dict) and not INTERNAL_META_KEYS.isdisjoint(meta):
+        fields = {**fields, "meta": {key: value for key, value in meta.items() if key not in INTERNAL_META_KEYS}}
+    return fields
+
+
+def product_version(product: Any) -> str:
+    """Changes whenever the product's content does (the hash stored by ingest and updates)"""
+    return (product.meta or {}).get("contentHash", "") if isinstance(product.meta, dict) else ""
+
+
+class SerializationCache:
+    """LRU of products already run through toDict() and encoded to JSON bytes.
+
+    Entries are keyed by product id and version, so a product changed by
+    another process is simply missed; the controllers that change products
+    in this process also invalidate them explicitly.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, product: Any) -> bytes:
+        """JSON bytes of product.toDict() (internal meta keys left out), from the cache when the product hasn't changed"""
+        key = str(product.id)
+        version = product_version(product)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        encoded = encode_json(public_fields(product.toDict()))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[key] = (version, encoded)
+            self._bytes += len(encoded)
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return encoded
+
+    def encode_list(self, products: Iterable[Any]) -> bytes:
+        """A JSON array built from the cached fragments"""
+        return b"[" + b",".join(self.encode(product) for product in products) + b"]"
+
+    def invalidate(self, product_ids: Iterable[Any]):
+        with self._lock:
+            for product_id in product_ids:
+                entry = self._entries.pop(str(product_id), None)
+                if entry is not None:
+                    self._bytes -= len(entry[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+# One cache per process, shared by the controllers
+product_cache = SerializationCache()
@@ -0,0 +1,131 @@
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from image_urls import normalize_images
+
+logger = logging.getLogger(__name__)
+
+# Shopify caps products.json pages at 250 products
+PAGE_LIMIT = 250
+
+SIZE_OPTION_NAMES = {"size", "sizes"}
+COLOR_OPTION_NAMES = {"color", "colour", "colors", "colours"}
+
+
+def collection_handle(collection_url: str) -> str:
+    """'https://shop/collections/tops?page=2' -> 'tops'"""
+    path = urlparse(collection_url).path.rstrip('/')
+    return path.split('/collections/')[-1].split('/')[0]
+
+
+def _json_object(response: requests.Response) -> Optional[Dict[str, Any]]:
+    """Decoded JSON object of response, None for the HTML error and rate-limit pages Shopify also serves"""
+    try:
+        payload = response.json()
+    except ValueError:
+        logger.warning(f"Expected JSON from {response.url}, got {response.headers.get('Content-Type')}")
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def iter_collection_products(get_response: Callable[..., Optional[requests.Response]],
+                             base_url: str, handle: str) -> Iterator[Dict[str, Any]]:
+    """Page through /collections/<handle>/products.json and yield raw Shopify products"""
+    page = 1
+    while True:
+        response = get_response(f"{base_url}/collections/{handle}/products.json?limit={PAGE_LIMIT}&page={page}")
+        payload = _json_object(response) if response is not None else None
+        if payload is None:
+            return
+        products = payload.get('products') or []
+        yield from products
+        if len(products) < PAGE_LIMIT:
+            return
+        page += 1
+
+
+def fetch_product_js(get_response: Callable[..., Optional[requests.Response]],
+                     base_url: str, handle: str) -> Optional[Dict[str, Any]]:
+    """Fetch /products/<handle>.js (prices in minor units)"""
+    response = get_response(f"{base_url}/products/{handle}.js")
+    if response is None:
+        return None
+    return _json_object(response)
+
+
+def _money(value: Any, in_cents: bool) -> Optional[float]:
+    if value in (None, ''):
+        return None
+    amount = float(value)
+    return amount / 100 if in_cents else amount
+
+
+def _tags(raw_tags: Any) -> List[str]:
+    # products.json returns a list, older endpoints a comma separated string
+    if isinstance(raw_tags, str):
+        raw_tags = raw_tags.split(',')
+    return [tag.strip() for tag in raw_tags or [] if tag.strip()]
+
+
+def _option_values(product: Dict[str, Any], names: set) -> List[str]:
+    for option in product.get('options') or []:
+        # products.json options are dicts, product.js options can be plain names
+        if isinstance(option, dict) and option.get('name', '').strip().lower() in names:
+            return [str(value) for value in option.get('values', [])]
+    return []
+
+
+def html_to_text(html: Optional[str], separator: str = '') -> str:
+    """Plain text of a body_html fragment"""
+    if not html:
+        return ""
+    return BeautifulSoup(html, 'html.parser').get_text(separator, strip=True)
+
+
+def product_fields(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a products.json or product.js entry into the fields the scrapers need"""
+    # product.js reports prices in paise, products.json as decimal strings
+    in_cents = 'price' in product and isinstance(product.get('price'), int)
+    variants = product.get('variants') or []
+    available = [v for v in variants if v.get('available', True)] or variants
+
+    current_price = None
+    original_price = None
+    if available:
+        # The storefront shows the first available variant by default
+        variant = available[0]
+        current_price = _money(variant.get('price'), in_cents)
+        original_price = _money(variant.get('compare_at_price'), in_cents)
+        # Match the HTML engine, which only reports a compare-at price when it's shown
+        if original_price is not None and current_price is not None and original_price <= current_price:
+            original_price = None
+
+    images = normalize_images(
+        image.get('src') if isinstance(image, dict) else image for image in product.get('images') or []
+    )
+
+    sizes = _option_values(product, SIZE_OPTION_NAMES)
+    if not sizes and len(product.get('options') or []) == 1 and len(variants) > 1:
+        sizes = [v.get('title') for v in variants if v.get('title')]
+
+    return {
+        "handle": product.get('handle'),
+        "label": (product.get('title') or '').strip() or None,
+        "body_html": product.get('body_html') or product.get('description') or '',
+        "price": current_price,
+        "original_price": original_price,
+        "images": images,
+        "sizes": sizes,
+        "colors": _option_values(product, COLOR_OPTION_NAMES),
+        "tags": _tags(product.get('tags')),
+    }
+
+
+def product_url(base_url: str, handle: str, product_handle: str) -> str:
+    """Collection scoped product URL, the same shape the HTML listings link to"""
+    return f"{base_url}/collections/{handle}/products/{product_handle}"
+
@@ -0,0 +1,111 @@
+import datetime
+
+from app import db
+from closets.models import Closet
+
+POSITIVE = 1
+NEGATIVE = -1
+
+# Swipe ids are handed out before their transactions commit, so a swipe can
+# become visible after later ids already have. Readers following a closet's
+# swipes by id also re-read the swipes written this long before their last
+# read, which covers any transaction still open at that read
+SWIPE_COMMIT_WINDOW = datetime.timedelta(seconds=60)
+
+
+class ClosetSwipe(db.Model):
+    """One swipe on a product, appended per request instead of rewriting the closet's id arrays"""
+    __tablename__ = "closet_swipes"
+    __table_args__ = (
+        db.Index("ix_closet_swipes_closet_id_id", "closet_id", "id"),
+        db.Index("ix_closet_swipes_closet_id_ts", "closet_id", "ts"),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True, autoincrement=True)
+    closet_id = db.Column(db.Uuid, nullable=False)
+    product_id = db.Column(db.Uuid, nullable=False)
+    response = db.Column(db.SmallInteger, nullable=False)
+    ts = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+    def toDict(self):
+        return {
+            "id": self.id,
+            "closetId": str(self.closet_id),
+            "productId": str(self.product_id),
+            "response": self.response,
+            "ts": self.ts.isoformat() if self.ts else None,
+        }
+
+
+def record_swipes(closet_id, swipes):
+    """Append (product_id, response) pairs for a closet in one INSERT; the caller commits"""
+    now = datetime.datetime.utcnow()
+    rows = [
+        {"closet_id": closet_id, "product_id": product_id, "response": response, "ts": now}
+        for product_id, response in swipes
+    ]
+    if rows:
+        db.session.execute(db.insert(ClosetSwipe), rows)
+    return len(rows)
+
+
+def closet_swipe_ids(closet):
+    """(positiveIds, negativeIds) of a closet from its swipes, each product under its latest response"""
+    responses = {}
+    rows = db.session.query(ClosetSwipe.product_id, ClosetSwipe.response).filter(
+        ClosetSwipe.closet_id == closet.id
+    ).order_by(ClosetSwipe.id)
+    for product_id, response in rows:
+        responses[product_id] = response
+    positive_ids = [product_id for product_id, response in responses.items() if response == POSITIVE]
+    negative_ids = [product_id for product_id, response in responses.items() if response == NEGATIVE]
+    return positive_ids, negative_ids
+
+
+def closet_to_dict(closet):
+    """closet.toDict() with positiveIds / negativeIds derived from the swipe table instead of the legacy arrays"""
+    positive_ids, negative_ids = closet_swipe_ids(closet)
+    return {**closet.toDict(), "positiveIds": positive_ids, "negativeIds": negative_ids}
+
+
+def import_legacy_swipes(batch_size=500):
+    """Copy the swipes kept in Closet.positiveIds / negativeIds into the swipe table; returns how many.
+
+    Products a closet already has swipes for are left out, so running it
+    again imports nothing. A product in both arrays ends up negative, as the
+    arrays were read before. The arrays themselves are no longer written.
+    """
+    imported = 0
+    last_id = None
+    while True:
+        query = Closet.query.filter(db.or_(Closet.positiveIds.isnot(None), Closet.negativeIds.isnot(None)))
+        if last_id is not None:
+            query = query.filter(Closet.id > last_id)
+        closets = query.order_by(Closet.id).limit(batch_size).all()
+        if not closets:
+            return imported
+        for closet in closets:
+            swiped = {product_id for product_id, in db.session.query(ClosetSwipe.product_id).filter(
+                ClosetSwipe.closet_id == closet.id
+            )}
+            legacy = [(product_id, POSITIVE) for product_id in closet.positiveIds or []]
+            legacy += [(product_id, NEGATIVE) for product_id in closet.negativeIds or []]
+            imported += record_swipes(closet.id, [swipe for swipe in legacy if swipe[0] not in swiped])
+        db.session.commit()
+        last_id = closets[-1].id
+
+
+def swipes_since(closet_id, after_id=0, read_at=None):
+    """(id, product_id) of a closet's swipes with ids above after_id, oldest first.
+
+    read_at is when after_id was read. Swipes written up to
+    SWIPE_COMMIT_WINDOW before it are returned again whatever their id,
+    since they may have committed after that read. On a quiet closet that
+    is nothing, not a slice of its history.
+    """
+    newer = ClosetSwipe.id > after_id
+    if read_at is not None:
+        newer = db.or_(newer, ClosetSwipe.ts >= read_at - SWIPE_COMMIT_WINDOW)
+    return db.session.query(ClosetSwipe.id, ClosetSwipe.product_id).filter(
+        ClosetSwipe.closet_id == closet_id, newer
+    ).order_by(ClosetSwipe.id).all()
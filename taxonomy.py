@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Tag and color dictionaries shared by the scrapers
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy.json")
+
+
+class Taxonomy:
+    """A dictionary of terms compiled into an Aho-Corasick automaton.
+
+    classify() scans the text once, whatever the number of terms, and only
+    counts a term when it is a whole word or phrase ("top" doesn't match
+    "laptop"). A lowercase letter followed by an uppercase one also counts
+    as a word break, since products scraped with get_text(strip=True) ran
+    elements together ("Baby teeNet Quantity"). With plurals, a term also
+    matches when followed by "s" or "es". Labels come back in the order
+    they first appear in the texts, and in the term's own order when one
+    term gives several.
+    """
+
+    def __init__(self, name: str, terms: Dict[str, Union[str, List[str]]], plurals: bool = False,
+                 version: Any = None):
+        self.name = name
+        self.plurals = plurals
+        self.version = version
+        self.labels: List[str] = []
+        label_index: Dict[str, int] = {}
+        normalized: Dict[str, List[int]] = {}
+        for term, labels in terms.items():
+            for label in [labels] if isinstance(labels, str) else labels:
+                if label not in label_index:
+                    label_index[label] = len(self.labels)
+                    self.labels.append(label)
+                normalized.setdefault(term.lower(), []).append(label_index[label])
+        self.fingerprint = hashlib.sha256(
+            json.dumps([sorted(normalized.items()), self.labels, plurals]).encode("utf-8")
+        ).hexdigest()[:16]
+        self._compile(normalized)
+
+    def _compile(self, terms: Dict[str, List[int]]):
+        # goto[state][char] -> state; outputs[state] -> [(term length, label indices)]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[Tuple[int, Tuple[int, ...]]]] = [[]]
+        for term, labels in terms.items():
+            state = 0
+            for char in term:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append((len(term), tuple(labels)))
+
+        # Breadth-first, so each state's failure link is final before its children need it
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+                queue.append(child)
+
+    def classify(self, *texts: Optional[str]) -> List[str]:
+        """Labels of every term found in texts"""
+        cased = "\n".join(text for text in texts if text)
+        text = cased.lower()
+        if len(text) != len(cased):
+            # A few characters change length when lowercased; word breaks then ignore case
+            cased = text
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        # label index -> start of its first match
+        found: Dict[int, int] = {}
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, labels in outputs[state]:
+                start = end - length
+                if _is_break(cased, start) and self._ends_word(cased, end):
+                    for label in labels:
+                        # Matches are reported by where they end, so a longer term can start earlier
+                        if start < found.get(label, len(text)):
+                            found[label] = start
+        return [self.labels[index] for index in sorted(found, key=found.get)]
+
+    def _ends_word(self, cased: str, end: int) -> bool:
+        if _is_break(cased, end):
+            return True
+        if not self.plurals:
+            return False
+        for suffix in ("s", "es"):
+            if cased.startswith(suffix, end) and _is_break(cased, end + len(suffix)):
+                return True
+        return False
+
+
+def _is_break(cased: str, position: int) -> bool:
+    """True when position (between two characters) is the edge of a word"""
+    if position <= 0 or position >= len(cased):
+        return True
+    before, after = cased[position - 1], cased[position]
+    return not before.isalnum() or not after.isalnum() or (before.islower() and after.isupper())
+
+
+def load_taxonomies(path: str = TAXONOMY_PATH) -> Dict[str, Taxonomy]:
+    """Compile every taxonomy in a config file: {"version", "taxonomies": {name: {"terms", "plurals"}}}"""
+    with open(path, 'r', encoding='utf-8') as file:
+        config = json.load(file)
+    return {
+        name: Taxonomy(name, spec["terms"], plurals=spec.get("plurals", False), version=config.get("version"))
+        for name, spec in config["taxonomies"].items()
+    }
+
+
+_loaded: Dict[str, Dict[str, Taxonomy]] = {}
+
+
+def get_taxonomy(name: str, path: str = TAXONOMY_PATH) -> Taxonomy:
+    """A compiled taxonomy, built once per process and config file"""
+    if path not in _loaded:
+        _loaded[path] = load_taxonomies(path)
+    return _loaded[path][name]
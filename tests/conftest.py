@@ -0,0 +1,120 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+# The modules under test live in the repository root; the Flask app,
+# models and auth they import are stood in for by tests/stub_app
+for path in (os.path.dirname(TESTS), os.path.join(TESTS, "stub_app")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+_routed = False
+
+
+def routed_app():
+    """The stub app with every controller routed the way the API routes them"""
+    global _routed
+    from app import app
+    import controller
+    from routes import register_routes
+
+    if not _routed:
+        app.add_url_rule("/products", "list_products", controller.list_all_products_controller, methods=["GET"])
+        app.add_url_rule("/products", "create_product", controller.create_product_controller, methods=["POST"])
+        app.add_url_rule("/products/<uuid:product_id>", "retrieve_product",
+                         controller.retrieve_product_controller, methods=["GET"])
+        app.add_url_rule("/products/<uuid:product_id>", "update_product",
+                         controller.update_product_controller, methods=["PUT"])
+        app.add_url_rule("/products/<uuid:product_id>", "delete_product",
+                         controller.delete_product_controller, methods=["DELETE"])
+        app.add_url_rule("/feed", "feed", controller.external_retrieve_products_controller, methods=["GET"])
+        app.add_url_rule("/closet/swipe", "swipe", controller.update_closet_product_ids_controller, methods=["POST"])
+        register_routes(app)
+        _routed = True
+    return app
+
+
+@pytest.fixture
+def api():
+    """Routed stub app on an empty database, with the per-process caches reset"""
+    from app import db
+    import swipes.models  # noqa: F401  (registers the closet_swipes table)
+    from feed_engine import feed_engine
+    from instrumentation import instrumentation
+    from serialization_cache import product_cache
+
+    app = routed_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    product_cache.clear()
+    feed_engine.__init__()
+    instrumentation.reset()
+    yield app
+    with app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def client(api):
+    return api.test_client()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers each path with the next (status, headers) of its script, then 200s.
+
+    A 200 sends the path's entry in server.pages, or "ok". Each response is
+    held for server.delay seconds and server.max_in_flight records the most
+    requests served at once.
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            script = server.scripts.get(self.path, [])
+            status, headers = script.pop(0) if script else (200, {})
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            body = server.pages.get(self.path, b"ok") if status == 200 else b"error"
+            self.send_response(status)
+            if self.path in server.pages:
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.hits = {}
+    server.scripts = {}
+    server.pages = {}
+    server.delay = 0.0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
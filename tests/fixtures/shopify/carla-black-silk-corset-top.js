@@ -0,0 +1 @@
+{"id":7012345678901,"title":"Carla Black Silk Corset Top CL","handle":"carla-black-silk-corset-top","description":"<p>You asked, we delivered: Our best-selling Carla Silk Corset Top in Black!<\/p>","published_at":"2024-10-08T15:31:43+05:30","created_at":"2022-11-19T12:02:10+05:30","vendor":"Lea Clothing Co","type":"Tops","tags":["Black","Corset","Silk","Tops"],"price":329000,"price_min":329000,"price_max":349000,"available":true,"price_varies":true,"compare_at_price":429000,"compare_at_price_min":429000,"compare_at_price_max":429000,"compare_at_price_varies":false,"variants":[{"id":41012345678001,"title":"XS","option1":"XS","option2":null,"option3":null,"sku":"CARLA-BLK-XS","requires_shipping":true,"taxable":true,"featured_image":null,"available":false,"name":"Carla Black Silk Corset Top CL - XS","public_title":"XS","options":["XS"],"price":349000,"weight":250,"compare_at_price":429000},{"id":41012345678002,"title":"S","option1":"S","option2":null,"option3":null,"sku":"CARLA-BLK-S","requires_shipping":true,"taxable":true,"featured_image":null,"available":true,"name":"Carla Black Silk Corset Top CL - S","public_title":"S","options":["S"],"price":329000,"weight":250,"compare_at_price":429000}],"images":["\/\/www.leaclothingco.com\/cdn\/shop\/products\/Carla_Black_Silk_Corset_Top1.jpg?v=1739431594","\/\/www.leaclothingco.com\/cdn\/shop\/products\/Carla_Black_Silk_Corset_Top2.jpg?v=1739431594"],"featured_image":"\/\/www.leaclothingco.com\/cdn\/shop\/products\/Carla_Black_Silk_Corset_Top1.jpg?v=1739431594","options":[{"name":"Size","position":1,"values":["XS","S"]}],"url":"\/products\/carla-black-silk-corset-top"}
@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+app = Flask(__name__)
+# A file rather than :memory:, so a server thread and the test share the data
+app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="stub_app_"), "app.sqlite3")
+db = SQLAlchemy(app)
@@ -0,0 +1,13 @@
+import uuid
+
+from flask import request
+
+from app import db
+
+
+def get_current_user():
+    """The user named by the X-User header"""
+    from closets.models import User
+    user_id = request.headers.get("X-User")
+    user = db.session.get(User, uuid.UUID(user_id)) if user_id else None
+    return (user, 200) if user else (None, 401)
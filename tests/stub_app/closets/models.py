@@ -0,0 +1,32 @@
+import uuid
+
+from sqlalchemy.types import TypeDecorator
+
+from app import db
+
+
+class UUIDList(TypeDecorator):
+    """UUID[] stand-in for SQLite"""
+    impl = db.JSON
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else [str(item) for item in value]
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else [uuid.UUID(item) for item in value]
+
+
+class Closet(db.Model):
+    id = db.Column(db.Uuid, primary_key=True, default=uuid.uuid4)
+    positiveIds = db.Column(UUIDList)
+    negativeIds = db.Column(UUIDList)
+
+    def toDict(self):
+        return {"id": str(self.id), "positiveIds": self.positiveIds, "negativeIds": self.negativeIds}
+
+
+class User(db.Model):
+    id = db.Column(db.Uuid, primary_key=True, default=uuid.uuid4)
+    currentClosetId = db.Column(db.Uuid)
+    meta = db.Column(db.JSON)
@@ -0,0 +1,27 @@
+import datetime
+import uuid
+
+from app import db
+
+
+class Product(db.Model):
+    id = db.Column(db.Uuid, primary_key=True, default=uuid.uuid4)
+    label = db.Column(db.String)
+    description = db.Column(db.String)
+    images = db.Column(db.JSON)
+    price = db.Column(db.JSON)
+    meta = db.Column(db.JSON)
+    vendor_id = db.Column(db.String)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    def toDict(self):
+        return {
+            "id": str(self.id),
+            "label": self.label,
+            "description": self.description,
+            "images": self.images,
+            "price": self.price,
+            "meta": self.meta,
+            "vendor_id": self.vendor_id,
+            "created_at": self.created_at,
+        }
@@ -0,0 +1,163 @@
+import copy
+import json
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def scraped():
+    """The first products of the stored Lea dump, as the scraper emits them"""
+    with open(os.path.join(ROOT, "LEA", "lea_products.json"), encoding="utf-8") as f:
+        return json.load(f)[:12]
+
+
+def stored_products(api):
+    from products.models import Product
+    with api.app_context():
+        return {str(product.id): product.toDict() for product in Product.query.all()}
+
+
+def test_bulk_create_inserts_array_and_returns_ids(api, client, scraped):
+    response = client.post("/products/bulk", json=scraped)
+
+    assert response.status_code == 200
+    assert response.json["created"] == len(scraped)
+    stored = stored_products(api)
+    assert sorted(response.json["ids"]) == sorted(stored)
+    by_label = {product["label"]: product for product in stored.values()}
+    assert by_label[scraped[0]["label"]]["price"] == scraped[0]["price"]
+
+
+def test_bulk_create_accepts_ndjson_and_wrapped_arrays(api, client, scraped):
+    body = "".join(json.dumps(product) + "\n" for product in scraped[:3])
+    response = client.post("/products/bulk", data=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.json["created"] == 3
+
+    response = client.post("/products/bulk", json={"products": scraped[3:5]})
+    assert response.json["created"] == 2
+    assert len(stored_products(api)) == 5
+
+
+def test_bulk_create_normalizes_nested_prices(api, client, scraped):
+    product = copy.deepcopy(scraped[0])
+    product["price"] = {"default": {"default": 999.0}, "original": {"default": 1299.0}}
+
+    product_id, = client.post("/products/bulk", json=[product]).json["ids"]
+
+    assert stored_products(api)[product_id]["price"] == {
+        "default": 999.0, "original": 1299.0, "meta": {"CURRENCY_CODE": "INR", "CURRENCY_LOGO": "Rs."},
+    }
+
+
+def test_bulk_create_rejects_the_whole_batch(api, client, scraped):
+    response = client.post("/products/bulk", json=scraped[:2] + ["not a product"])
+    assert response.status_code == 400
+    assert "index 2" in response.json["error"]
+
+    response = client.post("/products/bulk", data='{"label": "x"}\n{oops\n',
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 400
+    assert stored_products(api) == {}
+
+
+@pytest.mark.parametrize("body", [5, "products", None, True, {"products": 5}, {"products": {"label": "x"}}])
+def test_bulk_create_rejects_bodies_that_are_not_product_lists(api, client, body):
+    response = client.post("/products/bulk", data=json.dumps(body), headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 400
+    assert "Invalid body" in response.json["error"]
+
+
+def test_bulk_upsert_writes_only_changed_products(api, client, scraped):
+    first = client.post("/products/bulk?mode=upsert", json=scraped).json
+    assert (first["created"], first["updated"], first["unchanged"]) == (len(scraped), 0, 0)
+
+    changed = copy.deepcopy(scraped)
+    changed[1]["price"]["default"] = 1.0
+    # A product repeated in one batch is written once, with its last version
+    again = client.post("/products/bulk?mode=upsert", json=changed + [changed[1]]).json
+
+    assert (again["created"], again["updated"], again["unchanged"]) == (0, 2, len(scraped) - 1)
+    assert again["ids"][:len(scraped)] == first["ids"]
+    assert again["ids"][-1] == first["ids"][1]
+    stored = stored_products(api)
+    assert len(stored) == len(scraped)
+    assert stored[first["ids"][1]]["price"]["default"] == 1.0
+
+
+def test_responses_leave_out_the_content_hash(api, client, scraped):
+    product_id = client.post("/products/bulk?mode=upsert", json=scraped[:2]).json["ids"][0]
+    assert "contentHash" in stored_products(api)[product_id]["meta"]
+
+    bodies = [
+        client.get(f"/products/{product_id}").json,
+        client.get("/products").json[0],
+        client.get("/products?limit=1").json["products"][0],
+        client.get("/products?limit=1&fields=meta").json["products"][0],
+        client.put(f"/products/{product_id}", json={"label": "Renamed"}).json,
+        client.post("/products", json=scraped[3]).json,
+    ]
+    for body in bodies:
+        assert "contentHash" not in body["meta"] and "productKey" not in body["meta"]
+        assert body["meta"]["productUrl"]
+
+
+def test_bulk_upsert_matches_a_product_across_collections(api, client, scraped):
+    product = copy.deepcopy(scraped[0])
+    handle = product["meta"]["productUrl"].rsplit("/products/", 1)[1]
+    first_id, = client.post("/products/bulk?mode=upsert", json=[product]).json["ids"]
+
+    product["meta"]["productUrl"] = f"https://www.leaclothingco.com/collections/new-in/products/{handle}/"
+    product["price"]["default"] = 1.0
+    again = client.post("/products/bulk?mode=upsert", json=[product]).json
+
+    assert (again["created"], again["updated"], again["ids"]) == (0, 1, [first_id])
+    stored = stored_products(api)
+    assert list(stored) == [first_id]
+    assert stored[first_id]["meta"]["productKey"] == f"products/{handle}"
+
+
+def test_products_stored_before_product_keys_are_matched_and_backfilled(api, client, scraped):
+    from app import db
+    from controller import with_content_hash
+    from create_tables import backfill_product_keys
+    from products.models import Product
+
+    old = [with_content_hash(copy.deepcopy(product)) for product in scraped[:3]]
+    with api.app_context():
+        for product in old:
+            del product["meta"]["productKey"]
+            db.session.add(Product(**product))
+        db.session.commit()
+
+    # Found by their exact URL
+    again = client.post("/products/bulk?mode=upsert", json=scraped[:3]).json
+    assert (again["created"], again["unchanged"]) == (0, 3)
+
+    with api.app_context():
+        assert backfill_product_keys() == 3
+        assert backfill_product_keys() == 0
+    assert {product["meta"]["productKey"] for product in stored_products(api).values()} == {
+        "products/" + product["meta"]["productUrl"].rsplit("/products/", 1)[1].lower() for product in scraped[:3]
+    }
+
+
+def test_upsert_lookups_use_the_expression_indexes(api):
+    import sqlalchemy
+    from app import db
+    from create_tables import create_tables
+    from products.models import Product
+    with api.app_context():
+        create_tables()
+        create_tables()
+        for key, index in [("productKey", "products_vendor_product_key"), ("productUrl", "products_vendor_product_url")]:
+            query = db.session.query(Product.id).filter(
+                Product.vendor_id.in_(["v"]), Product.meta[key].as_string().in_(["a", "b"])
+            )
+            sql = str(query.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+            plan = " ".join(row[-1] for row in db.session.execute(sqlalchemy.text("EXPLAIN QUERY PLAN " + sql)))
+
+            assert f"USING INDEX {index} (vendor_id=? AND <expr>=?)" in plan
@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+
+import pytest
+
+from catalog_join import detect_encoding, join_catalog, normalize_label
+from product_stream import finalize_json_array, iter_ndjson
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEA = os.path.join(ROOT, "LEA")
+
+
+def write_csv(path, text, encoding="utf-8"):
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+def write_catalog(path, products):
+    path.write_text(json.dumps(products), encoding="utf-8")
+    return str(path)
+
+
+def test_lea_join_reproduces_the_committed_filtered_products(tmp_path):
+    ndjson_path, json_path = str(tmp_path / "filtered.ndjson"), str(tmp_path / "filtered.json")
+
+    stats = join_catalog(os.path.join(LEA, "products_with_null_prices.csv"), os.path.join(LEA, "lea_products.json"),
+                         ndjson_path)
+    finalize_json_array(ndjson_path, json_path, ensure_ascii=True)
+
+    assert stats["encoding"] == "cp1252"
+    assert stats["matched"] == 248
+    with open(json_path, 'rb') as out, open(os.path.join(LEA, "filtered_products.json"), 'rb') as committed:
+        assert out.read() == committed.read()
+
+
+def test_last_matching_product_wins_in_csv_order(tmp_path, caplog):
+    csv_path = write_csv(tmp_path / "export.csv", "ID,Label\n1,Wine Top\n2,Red Dress\n3,Missing\n")
+    catalog_path = write_catalog(tmp_path / "catalog.json", [
+        {"label": "Red Dress", "meta": {"productUrl": "https://shop.test/collections/new/products/red-dress"}},
+        {"label": "Wine Top", "meta": {"productUrl": "https://shop.test/collections/new/products/wine-top"}},
+        {"label": "Red Dress", "meta": {"productUrl": "https://shop.test/collections/sale/products/red-dress"}},
+        {"label": "Blue Skirt"},
+    ])
+
+    with caplog.at_level(logging.INFO, logger="catalog_join"):
+        stats = join_catalog(csv_path, catalog_path, str(tmp_path / "out.ndjson"), id_field="dbId")
+
+    out = list(iter_ndjson(str(tmp_path / "out.ndjson")))
+    assert [(product["dbId"], product["label"]) for product in out] == [("1", "Wine Top"), ("2", "Red Dress")]
+    assert out[1]["meta"]["productUrl"].endswith("/sale/products/red-dress")
+    assert (stats["scanned"], stats["matched"], stats["duplicates"], stats["csv_ids"]) == (4, 2, 1, 3)
+    assert "2 products match 'Red Dress'; keeping the last one" in caplog.text
+
+
+def test_labels_match_after_normalization(tmp_path):
+    csv_path = write_csv(tmp_path / "export.csv", "ID,Label\n1,Malea Wine Off-Shoulder Top  CL\n2,Décor Café Tee\n",
+                         encoding="cp1252")
+    catalog_path = write_catalog(tmp_path / "catalog.json", [
+        {"label": "malea wine off shoulder top cl"}, {"label": "DECOR CAFE TEE"},
+    ])
+
+    stats = join_catalog(csv_path, catalog_path, str(tmp_path / "out.ndjson"))
+
+    assert stats["encoding"] == "cp1252"
+    assert stats["matched"] == 2
+    assert normalize_label("Décor  Café-Tee") == "decor cafe tee"
+
+
+def test_urls_are_matched_only_from_a_url_column(tmp_path):
+    catalog_path = write_catalog(tmp_path / "catalog.json", [
+        {"label": "Renamed Top", "meta": {"productUrl": "https://shop.test/collections/tops/products/wine-top/"}},
+    ])
+    with_urls = write_csv(tmp_path / "urls.csv", "ID,Label,URL\n1,Wine Top,https://shop.test/products/wine-top\n")
+    without_urls = write_csv(tmp_path / "labels.csv", "ID,Label\n1,Wine Top\n")
+
+    assert join_catalog(with_urls, catalog_path, str(tmp_path / "a.ndjson"), url_column="URL")["matched"] == 1
+    assert join_catalog(without_urls, catalog_path, str(tmp_path / "b.ndjson"))["matched"] == 0
+    with pytest.raises(ValueError):
+        join_catalog(without_urls, catalog_path, str(tmp_path / "c.ndjson"), url_column="URL")
+
+
+@pytest.mark.parametrize("data, encoding", [
+    (b"\xef\xbb\xbfID,Label\n", "utf-8-sig"),
+    ("ID,Label\n1,Café\n".encode("utf-16"), "utf-16"),
+    ("ID,Label\n1,Café\n".encode("utf-8"), "utf-8"),
+    ("ID,Label\n1,Café – Top\n".encode("cp1252"), "cp1252"),
+    (b"ID,Label\n1,\x81\n", "latin-1"),
+])
+def test_detect_encoding(tmp_path, data, encoding):
+    (tmp_path / "export.csv").write_bytes(data)
+
+    assert detect_encoding(str(tmp_path / "export.csv")) == encoding
@@ -0,0 +1,98 @@
+import os
+import sys
+
+from crawl_frontier import CrawlFrontier
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "tests", "fixtures", "lea")
+sys.path.append(os.path.join(ROOT, "LEA"))
+from scraper import LeaClothingScraper  # noqa: E402
+
+PAGE = "https://www.leaclothingco.com/collections/dresses"
+
+
+def test_restart_resumes_from_the_frontier(tmp_path):
+    path = str(tmp_path / "frontier.sqlite3")
+    frontier = CrawlFrontier(path)
+    frontier.queue_page(PAGE, [(PAGE + "/products/a", "A"), (PAGE + "/products/b", "B"), (PAGE + "/products/c", "C")])
+    frontier.mark_done(PAGE + "/products/a")
+    frontier.close()
+
+    resumed = CrawlFrontier(path)
+
+    assert not resumed.is_empty()
+    assert resumed.is_done(PAGE)
+    assert resumed.pending() == [(PAGE + "/products/b", "B"), (PAGE + "/products/c", "C")]
+    assert resumed.pending(parent=PAGE) == resumed.pending()
+
+
+def test_urls_are_queued_once(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "frontier.sqlite3"))
+    frontier.queue_page(PAGE, [(PAGE + "/products/a", "A"), (PAGE + "/products/b", "B")])
+    frontier.mark_done(PAGE + "/products/a")
+
+    # The same products on the next page, and the same page again
+    frontier.queue_page(PAGE + "?page=2", [(PAGE + "/products/b", "B again"), (PAGE + "/products/a", "A again")])
+    frontier.queue_page(PAGE, [(PAGE + "/products/b", "B")])
+
+    assert frontier.pending() == [(PAGE + "/products/b", "B")]
+    assert frontier.pending(parent=PAGE + "?page=2") == []
+    assert frontier.is_done(PAGE + "/products/a")
+    assert frontier.counts() == {"page": {"done": 2}, "product": {"done": 1, "pending": 1}}
+
+
+def test_failed_urls_are_requeued_until_max_attempts(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "frontier.sqlite3"), max_attempts=2)
+    frontier.queue_page(PAGE, [(PAGE + "/products/a", "A"), (PAGE + "/products/b", "B")])
+    frontier.mark_failed(PAGE + "/products/a", "HTTP 500")
+    frontier.mark_done(PAGE + "/products/b")
+
+    assert frontier.pending() == [(PAGE + "/products/a", "A")]
+
+    frontier.mark_failed(PAGE + "/products/a", "HTTP 503")
+
+    assert frontier.pending() == []
+    assert frontier.failures() == [(PAGE + "/products/a", 2, "HTTP 503")]
+
+    frontier.reset()
+    assert frontier.is_empty()
+
+
+def serve_collection(stub_server):
+    for path, name in [
+        ("/collections/dresses", "dresses_page1"),
+        ("/collections/dresses?page=2", "dresses_page2"),
+        ("/collections/dresses/products/red-bodycon-dress", "red-bodycon-dress"),
+        ("/collections/dresses/products/wine-off-shoulder-top", "wine-off-shoulder-top"),
+        ("/collections/dresses/products/carla-black-silk-corset-top", "carla-black-silk-corset-top"),
+    ]:
+        with open(os.path.join(FIXTURES, name + ".html"), "rb") as f:
+            stub_server.pages[path] = f.read()
+
+
+def make_scraper(stub_server, frontier_path):
+    scraper = LeaClothingScraper(base_url=stub_server.url, requests_per_second=100, burst=10,
+                                 cache_path=None, frontier_path=frontier_path)
+    scraper._retry_delay = lambda attempt: 0
+    return scraper
+
+
+def test_interrupted_crawl_picks_up_where_it_stopped(stub_server, tmp_path):
+    serve_collection(stub_server)
+    frontier_path = str(tmp_path / "frontier.sqlite3")
+    collection = stub_server.url + "/collections/dresses"
+
+    products = make_scraper(stub_server, frontier_path).iter_products([collection])
+    assert next(products)["label"] == "Hermine Red Bodycon Maxi Dress"
+    products.close()
+
+    scraper = make_scraper(stub_server, frontier_path)
+    labels = [product["label"] for product in scraper.iter_products([collection])]
+
+    assert labels == ["Malea Wine Off-Shoulder Top CL", "Carla Black Silk Corset Top"]
+    # Finished products aren't fetched again; the finished first page only for its pagination links
+    assert stub_server.hits["/collections/dresses/products/red-bodycon-dress"] == 1
+    assert stub_server.hits["/collections/dresses/products/wine-off-shoulder-top"] == 1
+    assert stub_server.hits["/collections/dresses?page=2"] == 1
+    # Nothing left to retry, so the next run starts over
+    assert scraper.frontier.is_empty()
@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from etags import CatalogVersion
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def catalog(client):
+    with open(os.path.join(ROOT, "LEA", "lea_products.json"), encoding="utf-8") as f:
+        return client.post("/products/bulk", json=json.load(f)[:10]).json["ids"]
+
+
+def test_list_revalidates_to_304_until_the_catalog_changes(client, catalog):
+    first = client.get("/products")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    assert client.get("/products", headers={"If-None-Match": etag}).status_code == 304
+    client.put(f"/products/{catalog[0]}", json={"label": "Renamed"})
+    again = client.get("/products", headers={"If-None-Match": etag})
+
+    assert again.status_code == 200
+    assert again.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("write", ["create", "bulk", "update", "delete"])
+def test_every_write_changes_the_list_etag(client, catalog, write):
+    etag = client.get("/products").headers["ETag"]
+    if write == "create":
+        client.post("/products", json={"label": "New", "vendor_id": "v"})
+    elif write == "bulk":
+        client.post("/products/bulk", json=[{"label": "New", "vendor_id": "v"}])
+    elif write == "update":
+        client.put(f"/products/{catalog[1]}", json={"label": "Renamed"})
+    else:
+        client.delete(f"/products/{catalog[2]}")
+
+    assert client.get("/products").headers["ETag"] != etag
+
+
+def test_unchanged_upsert_keeps_the_list_etag(client, catalog):
+    with open(os.path.join(ROOT, "LEA", "lea_products.json"), encoding="utf-8") as f:
+        products = json.load(f)[:3]
+    client.post("/products/bulk?mode=upsert", json=products)
+    etag = client.get("/products").headers["ETag"]
+
+    assert client.post("/products/bulk?mode=upsert", json=products).json["unchanged"] == 3
+    assert client.get("/products").headers["ETag"] == etag
+
+
+def test_workers_agree_on_the_list_etag(api, client, catalog):
+    etag = client.get("/products?limit=5").headers["ETag"]
+    # A second worker process has its own CatalogVersion, but reads the same counter
+    with api.test_request_context("/products?limit=5"):
+        assert f'W/"{CatalogVersion().etag(False)}"' == etag
+
+
+def test_list_responses_vary_on_accept(client, catalog):
+    plain = client.get("/products")
+    ndjson = client.get("/products", headers={"Accept": "application/x-ndjson"})
+    not_modified = client.get("/products", headers={"If-None-Match": plain.headers["ETag"]})
+    page = client.get("/products?limit=2")
+
+    for response in (plain, ndjson, not_modified, page):
+        assert "Accept" in response.headers["Vary"]
+    assert ndjson.headers["ETag"] != plain.headers["ETag"]
+    assert client.get("/products", headers={"Accept": "application/x-ndjson",
+                                            "If-None-Match": plain.headers["ETag"]}).status_code == 200
+
+
+def test_product_etag_is_its_content_hash(client, catalog):
+    first = client.get(f"/products/{catalog[0]}")
+    etag = first.headers["ETag"]
+
+    assert client.get(f"/products/{catalog[0]}", headers={"If-None-Match": etag}).status_code == 304
+    client.put(f"/products/{catalog[0]}", json={"label": "Renamed"})
+    assert client.get(f"/products/{catalog[0]}", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+import uuid
+
+import pytest
+
+import feed_engine as feed_engine_module
+from feed_engine import CatalogIndex, FeedEngine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEA_VENDOR_ID = "7c9e130b-8920-4914-853e-64ee867bb3b4"
+
+
+@pytest.fixture
+def catalog(api, client):
+    """Ids of 30 Lea products stored through the bulk endpoint"""
+    with open(os.path.join(ROOT, "LEA", "lea_products.json"), encoding="utf-8") as f:
+        products = json.load(f)[:30]
+    return client.post("/products/bulk", json=products).json["ids"]
+
+
+@pytest.fixture
+def user(api):
+    from app import db
+    from closets.models import Closet, User
+    with api.app_context():
+        closet = Closet(positiveIds=[], negativeIds=[])
+        db.session.add(closet)
+        db.session.flush()
+        user = User(currentClosetId=closet.id, meta={"PREFERRED_BRANDS": [LEA_VENDOR_ID]})
+        db.session.add(user)
+        db.session.commit()
+        return {"X-User": str(user.id), "closet_id": closet.id}
+
+
+def next_page(api, engine, closet_id, limit=100):
+    from closets.models import Closet
+    from app import db
+    with api.app_context():
+        return engine.next_page(db.session.get(Closet, closet_id), [LEA_VENDOR_ID], limit)
+
+
+def swipe(client, user, product_id, response=1):
+    headers = {"X-User": user["X-User"]}
+    assert client.post("/closet/swipe", json={"productId": product_id, "response": response},
+                       headers=headers).status_code == 200
+
+
+def test_feed_pages_skip_swiped_products(client, catalog, user):
+    headers = {"X-User": user["X-User"]}
+    page = [product["id"] for product in client.get("/feed?limit=10", headers=headers).json]
+    assert len(page) == 10 and set(page) <= set(catalog)
+
+    for product_id in page[:4]:
+        swipe(client, user, product_id, -1)
+    served = [product["id"] for product in client.get("/feed?limit=100", headers=headers).json]
+
+    assert set(served) == set(catalog) - set(page[:4])
+
+
+def test_swipes_recorded_by_another_worker_reach_a_cached_bitmap(api, client, catalog, user):
+    # This engine plays a second worker process: it never sees mark_seen calls
+    worker = FeedEngine()
+    assert len(next_page(api, worker, user["closet_id"])) == len(catalog)
+
+    for product_id in catalog[:5]:
+        swipe(client, user, product_id)
+    client.post("/closets/swipes", json=[{"productId": product_id, "response": -1} for product_id in catalog[5:8]],
+                headers={"X-User": user["X-User"]})
+
+    assert set(next_page(api, worker, user["closet_id"])) == set(catalog[8:])
+
+
+def test_a_swipe_committed_after_a_later_id_is_still_picked_up(api, catalog, user):
+    from app import db
+    from swipes.models import ClosetSwipe
+    worker = FeedEngine()
+    next_page(api, worker, user["closet_id"])
+    with api.app_context():
+        # Ids 5 and 9 were handed out together; 9 commits first and is read
+        db.session.add(ClosetSwipe(id=9, closet_id=user["closet_id"], product_id=uuid.UUID(catalog[0]), response=1))
+        db.session.commit()
+    next_page(api, worker, user["closet_id"])
+    with api.app_context():
+        db.session.add(ClosetSwipe(id=5, closet_id=user["closet_id"], product_id=uuid.UUID(catalog[1]), response=1))
+        db.session.commit()
+
+    assert set(next_page(api, worker, user["closet_id"])) == set(catalog[2:])
+
+
+def test_quiet_closets_do_not_reread_their_history(api, catalog, user):
+    import datetime
+    from app import db
+    from swipes.models import SWIPE_COMMIT_WINDOW, ClosetSwipe, swipes_since
+    long_ago = datetime.datetime.utcnow() - 10 * SWIPE_COMMIT_WINDOW
+    with api.app_context():
+        for product_id in catalog[:20]:
+            db.session.add(ClosetSwipe(closet_id=user["closet_id"], product_id=uuid.UUID(product_id), response=-1,
+                                       ts=long_ago))
+        db.session.commit()
+    worker = FeedEngine()
+    assert set(next_page(api, worker, user["closet_id"])) == set(catalog[20:])
+
+    state = worker._closets[str(user["closet_id"])]
+    with api.app_context():
+        assert swipes_since(user["closet_id"], state["swipe_id"], state["read_at"]) == []
+        # Without the read time the whole history would come back
+        assert len(swipes_since(user["closet_id"])) == 20
+
+
+def test_bitmap_starts_from_the_imported_legacy_arrays(api, catalog, user):
+    from app import db
+    from closets.models import Closet
+    from swipes.models import import_legacy_swipes
+    with api.app_context():
+        closet = db.session.get(Closet, user["closet_id"])
+        closet.positiveIds = [uuid.UUID(catalog[0])]
+        closet.negativeIds = [uuid.UUID(catalog[1])]
+        db.session.commit()
+        import_legacy_swipes()
+
+    assert set(next_page(api, FeedEngine(), user["closet_id"])) == set(catalog[2:])
+
+
+def test_swipe_on_a_product_the_worker_does_not_know_yet(api, client, catalog, user):
+    worker = FeedEngine(refresh_seconds=3600)
+    next_page(api, worker, user["closet_id"])
+    # Added by another process: this worker's index only learns of it on its next scan
+    new_id = client.post("/products", json={"label": "Late arrival", "vendor_id": LEA_VENDOR_ID,
+                                            "meta": {"productUrl": "late"}}).json["id"]
+    swipe(client, user, new_id)
+    assert new_id not in next_page(api, worker, user["closet_id"])
+
+    worker.catalog.refreshed_at = float('-inf')
+    page = next_page(api, worker, user["closet_id"])
+
+    assert new_id in worker.catalog.ordinals
+    assert new_id not in page and len(page) == len(catalog)
+
+
+def test_catalog_refresh_picks_up_other_processes_writes(api, client, catalog, user):
+    worker = FeedEngine(refresh_seconds=0)
+    assert len(next_page(api, worker, user["closet_id"])) == len(catalog)
+
+    client.delete(f"/products/{catalog[0]}")
+    new_id = client.post("/products", json={"label": "New", "vendor_id": LEA_VENDOR_ID,
+                                            "meta": {"productUrl": "new"}}).json["id"]
+    page = next_page(api, worker, user["closet_id"])
+
+    assert catalog[0] not in page
+    assert new_id in page
+
+
+def test_catalog_scan_runs_without_holding_the_engine_lock(api, catalog, user, monkeypatch):
+    worker = FeedEngine(refresh_seconds=0)
+    next_page(api, worker, user["closet_id"])
+    blocked = []
+    scan = CatalogIndex.changes
+
+    def slow_changes(rows, live):
+        # Another request needing the engine lock must get through while the ids are scanned
+        other = threading.Thread(target=worker.mark_seen, args=(user["closet_id"], []))
+        other.start()
+        other.join(timeout=2)
+        blocked.append(other.is_alive())
+        return scan(rows, live)
+
+    monkeypatch.setattr(feed_engine_module.CatalogIndex, "changes", staticmethod(slow_changes))
+    next_page(api, worker, user["closet_id"])
+
+    assert blocked == [False]
+
+
+def test_concurrent_refreshes_scan_once(api, catalog, user, monkeypatch):
+    worker = FeedEngine(refresh_seconds=0)
+    next_page(api, worker, user["closet_id"])
+    scans = []
+    release = threading.Event()
+    scan = CatalogIndex.changes
+
+    def waiting_changes(rows, live):
+        scans.append(1)
+        release.wait(2)
+        return scan(rows, live)
+
+    monkeypatch.setattr(feed_engine_module.CatalogIndex, "changes", staticmethod(waiting_changes))
+    first = threading.Thread(target=next_page, args=(api, worker, user["closet_id"]))
+    first.start()
+    while not scans:
+        pass
+    # Served from the current index while the first request is scanning
+    assert len(next_page(api, worker, user["closet_id"])) == len(catalog)
+    release.set()
+    first.join()
+
+    assert len(scans) == 1
+
+
+def test_catalog_index_changes():
+    index = CatalogIndex()
+    index.apply([("a", "v1"), ("b", "v2"), ("c", "v1")], [])
+    index.remove("b")
+
+    added, removed = CatalogIndex.changes([("a", "v1"), ("b", "v2"), ("d", "v1")], set(index.live))
+    assert added == [("b", "v2"), ("d", "v1")]
+    assert removed == {"c"}
+
+    index.apply(added, removed)
+    # Ordinals never move; a returning product gets its old one back
+    assert index.ids == ["a", "b", None, "d"]
+    assert index.by_vendor == {"v1": [0, 2, 3], "v2": [1]}
@@ -0,0 +1,96 @@
+import os
+import sys
+
+import pytest
+from bs4 import BeautifulSoup
+
+from html_parsing import (BURGERBAE_COLLECTION_PAGE, BURGERBAE_PRODUCT_PAGE, HTML_PARSER, LEA_COLLECTION_PAGE,
+                          LEA_PRODUCT_PAGE, make_soup)
+from pagination import discover_pages
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+sys.path.append(os.path.join(ROOT, "LEA"))
+sys.path.append(os.path.join(ROOT, "BURGERBAE"))
+from scraper import LeaProductExtractor  # noqa: E402
+from scraper_BB import BurgerBaeProductExtractor, extract_product as extract_burgerbae_product  # noqa: E402
+
+LEA_BASE = "https://www.leaclothingco.com"
+BURGERBAE_BASE = "https://www.burgerbaeclothing.com"
+BURGERBAE_PAGES = ["travis-scott-dystopia-oversized-tshirt", "pleated-mini-skirt-co-ord"]
+
+
+def fixture(*path):
+    with open(os.path.join(FIXTURES, *path), encoding="utf-8") as f:
+        return f.read()
+
+
+def both_soups(html, strainer):
+    """The page as the scrapers parse it now, and as they parsed it before (whole page, html.parser)"""
+    return make_soup(html, strainer), BeautifulSoup(html, "html.parser")
+
+
+def test_strained_pages_are_parsed_with_lxml():
+    pytest.importorskip("lxml")
+    assert HTML_PARSER == "lxml"
+
+
+@pytest.mark.parametrize("page", ["dresses_page1", "dresses_page2"])
+def test_lea_collection_pages_give_the_same_listings(page):
+    extractor = LeaProductExtractor(LEA_BASE)
+    url = LEA_BASE + "/collections/dresses"
+    strained, full = both_soups(fixture("lea", page + ".html"), LEA_COLLECTION_PAGE)
+
+    listings = [extractor.extract_listing_data(element) for element in strained.select(".ProductItem")]
+    assert listings
+    assert listings == [extractor.extract_listing_data(element) for element in full.select(".ProductItem")]
+    assert discover_pages(strained, url) == discover_pages(full, url)
+
+
+@pytest.mark.parametrize("handle, name", [
+    ("red-bodycon-dress", "Hermine Red Bodycon Maxi Dress"),
+    ("wine-off-shoulder-top", "Malea Wine Off-Shoulder Top CL"),
+    ("carla-black-silk-corset-top", "Carla Black Silk Corset Top"),
+])
+def test_lea_product_pages_give_the_same_products(handle, name):
+    extractor = LeaProductExtractor(LEA_BASE)
+    url = f"{LEA_BASE}/collections/dresses/products/{handle}"
+    strained, full = both_soups(fixture("lea", handle + ".html"), LEA_PRODUCT_PAGE)
+
+    product = extractor.parse_product_page(name, url, strained)
+    assert product["price"]["default"] and product["images"] and product["description"]
+    assert product == extractor.parse_product_page(name, url, full)
+
+
+def test_burgerbae_collection_page_gives_the_same_cards():
+    extractor = BurgerBaeProductExtractor(BURGERBAE_BASE)
+    url = BURGERBAE_BASE + "/collections/for-womens?page=1"
+    strained, full = both_soups(fixture("burgerbae", "for-womens_page1.html"), BURGERBAE_COLLECTION_PAGE)
+
+    strained_cards, full_cards = strained.select(".product-card"), full.select(".product-card")
+    assert len(strained_cards) == len(full_cards) == 2
+    assert discover_pages(strained, url) == discover_pages(full, url)
+
+    for card, full_card, page in zip(strained_cards, full_cards, BURGERBAE_PAGES):
+        page_html = fixture("burgerbae", page + ".html")
+        strained_page, full_page = both_soups(page_html, BURGERBAE_PRODUCT_PAGE)
+        details = extractor.parse_product_page(strained_page)
+        assert details["description"] and details["size_chart"]
+        assert details == extractor.parse_product_page(full_page)
+
+        product = extractor.parse_product_card(full_card, details)
+        assert product["price"]["default"] and product["images"] and product["meta"]["available_sizes"]
+        assert extractor.parse_product_card(card, details) == product
+        # The pipeline hands the card to the parse workers as HTML and parses it again there
+        assert extract_burgerbae_product(str(card), page_html, None, BURGERBAE_BASE) == (product, details)
+
+
+def test_burgerbae_descriptions_keep_words_apart():
+    extractor = BurgerBaeProductExtractor(BURGERBAE_BASE)
+    page = BeautifulSoup('<div class="collapsible__content accordion__content rte"><p>A pleated <b>skirt</b></p>'
+                         '<p>paired with a sweatshirt</p></div>', "html.parser")
+
+    description = extractor.parse_product_page(page)["description"]
+
+    assert description == "A pleated skirt paired with a sweatshirt"
+    assert extractor.get_product_tags("Co-ord", description, "for-womens") == ["Co-ords", "Skirt", "Sweatshirts"]
@@ -0,0 +1,62 @@
+import sqlite3
+
+import requests
+
+from http_cache import HTTPCache
+
+URL = "https://www.leaclothingco.com/products/red-dress"
+
+
+def make_response(body, status=200, etag='"v1"'):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode("utf-8")
+    response.encoding = "utf-8"
+    response.headers["ETag"] = etag
+    return response
+
+
+def cache_with_product(path, version):
+    cache = HTTPCache(str(path), extractor_version=version)
+    cache.store(URL, make_response("<html>red dress</html>"))
+    cache.save_extracted(URL, {"label": "Red Dress"})
+    return cache
+
+
+def test_extracted_products_come_back_for_the_same_version(tmp_path):
+    cache_with_product(tmp_path / "cache.sqlite3", "1:abc").close()
+    cache = HTTPCache(str(tmp_path / "cache.sqlite3"), extractor_version="1:abc")
+
+    entry = cache.lookup(URL)
+    assert entry["extracted"] == {"label": "Red Dress"}
+    assert cache.resolve(URL, entry, make_response("", status=304)) == (None, {"label": "Red Dress"})
+
+
+def test_extracted_products_of_another_version_are_parsed_again(tmp_path):
+    cache_with_product(tmp_path / "cache.sqlite3", "1:abc").close()
+    cache = HTTPCache(str(tmp_path / "cache.sqlite3"), extractor_version="2:abc")
+
+    entry = cache.lookup(URL)
+    assert entry["extracted"] is None
+    # Unchanged page, but the cached body is handed back for parsing
+    assert cache.resolve(URL, entry, make_response("", status=304)) == ("<html>red dress</html>", None)
+    assert cache.resolve(URL, entry, make_response("<html>red dress</html>")) == ("<html>red dress</html>", None)
+
+    cache.save_extracted(URL, {"label": "Red Dress", "colors": ["Red"]})
+    assert cache.lookup(URL)["extracted"] == {"label": "Red Dress", "colors": ["Red"]}
+
+
+def test_caches_from_before_versioning_are_migrated(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE responses (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_hash TEXT, body BLOB,"
+        " extracted TEXT, size INTEGER NOT NULL, fetched_at REAL NOT NULL, last_access REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO responses VALUES (?, NULL, NULL, NULL, NULL, ?, 10, 0, 0)", (URL, '{"label": "Old"}'))
+    conn.commit()
+    conn.close()
+
+    cache = HTTPCache(path, extractor_version="1:abc")
+
+    assert cache.lookup(URL)["extracted"] is None
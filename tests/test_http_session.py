@@ -0,0 +1,35 @@
+from http_session import build_session, connection_stats
+
+
+def test_session_retries_5xx_until_success(stub_server):
+    stub_server.scripts["/flaky"] = [(503, {}), (502, {})]
+    session = build_session(max_retries=3, backoff_factor=0.01)
+
+    response = session.get(stub_server.url + "/flaky")
+
+    assert response.status_code == 200
+    assert stub_server.hits["/flaky"] == 3
+    # Every attempt went over the one kept-alive connection
+    assert connection_stats(session) == {"requests": 3, "connections": 1, "reused": 2}
+
+
+def test_session_gives_up_after_max_retries(stub_server):
+    stub_server.scripts["/down"] = [(500, {})] * 10
+    session = build_session(max_retries=2, backoff_factor=0.01)
+
+    response = session.get(stub_server.url + "/down")
+
+    assert response.status_code == 500
+    assert stub_server.hits["/down"] == 3
+
+
+def test_session_leaves_429_and_posts_to_the_caller(stub_server):
+    stub_server.scripts["/throttled"] = [(429, {"Retry-After": "1"})]
+    stub_server.scripts["/post"] = [(503, {})]
+    session = build_session(max_retries=3, backoff_factor=0.01)
+
+    assert session.get(stub_server.url + "/throttled").status_code == 429
+    assert stub_server.hits["/throttled"] == 1
+    # POST isn't idempotent, so the transport doesn't resend it
+    assert session.post(stub_server.url + "/post").status_code == 503
+    assert stub_server.hits["/post"] == 1
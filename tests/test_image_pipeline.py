@@ -0,0 +1,122 @@
+import hashlib
+import os
+import shutil
+
+import pytest
+
+import image_pipeline
+from image_pipeline import ImagePipeline
+
+Image = pytest.importorskip("PIL.Image")
+
+SPECS = {
+    "card": {"size": (30, 40), "format": "WEBP", "quality": 80},
+    "thumb": {"size": (12, 16), "format": "JPEG", "quality": 75},
+}
+
+
+@pytest.fixture
+def images(tmp_path):
+    """Two images under three paths: red.jpg is also served as red-copy.jpg"""
+    source = tmp_path / "source"
+    source.mkdir()
+    Image.new("RGB", (60, 90), (200, 30, 30)).save(source / "red.jpg", "JPEG")
+    Image.new("RGBA", (80, 60), (30, 30, 200, 255)).save(source / "blue.png", "PNG")
+    shutil.copy(source / "red.jpg", source / "red-copy.jpg")
+    return {name: str(source / name) for name in ("red.jpg", "red-copy.jpg", "blue.png")}
+
+
+@pytest.fixture
+def products(images):
+    return [
+        {"label": "Red Top", "images": [images["red.jpg"], images["red-copy.jpg"]], "meta": {"category": "tops"}},
+        {"label": "Blue Dress", "images": [images["blue.png"], images["red.jpg"]]},
+    ]
+
+
+@pytest.fixture
+def pool_starts(monkeypatch):
+    """Number of process pools the image pipeline starts"""
+    started = []
+
+    class CountingPool(image_pipeline.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            started.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(image_pipeline, "ProcessPoolExecutor", CountingPool)
+    return started
+
+
+def run(store_root, products, **kwargs):
+    pipeline = ImagePipeline(str(store_root), specs=SPECS, fetch_workers=3, parse_workers=2, **kwargs)
+    try:
+        return list(pipeline.process_products(products)), dict(pipeline.stats)
+    finally:
+        pipeline.close()
+
+
+def stored_files(root, *parts):
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(os.path.join(root, *parts)) for name in names
+    )
+
+
+def digest_of(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def test_one_original_and_one_rendition_set_per_digest(tmp_path, images, products, pool_starts):
+    out, stats = run(tmp_path / "store", products)
+
+    red, blue = digest_of(images["red.jpg"]), digest_of(images["blue.png"])
+    root = str(tmp_path / "store")
+    assert stored_files(root, "originals") == sorted(
+        os.path.join("originals", digest[:2], digest) for digest in (red, blue)
+    )
+    assert len(stored_files(root, "derivatives")) == 2 * len(SPECS)
+    assert stats == {"images": 3, "downloaded": 3, "reused": 0, "failed": 0}
+
+    first, second = out
+    assert [entry["src"] for entry in first["meta"]["imageDerivatives"]] == products[0]["images"]
+    assert [entry["hash"] for entry in first["meta"]["imageDerivatives"]] == [red, red]
+    assert first["meta"]["imageDerivatives"][0]["card"] == first["meta"]["imageDerivatives"][1]["card"]
+    assert first["meta"]["category"] == "tops"
+    assert [entry["hash"] for entry in second["meta"]["imageDerivatives"]] == [blue, red]
+    with Image.open(os.path.join(root, second["meta"]["imageDerivatives"][0]["card"])) as card:
+        assert (card.format, card.size) == ("WEBP", (30, 40))
+    assert len(pool_starts) == 1
+
+
+def test_second_run_reuses_stored_images(tmp_path, products):
+    first, _ = run(tmp_path / "store", products)
+    root = str(tmp_path / "store")
+    written = {path: os.stat(os.path.join(root, path)).st_mtime_ns for path in stored_files(root, "derivatives")}
+
+    second, stats = run(tmp_path / "store", products)
+
+    assert stats == {"images": 3, "downloaded": 0, "reused": 3, "failed": 0}
+    assert second == first
+    assert {path: os.stat(os.path.join(root, path)).st_mtime_ns for path in stored_files(root, "derivatives")} == written
+
+
+def test_one_process_pool_for_every_batch(tmp_path, monkeypatch, products, pool_starts):
+    monkeypatch.setattr(image_pipeline, "BATCH_SIZE", 1)
+
+    out, stats = run(tmp_path / "store", products)
+
+    assert len(pool_starts) == 1
+    assert [len(product["meta"]["imageDerivatives"]) for product in out] == [2, 2]
+    # The second batch finds red.jpg already in the store
+    assert stats == {"images": 4, "downloaded": 3, "reused": 1, "failed": 0}
+
+
+def test_missing_images_are_left_out(tmp_path, images):
+    products = [{"label": "Top", "images": [os.path.join(str(tmp_path), "missing.jpg"), images["blue.png"]]}]
+
+    out, stats = run(tmp_path / "store", products)
+
+    assert [entry["src"] for entry in out[0]["meta"]["imageDerivatives"]] == [images["blue.png"]]
+    assert stats["failed"] == 1
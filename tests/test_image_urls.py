@@ -0,0 +1,81 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from image_urls import canonical_image_url, image_identity, largest_from_srcset, normalize_images, srcset_image
+
+BASE = "https://www.leaclothingco.com"
+IMAGE = BASE + "/cdn/shop/files/Carla_Black_Silk_Corset_Top.jpg"
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("//www.leaclothingco.com/cdn/shop/files/Carla_Black_Silk_Corset_Top.jpg?v=1728383285", IMAGE),
+    ("/cdn/shop/files/Carla_Black_Silk_Corset_Top.jpg", IMAGE),
+    ("  " + IMAGE + "?v=1  ", IMAGE),
+    (BASE + "/cdn/shop/files/Carla_{width}x.jpg?v=1", BASE + "/cdn/shop/files/Carla_800x.jpg"),
+    ("//cdn.shopify.com/s/files/1/Carla.jpg?v=2&width=400", "https://cdn.shopify.com/s/files/1/Carla.jpg?width=400"),
+    # Only Shopify's CDN is known to ignore v=
+    ("https://images.example/Carla.jpg?v=2", "https://images.example/Carla.jpg?v=2"),
+])
+def test_canonical_image_url(url, canonical):
+    assert canonical_image_url(url, BASE) == canonical
+
+
+def test_protocol_relative_urls_need_no_base():
+    assert canonical_image_url("//www.leaclothingco.com/cdn/shop/files/Carla_Black_Silk_Corset_Top.jpg") == IMAGE
+    # A path without a base stays as it is
+    assert canonical_image_url("/cdn/shop/files/Carla.jpg") == "/cdn/shop/files/Carla.jpg"
+
+
+def test_size_variants_share_an_identity():
+    renditions = [
+        IMAGE,
+        BASE + "/cdn/shop/files/Carla_Black_Silk_Corset_Top_400x.jpg",
+        BASE + "/cdn/shop/files/Carla_Black_Silk_Corset_Top_1200x1600.jpg",
+        IMAGE + "?width=600&height=800&crop=center",
+    ]
+
+    assert {image_identity(url) for url in renditions} == {IMAGE}
+    assert image_identity(IMAGE + "?alt=back") != image_identity(IMAGE)
+
+
+def test_normalize_images_keeps_the_first_rendition_of_each_image():
+    urls = [
+        "//www.leaclothingco.com/cdn/shop/files/Carla_Black_Silk_Corset_Top_400x.jpg?v=1",
+        None,
+        "",
+        BASE + "/cdn/shop/files/Carla_Black_Silk_Corset_Top.jpg?v=2",
+        "/cdn/shop/files/Carla_Back.jpg?width=1200",
+        "//www.leaclothingco.com/cdn/shop/files/Carla_Back.jpg?v=3",
+        BASE + "/cdn/shop/files/Carla_Back.jpg?width=1200",
+        # Elsewhere v= stays in the URL, but still names the same image
+        "https://images.example/Carla.jpg?v=1",
+        "https://images.example/Carla.jpg?v=2",
+    ]
+
+    assert normalize_images(urls, BASE) == [
+        BASE + "/cdn/shop/files/Carla_Black_Silk_Corset_Top_400x.jpg",
+        BASE + "/cdn/shop/files/Carla_Back.jpg?width=1200",
+        "https://images.example/Carla.jpg?v=1",
+    ]
+
+
+@pytest.mark.parametrize("srcset, largest", [
+    ("a.jpg 400w, b.jpg 1200w, c.jpg 800w", "b.jpg"),
+    ("a.jpg 1x, b.jpg 2x", "b.jpg"),
+    ("a.jpg", "a.jpg"),
+    ("a.jpg bogusw, b.jpg 10w", "b.jpg"),
+    ("", None),
+    (None, None),
+])
+def test_largest_from_srcset(srcset, largest):
+    assert largest_from_srcset(srcset) == largest
+
+
+def test_srcset_image_prefers_data_srcset():
+    img = BeautifulSoup('<img srcset="//www.leaclothingco.com/cdn/shop/files/Small.jpg 200w" '
+                        'data-srcset="//www.leaclothingco.com/cdn/shop/files/Carla_{width}x.jpg?v=9 600w, '
+                        '//www.leaclothingco.com/cdn/shop/files/Carla_1200x.jpg?v=9 1200w">', "html.parser").img
+
+    assert srcset_image(img, BASE) == BASE + "/cdn/shop/files/Carla_1200x.jpg"
+    assert srcset_image(BeautifulSoup("<img>", "html.parser").img) is None
+    assert srcset_image(None) is None
@@ -0,0 +1,71 @@
+import json
+import os
+import time
+
+import pytest
+import sqlalchemy
+from flask import g
+
+from instrumentation import Histogram
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def request_stats():
+    return {"endpoint": "test", "queries": 0, "query_ms": 0.0, "rows": 0, "bytes": 0, "started": time.perf_counter()}
+
+
+def test_metrics_count_queries_rows_and_bytes(client):
+    with open(os.path.join(ROOT, "LEA", "lea_products.json"), encoding="utf-8") as f:
+        client.post("/products/bulk", json=json.load(f)[:7])
+    body = client.get("/products").get_data()
+    client.get("/products?limit=3")
+
+    endpoints = client.get("/metrics").json["endpoints"]
+
+    listed = endpoints["products.list"]
+    assert listed["requests"] == 2 and listed["errors"] == 0
+    assert listed["rows"] == 10
+    assert listed["bytes"] >= len(body)
+    # The catalog counter and the rows, for each request
+    assert listed["queries"] == 4
+    assert listed["latency_ms"]["count"] == 2
+    assert endpoints["products.bulk_create"]["requests"] == 1
+
+
+def test_failed_statements_are_counted_and_leave_nothing_behind(api):
+    from app import db
+    with api.test_request_context():
+        g.request_stats = stats = request_stats()
+        for _ in range(3):
+            with pytest.raises(sqlalchemy.exc.OperationalError):
+                db.session.execute(sqlalchemy.text("SELECT * FROM no_such_table"))
+            db.session.rollback()
+        connection = db.session.connection()
+        db.session.execute(sqlalchemy.text("SELECT 1"))
+
+        assert stats["queries"] == 4
+        assert not any(key.startswith("query") for key in connection.info)
+
+
+def test_queries_outside_requests_are_not_counted(api):
+    from app import db
+    with api.app_context():
+        db.session.execute(sqlalchemy.text("SELECT 1"))
+    with api.test_request_context():
+        g.request_stats = stats = request_stats()
+        db.session.execute(sqlalchemy.text("SELECT 1"))
+        assert stats["queries"] == 1
+
+
+def test_histogram_percentiles():
+    histogram = Histogram([1, 10, 100])
+    for value in [0.5] * 50 + [5] * 45 + [50] * 4 + [500]:
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert (snapshot["p50"], snapshot["p95"], snapshot["p99"]) == (1, 10, 100)
+    assert snapshot["max"] == 500
+    assert snapshot["buckets"] == {"1": 50, "10": 45, "100": 4, "+Inf": 1}
+    assert Histogram().percentile(0.5) is None
+
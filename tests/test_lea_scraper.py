@@ -0,0 +1,99 @@
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "tests", "fixtures", "lea")
+sys.path.append(os.path.join(ROOT, "LEA"))
+from scraper import LeaClothingScraper  # noqa: E402
+
+COLLECTION = "/collections/dresses"
+PRODUCT_PAGES = {
+    "red-bodycon-dress": "Hermine Red Bodycon Maxi Dress",
+    "wine-off-shoulder-top": "Malea Wine Off-Shoulder Top CL",
+    "carla-black-silk-corset-top": "Carla Black Silk Corset Top",
+}
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name + ".html"), "rb") as f:
+        return f.read()
+
+
+def serve_collection(stub_server):
+    stub_server.pages[COLLECTION] = fixture("dresses_page1")
+    stub_server.pages[COLLECTION + "?page=2"] = fixture("dresses_page2")
+    for handle in PRODUCT_PAGES:
+        stub_server.pages[f"{COLLECTION}/products/{handle}"] = fixture(handle)
+
+
+def make_scraper(stub_server, max_concurrency_per_host=3):
+    scraper = LeaClothingScraper(base_url=stub_server.url, max_concurrency_per_host=max_concurrency_per_host,
+                                 requests_per_second=100, burst=10, cache_path=None, frontier_path=None)
+    scraper._retry_delay = lambda attempt: 0
+    return scraper
+
+
+def test_async_scrape_follows_pagination_and_keeps_listing_order(stub_server):
+    serve_collection(stub_server)
+    scraper = make_scraper(stub_server)
+
+    products = asyncio.run(scraper.scrape_products_async([stub_server.url + COLLECTION]))
+
+    assert [p["label"] for p in products] == list(PRODUCT_PAGES.values())
+    assert stub_server.hits[COLLECTION] == 1
+    assert stub_server.hits[COLLECTION + "?page=2"] == 1
+
+    dress = products[0]
+    assert dress["price"]["default"] == 2499.0
+    assert dress["price"]["original"] == 3999.0
+    assert dress["images"] == [
+        "https://cdn.shopify.com/s/files/1/0001/products/red.jpg",
+        "https://cdn.shopify.com/s/files/1/0001/products/red-back_1000x.jpg",
+    ]
+    assert dress["meta"]["productUrl"] == f"{stub_server.url}{COLLECTION}/products/red-bodycon-dress"
+    assert dress["meta"]["category"] == "dresses"
+    assert dress["meta"]["rating"] == 4.67
+    assert dress["meta"]["review_count"] == 12
+    assert dress["meta"]["available_sizes"] == ["XS", "S", "M"]
+    assert dress["meta"]["size_chart"]["cm"]["S"] == {"Bust": "86.5", "Waist": "71"}
+    assert dress["meta"]["product_details"] == {"Fabric": "Crepe", "Fit": "Bodycon", "Length": "Maxi",
+                                                "Made in India": True}
+    assert dress["meta"]["colors"] == ["Red", "Black"]
+    assert products[2]["images"] == [f"{stub_server.url}/cdn/shop/products/carla.jpg"]
+
+
+def test_async_scrape_retries_429_and_skips_failed_products(stub_server):
+    serve_collection(stub_server)
+    stub_server.scripts[f"{COLLECTION}/products/wine-off-shoulder-top"] = [(429, {"Retry-After": "0"})]
+    stub_server.scripts[f"{COLLECTION}/products/carla-black-silk-corset-top"] = [(404, {})]
+    scraper = make_scraper(stub_server)
+
+    products = asyncio.run(scraper.scrape_products_async([stub_server.url + COLLECTION]))
+
+    assert [p["label"] for p in products] == [
+        "Hermine Red Bodycon Maxi Dress", "Malea Wine Off-Shoulder Top CL",
+    ]
+    assert stub_server.hits[f"{COLLECTION}/products/wine-off-shoulder-top"] == 2
+    # A 404 isn't retried
+    assert stub_server.hits[f"{COLLECTION}/products/carla-black-silk-corset-top"] == 1
+
+
+def test_async_scrape_caps_concurrent_fetches_per_host(stub_server):
+    serve_collection(stub_server)
+    stub_server.delay = 0.05
+    # Six listings on one page, against at most two fetches at a time
+    cards = b"".join(
+        b'<div class="ProductItem"><h2 class="ProductItem__Title"><a href="' + COLLECTION.encode()
+        + b'/products/red-bodycon-dress?variant=%d">Variant %d</a></h2></div>' % (n, n)
+        for n in range(6)
+    )
+    stub_server.pages[COLLECTION] = b"<html><body>" + cards + b"</body></html>"
+    for n in range(6):
+        stub_server.pages[f"{COLLECTION}/products/red-bodycon-dress?variant={n}"] = fixture("red-bodycon-dress")
+    scraper = make_scraper(stub_server, max_concurrency_per_host=2)
+
+    products = asyncio.run(scraper.scrape_products_async([stub_server.url + COLLECTION]))
+
+    assert [p["label"] for p in products] == [f"Variant {n}" for n in range(6)]
+    assert stub_server.max_in_flight == 2
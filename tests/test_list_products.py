@@ -0,0 +1,72 @@
+import base64
+import datetime
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def twins(api):
+    """25 products identical in everything but their id"""
+    from app import db
+    from products.models import Product
+    created_at = datetime.datetime(2024, 1, 1)
+    with api.app_context():
+        for _ in range(25):
+            db.session.add(Product(id=uuid.uuid4(), label="Black Tee", description="", images=[],
+                                   price={"default": 999.0}, meta={}, vendor_id="v", created_at=created_at))
+        db.session.commit()
+        return sorted(str(product.id) for product in Product.query.all())
+
+
+def encode_cursor(raw):
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def test_cursor_pages_cover_equal_rows_once_in_id_order(client, twins):
+    seen, cursor, pages = [], None, 0
+    while True:
+        url = "/products?limit=7" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url).json
+        pages += 1
+        assert len(body["products"]) == (7 if pages < 4 else 4)
+        seen += [product["id"] for product in body["products"]]
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+
+    assert pages == 4
+    assert seen == twins
+
+
+def test_a_page_that_ends_the_catalog_has_no_cursor(client, twins):
+    assert client.get("/products?limit=25").json["nextCursor"] is None
+    last = encode_cursor(twins[-1].encode())
+    assert client.get(f"/products?limit=5&cursor={last}").json == {"nextCursor": None, "products": []}
+
+
+def test_cursor_pages_with_projected_fields(client, twins):
+    body = client.get("/products?limit=2&fields=label,price").json
+
+    assert body["products"] == [{"id": twins[0], "label": "Black Tee", "price": {"default": 999.0}},
+                                {"id": twins[1], "label": "Black Tee", "price": {"default": 999.0}}]
+    assert [p["id"] for p in client.get(f"/products?limit=2&fields=label&cursor={body['nextCursor']}")
+            .json["products"]] == twins[2:4]
+
+
+@pytest.mark.parametrize("query", [
+    "cursor=not-a-cursor",
+    "cursor=" + encode_cursor(b"hello"),
+    "cursor=" + encode_cursor(b"\xff\xfe\xfd"),
+    "cursor=" + encode_cursor(b"12345678-1234-5678-1234-56781234567"),
+    "cursor=abc=def",
+    "limit=0",
+    "limit=-3",
+    "limit=ten",
+    "fields=label,password",
+])
+def test_bad_paging_parameters_are_rejected(client, twins, query):
+    response = client.get("/products?" + query)
+
+    assert response.status_code == 400
+    assert response.json["error"]
@@ -0,0 +1,145 @@
+import os
+import sys
+import threading
+
+from bs4 import BeautifulSoup
+
+from pagination import MAX_PAGES, discover_pages, iter_pages, page_number, page_url
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "BURGERBAE"))
+from scraper_BB import BurgerBaeScraper  # noqa: E402
+
+COLLECTION = "https://shop.example/collections/tops"
+
+
+def listing(*products, links=""):
+    cards = "".join(f'<div class="product-card"><a class="product-card-title" href="/products/{p}">{p}</a></div>'
+                    for p in products)
+    return f"<html><body>{cards}<nav class='pagination'>{links}</nav></body></html>"
+
+
+class Site:
+    """fetch() over a dict of url -> html, recording every url fetched"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+        self.lock = threading.Lock()
+
+    def fetch(self, url):
+        with self.lock:
+            self.fetched.append(url)
+        html = self.pages.get(url)
+        return BeautifulSoup(html, "html.parser") if html is not None else None
+
+
+def crawl(site, first_url=COLLECTION, **kwargs):
+    return [(number, url) for number, url, _ in iter_pages(site.fetch, first_url, **kwargs)]
+
+
+def test_page_url_and_number():
+    assert page_url(COLLECTION + "?sort_by=price", 3) == COLLECTION + "?sort_by=price&page=3"
+    assert page_number(COLLECTION + "?page=3&sort_by=price") == 3
+    assert page_number(COLLECTION) == page_number(COLLECTION + "?page=abc") == 1
+
+
+def test_discover_pages_ignores_links_to_other_collections():
+    soup = BeautifulSoup(listing("a", links='<a href="/collections/tops?page=4">4</a>'
+                                            '<a href="/collections/bottoms?page=9">9</a>'
+                                            '<a rel="next" href="/collections/tops?page=2">Next</a>'), "html.parser")
+
+    assert discover_pages(soup, COLLECTION) == (4, COLLECTION + "?page=2")
+
+
+def test_single_page_collection_stops_after_the_first_page():
+    site = Site({COLLECTION: listing("a", "b")})
+
+    assert crawl(site) == [(1, COLLECTION)]
+    assert site.fetched == [COLLECTION]
+
+
+def test_numbered_pages_are_fetched_together_in_page_order():
+    links = "".join(f'<a href="/collections/tops?page={n}">{n}</a>' for n in range(2, 5))
+    site = Site({COLLECTION: listing("a", links=links)})
+    site.pages.update({page_url(COLLECTION, n): listing(f"p{n}") for n in range(2, 5)})
+
+    assert crawl(site) == [(n, page_url(COLLECTION, n) if n > 1 else COLLECTION) for n in range(1, 5)]
+    assert len(site.fetched) == 4
+
+
+def test_next_links_are_followed_one_by_one():
+    # A theme with cursor links and no page numbers
+    site = Site({
+        COLLECTION: listing("a", links='<a class="Pagination__NavItem--next" href="/collections/tops?after=a">Next</a>'),
+        COLLECTION + "?after=a": listing("b", links='<link rel="next" href="/collections/tops?after=b">'),
+        COLLECTION + "?after=b": listing("c"),
+    })
+
+    assert crawl(site) == [(1, COLLECTION), (2, COLLECTION + "?after=a"), (3, COLLECTION + "?after=b")]
+
+
+def test_next_link_cycles_stop():
+    site = Site({
+        COLLECTION: listing("a", links='<a rel="next" href="/collections/tops?after=a">Next</a>'),
+        COLLECTION + "?after=a": listing("b", links='<a rel="next" href="/collections/tops">Next</a>'),
+    })
+
+    assert crawl(site) == [(1, COLLECTION), (2, COLLECTION + "?after=a")]
+
+
+def test_a_missing_page_ends_the_collection():
+    site = Site({COLLECTION: listing("a", links='<a rel="next" href="/collections/tops?page=2">Next</a>')})
+
+    assert crawl(site) == [(1, COLLECTION)]
+    assert site.fetched == [COLLECTION, page_url(COLLECTION, 2)]
+
+
+def test_the_short_last_page_without_a_next_link_ends_the_collection():
+    site = Site({
+        COLLECTION: listing("a", "b", "c", links='<a href="/collections/tops?page=2">2</a>'),
+        page_url(COLLECTION, 2): listing("d", links='<a href="/collections/tops?page=1">1</a>'),
+    })
+
+    assert crawl(site) == [(1, COLLECTION), (2, page_url(COLLECTION, 2))]
+    assert len(site.fetched) == 2
+
+
+def test_skipped_pages_are_only_fetched_for_their_links():
+    links = "".join(f'<a href="/collections/tops?page={n}">{n}</a>' for n in range(2, 4))
+    site = Site({COLLECTION: listing("a", links=links)})
+    site.pages.update({page_url(COLLECTION, n): listing(f"p{n}") for n in range(2, 4)})
+    done = {COLLECTION, page_url(COLLECTION, 2), page_url(COLLECTION, 3)}
+
+    assert crawl(site, skip=done.__contains__) == []
+    # The last page of the batch may link further, so it's still fetched
+    assert site.fetched == [COLLECTION, page_url(COLLECTION, 3)]
+
+
+def test_endless_next_links_stop_at_max_pages():
+    class Endless(Site):
+        def fetch(self, url):
+            super().fetch(url)
+            return BeautifulSoup(listing("x", links=f'<a rel="next" href="?after={len(self.fetched)}">Next</a>'),
+                                 "html.parser")
+
+    site = Endless({})
+
+    assert len(crawl(site)) == MAX_PAGES
+
+
+def test_burgerbae_stops_on_an_empty_page():
+    first = page_url(COLLECTION, 1)
+    site = Site({
+        first: listing("a", "b", links='<a rel="next" href="/collections/tops?page=2">Next</a>'),
+        # Past the last product the theme still renders a next link
+        page_url(COLLECTION, 2): listing(links='<a rel="next" href="/collections/tops?page=3">Next</a>'),
+        page_url(COLLECTION, 3): listing("c"),
+    })
+    scraper = BurgerBaeScraper(cache_path=None, frontier_path=None)
+    scraper.get_page_content = lambda url, parse_only=None: site.fetch(url)
+
+    pages = [(number, len(cards)) for number, _, cards in scraper.iter_collection_pages([COLLECTION])]
+
+    assert pages == [(1, 2)]
+    assert page_url(COLLECTION, 3) not in site.fetched
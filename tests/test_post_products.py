@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+from werkzeug.wrappers import Response
+
+from post_products import BulkPoster
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def scraped():
+    """The first products of the stored Lea dump, as the scraper emits them"""
+    with open(os.path.join(ROOT, "LEA", "lea_products.json"), encoding="utf-8") as f:
+        return json.load(f)[:12]
+
+
+def stored_products(api):
+    from products.models import Product
+    with api.app_context():
+        return {str(product.id): product.toDict() for product in Product.query.all()}
+
+
+class Throttling:
+    """WSGI middleware answering the first `throttled` POSTs with 429, and the `failing` ones with 500"""
+
+    def __init__(self, app, throttled=0, failing=0):
+        self.app = app
+        self.throttled = throttled
+        self.failing = failing
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self.lock:
+            if environ["REQUEST_METHOD"] == "POST" and self.throttled:
+                self.throttled -= 1
+                return Response("slow down", status=429, headers={"Retry-After": "0"})(environ, start_response)
+            if environ["REQUEST_METHOD"] == "POST" and self.failing:
+                self.failing -= 1
+                return Response("oops", status=500)(environ, start_response)
+        return self.app(environ, start_response)
+
+
+@pytest.fixture
+def serve(api):
+    servers = []
+
+    def start(app):
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_bulk_poster_upserts_through_throttling(api, serve, scraped, tmp_path):
+    url = serve(Throttling(api, throttled=3, failing=2)) + "/products?mode=upsert"
+    poster = BulkPoster(url, workers=4, requests_per_second=200.0, backoff_factor=0.01,
+                        retry_queue_path=str(tmp_path / "retry.ndjson"))
+
+    poster.post_all(scraped)
+    # Posted again once stored: concurrent upserts of one product would race each other
+    report = poster.post_all(scraped[:4])
+
+    assert report["posted"] == len(scraped) + 4
+    assert report["failed"] == 0
+    assert report["throttled"] == 5
+    assert report["retries"] == 5
+    assert report["final_rate"] < 200.0
+    assert len(stored_products(api)) == len(scraped)
+    assert not os.path.getsize(tmp_path / "retry.ndjson")
+
+
+def test_bulk_poster_queues_failures_and_retries_them(api, serve, scraped, tmp_path):
+    queue = tmp_path / "retry.ndjson"
+    url = serve(Throttling(api, failing=100)) + "/products?mode=upsert"
+    poster = BulkPoster(url, workers=2, requests_per_second=200.0, max_attempts=2, backoff_factor=0.01,
+                        retry_queue_path=str(queue))
+
+    report = poster.post_all(scraped[:3])
+    assert (report["posted"], report["failed"]) == (0, 3)
+    assert sum(1 for _ in open(queue)) == 3
+
+    url = serve(api) + "/products?mode=upsert"
+    report = BulkPoster(url, retry_queue_path=str(queue)).retry_failed()
+    assert (report["posted"], report["failed"]) == (3, 0)
+    assert not queue.exists() or not os.path.getsize(queue)
+    assert len(stored_products(api)) == 3
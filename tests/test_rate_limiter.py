@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from http_session import build_session
+from rate_limiter import HostRateLimiter, TokenBucket, parse_retry_after
+
+
+def test_limiter_honours_retry_after_from_server(stub_server):
+    stub_server.scripts["/throttled"] = [(429, {"Retry-After": "2"})]
+    session = build_session(max_retries=0)
+    limiter = HostRateLimiter(requests_per_second=10.0, burst=5, decrease_cooldown=0.0)
+    url = stub_server.url + "/throttled"
+
+    limiter.acquire(url)
+    response = session.get(url)
+    limiter.record_response(url, response.status_code, response.headers.get("Retry-After"))
+
+    assert limiter.current_rate(url) == 5.0
+    assert 1.9 <= limiter.reserve(url) <= 2.3
+
+
+def test_limiter_reaction_to_statuses():
+    limiter = HostRateLimiter(requests_per_second=4.0, burst=1, decrease_cooldown=0.0, increase_step=1.0)
+    url = "http://shop.example/products"
+
+    limiter.record_response(url, 503)
+    # 503 without Retry-After is left to the transport retries
+    assert limiter.current_rate(url) == 4.0
+    limiter.record_response(url, 503, "0.5")
+    assert limiter.current_rate(url) == 2.0
+    limiter.record_response(url, 200)
+    assert limiter.current_rate(url) == 3.0
+    limiter.record_response(url, 404)
+    assert limiter.current_rate(url) == 3.0
+    # Buckets are per host
+    assert limiter.current_rate("http://other.example/") == 4.0
+
+
+def test_throttle_cooldown_cuts_rate_once_per_burst_of_429s():
+    bucket = TokenBucket(rate=8.0, burst=4, min_rate=1.0, max_rate=16.0, decrease_cooldown=60.0)
+    for _ in range(5):
+        bucket.on_throttle()
+    assert bucket.rate == 4.0
+    assert bucket.tokens <= 0
+
+
+def test_rate_never_drops_below_min_rate():
+    bucket = TokenBucket(rate=1.0, burst=1, min_rate=0.5, max_rate=4.0, decrease_cooldown=0.0)
+    for _ in range(5):
+        bucket.on_throttle()
+    assert bucket.rate == 0.5
+
+
+def test_waiters_are_released_one_at_a_time_after_retry_after():
+    bucket = TokenBucket(rate=10.0, burst=10, min_rate=1.0, max_rate=40.0, decrease_cooldown=0.0)
+    bucket.on_throttle(retry_after=1.0)
+    started = time.monotonic()
+
+    delays = [bucket.reserve() - (time.monotonic() - started) for _ in range(5)]
+
+    # Nobody goes before the block ends, then one request per refill interval at the halved rate
+    assert delays[0] >= 1.0
+    gaps = [later - earlier for earlier, later in zip(delays, delays[1:])]
+    assert all(gap == pytest.approx(1 / bucket.rate, abs=0.02) for gap in gaps)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+from retag_catalog import BURGERBAE_VENDOR_ID, LEA_VENDOR_ID, retag_catalog
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    """A few products of each stored dump, with the vendor ids the API stores them with"""
+    products = []
+    for path, vendor_id in [(("BURGERBAE", "burgerbae_products.json"), BURGERBAE_VENDOR_ID),
+                            (("LEA", "lea_products.json"), LEA_VENDOR_ID)]:
+        with open(os.path.join(ROOT, *path), encoding="utf-8") as f:
+            products += [{**product, "vendor_id": vendor_id} for product in json.load(f)[:5]]
+    return products
+
+
+def write(path, products):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(products, f)
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_second_run_retags_only_changed_products(catalog, tmp_path):
+    state, first, second = tmp_path / "state.json", tmp_path / "first.json", tmp_path / "second.json"
+    write(tmp_path / "catalog.json", catalog)
+
+    stats = retag_catalog(str(tmp_path / "catalog.json"), str(first), str(state), workers=2)
+    assert (stats["total"], stats["processed"], stats["skipped"]) == (10, 10, 0)
+
+    products = read(first)
+    # New text for two products, and a stale tag on one whose text didn't change
+    products[1]["description"] = "A pleated skirt paired with a cropped sweatshirt"
+    products[2]["meta"]["tags"] = ["Stale"]
+    products[7]["label"] = "Black and White " + products[7]["label"]
+    write(tmp_path / "edited.json", products)
+
+    stats = retag_catalog(str(tmp_path / "edited.json"), str(second), str(state), workers=2)
+
+    assert (stats["total"], stats["processed"], stats["skipped"]) == (10, 2, 8)
+    retagged = read(second)
+    assert [product["label"] for product in retagged] == [product["label"] for product in products]
+    assert retagged[1]["meta"]["tags"][-2:] == ["Skirt", "Sweatshirts"]
+    assert retagged[7]["meta"]["colors"][:2] == ["Black", "White"]
+    # Unchanged products are copied through as they are, without being retagged
+    assert retagged[2]["meta"]["tags"] == ["Stale"]
+    assert [p for i, p in enumerate(retagged) if i not in (1, 7)] == [p for i, p in enumerate(products)
+                                                                      if i not in (1, 7)]
+
+    stats = retag_catalog(str(second), str(tmp_path / "third.ndjson"), str(state), workers=2)
+    assert (stats["processed"], stats["skipped"]) == (0, 10)
+
+
+def test_without_state_every_product_is_retagged(catalog, tmp_path):
+    write(tmp_path / "catalog.json", catalog)
+
+    for _ in range(2):
+        stats = retag_catalog(str(tmp_path / "catalog.json"), str(tmp_path / "out.json"), workers=2)
+        assert (stats["processed"], stats["skipped"]) == (10, 0)
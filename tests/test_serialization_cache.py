@@ -0,0 +1,122 @@
+import datetime
+import decimal
+import json
+import os
+import uuid
+
+import pytest
+from flask import jsonify
+
+import serialization_cache
+from serialization_cache import SerializationCache, encode_json, public_fields
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def stored_dumps():
+    products = []
+    for path in (("LEA", "lea_products.json"), ("BURGERBAE", "burgerbae_products.json")):
+        with open(os.path.join(ROOT, *path), encoding="utf-8") as f:
+            products.extend(json.load(f))
+    return products
+
+
+def with_datetimes(product, index):
+    return {
+        **product,
+        "id": uuid.UUID(int=index),
+        "created_at": datetime.datetime(2024, 10, 8, 15, 31, 43) + datetime.timedelta(hours=index),
+        "updated_at": datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+        "published_on": datetime.date(2024, 2, 29),
+        "price_exact": decimal.Decimal("1619.50"),
+    }
+
+
+TRICKY = {
+    "label": "Ombré “quoted” — tab\there, nul\x00, del\x7f, bell\x07 👗",
+    "nested": {"b": [1, 2.5, -0.0, 1e-7, 1e16, 10 ** 20, None, True], "a": "\\ / \"", "é": "non-ascii key"},
+    "sku": "BB2e5",
+    "sizes": {1: "S", 2: "M"},
+    "when": datetime.datetime(1999, 12, 31, 23, 59, 59),
+}
+
+
+@pytest.mark.parametrize("encode", [encode_json, serialization_cache._encode_stdlib], ids=["default", "stdlib"])
+def test_encoding_is_byte_identical_to_jsonify(api, encode):
+    values = [with_datetimes(product, index) for index, product in enumerate(stored_dumps())] + [TRICKY]
+    with api.app_context():
+        for value in values:
+            assert encode(value) + b"\n" == jsonify(value).get_data()
+
+
+def test_only_floats_with_an_exponent_use_the_stdlib(monkeypatch):
+    pytest.importorskip("orjson")
+    fallbacks = []
+    monkeypatch.setattr(serialization_cache, "_encode_stdlib",
+                        lambda obj: fallbacks.append(obj) or json.dumps(obj, sort_keys=True).encode())
+
+    # Text that reads like an exponent: vendor ids, SKUs, prices as strings
+    encode_json({"vendor_id": "7c9e130b-4e1d-4f5c-9b3a-0d2e5f6a7b8c", "sku": "BB2e5", "price": {"default": 1e3}})
+    assert fallbacks == []
+
+    for value in [{"meta": {"ratio": 1e-7}}, [{"price": 1e22}], {"sizes": (0.5, 2.5e-5)}]:
+        encode_json(value)
+    assert len(fallbacks) == 3
+
+
+def test_unencodable_values_still_fail(api):
+    with pytest.raises(TypeError):
+        encode_json({"when": datetime.time(12, 0)})
+
+
+def test_api_bodies_match_the_old_jsonify_responses(api, client):
+    from products.models import Product
+    ids = client.post("/products/bulk", json=stored_dumps()[:40]).json["ids"]
+
+    with api.test_request_context():
+        products = [public_fields(product.toDict()) for product in Product.query.all()]
+        old_list = jsonify(products).get_data()
+        old_product = jsonify(next(product for product in products if product["id"] == ids[0])).get_data()
+
+    assert isinstance(products[0]["created_at"], datetime.datetime)
+    assert client.get("/products").get_data() == old_list
+    assert client.get(f"/products/{ids[0]}").get_data() == old_product
+
+
+def test_cache_reuses_fragments_until_the_version_changes():
+    class Product:
+        def __init__(self, product_id, content_hash, label):
+            self.id = product_id
+            self.meta = {"contentHash": content_hash}
+            self.label = label
+
+        def toDict(self):
+            return {"id": self.id, "label": self.label, "meta": self.meta}
+
+    cache = SerializationCache()
+    first = cache.encode(Product(1, "a", "One"))
+    assert cache.encode(Product(1, "a", "Changed elsewhere")) == first
+    assert json.loads(cache.encode(Product(1, "b", "Changed"))) == {"id": 1, "label": "Changed", "meta": {}}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+    cache.invalidate([1])
+    assert cache.stats()["entries"] == 0
+    assert cache.encode_list([Product(1, "b", "x"), Product(2, "c", "y")]) == \
+        b'[{"id":1,"label":"x","meta":{}},{"id":2,"label":"y","meta":{}}]'
+
+
+def test_cache_stays_within_its_byte_bound():
+    class Product:
+        def __init__(self, product_id):
+            self.id = product_id
+            self.meta = {"contentHash": "h"}
+
+        def toDict(self):
+            return {"id": self.id, "pad": "x" * 1000}
+
+    cache = SerializationCache(max_bytes=3000)
+    for product_id in range(10):
+        cache.encode(Product(product_id))
+
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= 3000
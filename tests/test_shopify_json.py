@@ -0,0 +1,171 @@
+import json
+import os
+
+import pytest
+import requests
+
+import shopify_json
+from shopify_json import (
+    collection_handle, fetch_product_js, html_to_text, iter_collection_products, product_fields, product_url,
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "shopify")
+BASE_URL = "https://www.leaclothingco.com"
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def recorded_response(url, body, status=200, content_type="application/json; charset=utf-8"):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers["Content-Type"] = content_type
+    response._content = body
+    return response
+
+
+class Replay:
+    """get_response stand-in serving recorded bodies by URL and remembering what was asked for"""
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.requested = []
+
+    def __call__(self, url, **kwargs):
+        self.requested.append(url)
+        if url not in self.bodies:
+            return None
+        body, content_type = self.bodies[url]
+        return recorded_response(url, body, content_type=content_type)
+
+
+def page_url(page):
+    return f"{BASE_URL}/collections/tops/products.json?limit={shopify_json.PAGE_LIMIT}&page={page}"
+
+
+def test_iter_collection_products_pages_until_a_short_page(monkeypatch):
+    monkeypatch.setattr(shopify_json, "PAGE_LIMIT", 2)
+    replay = Replay({
+        page_url(1): (load_fixture("tops_products_page1.json"), "application/json"),
+        page_url(2): (load_fixture("tops_products_page2.json"), "application/json"),
+    })
+
+    handles = [product["handle"] for product in iter_collection_products(replay, BASE_URL, "tops")]
+
+    assert handles == ["carla-black-silk-corset-top", "malea-wine-off-shoulder-top", "racing-vintage-dual-baby-tees"]
+    assert replay.requested == [page_url(1), page_url(2)]
+
+
+def test_iter_collection_products_stops_at_a_full_page_followed_by_nothing(monkeypatch):
+    monkeypatch.setattr(shopify_json, "PAGE_LIMIT", 2)
+    replay = Replay({page_url(1): (load_fixture("tops_products_page1.json"), "application/json")})
+
+    assert len(list(iter_collection_products(replay, BASE_URL, "tops"))) == 2
+    assert replay.requested == [page_url(1), page_url(2)]
+
+
+def test_iter_collection_products_stops_on_html_error_page(monkeypatch, caplog):
+    monkeypatch.setattr(shopify_json, "PAGE_LIMIT", 2)
+    replay = Replay({
+        page_url(1): (load_fixture("tops_products_page1.json"), "application/json"),
+        page_url(2): (load_fixture("rate_limited.html"), "text/html; charset=utf-8"),
+    })
+
+    assert len(list(iter_collection_products(replay, BASE_URL, "tops"))) == 2
+    assert "Expected JSON" in caplog.text
+
+
+def test_fetch_product_js_guards_non_json_bodies():
+    url = f"{BASE_URL}/products/carla-black-silk-corset-top.js"
+    assert fetch_product_js(Replay({url: (load_fixture("rate_limited.html"), "text/html")}),
+                            BASE_URL, "carla-black-silk-corset-top") is None
+    assert fetch_product_js(Replay({url: (b'["not", "a", "product"]', "application/json")}),
+                            BASE_URL, "carla-black-silk-corset-top") is None
+    assert fetch_product_js(Replay({}), BASE_URL, "carla-black-silk-corset-top") is None
+
+
+def test_product_fields_from_products_json():
+    carla, malea = json.loads(load_fixture("tops_products_page1.json"))["products"]
+
+    fields = product_fields(carla)
+    # Prices of the first available variant, as decimal strings in rupees
+    assert fields["price"] == 3290.0
+    assert fields["original_price"] == 4290.0
+    assert fields["label"] == "Carla Black Silk Corset Top CL"
+    assert fields["sizes"] == ["XS", "S", "M"]
+    assert fields["colors"] == []
+    assert fields["tags"] == ["Black", "Corset", "Silk", "Tops"]
+    # The _800x rendition is the same picture as the first image
+    assert fields["images"] == [
+        "https://cdn.shopify.com/s/files/1/0555/4321/products/Carla_Black_Silk_Corset_Top1.jpg",
+        "https://cdn.shopify.com/s/files/1/0555/4321/products/Carla_Black_Silk_Corset_Top2.jpg",
+    ]
+
+    fields = product_fields(malea)
+    assert fields["label"] == "Malea Wine Off-Shoulder Top CL"
+    # A compare-at price that isn't above the price isn't shown
+    assert fields["original_price"] is None
+    assert fields["colors"] == ["Wine"]
+    assert fields["sizes"] == ["S", "M"]
+    assert fields["images"] == ["https://www.leaclothingco.com/cdn/shop/files/Malea_Wine_Off_Shoulder_Top.jpg"]
+
+
+def test_product_fields_sizes_from_single_option_variants():
+    tee, = json.loads(load_fixture("tops_products_page2.json"))["products"]
+
+    fields = product_fields(tee)
+    assert fields["sizes"] == ["S", "M"]
+    assert fields["tags"] == ["baby tee", "vintage"]
+    assert fields["images"] == []
+    assert (fields["price"], fields["original_price"]) == (1499.0, 1999.0)
+
+
+def test_product_fields_from_product_js_prices_in_paise():
+    fields = product_fields(json.loads(load_fixture("carla-black-silk-corset-top.js")))
+
+    # Integer prices mean minor units; the sold-out XS variant is skipped
+    assert fields["price"] == 3290.0
+    assert fields["original_price"] == 4290.0
+    assert fields["body_html"].startswith("<p>You asked")
+    assert fields["sizes"] == ["XS", "S"]
+    assert fields["images"] == [
+        "https://www.leaclothingco.com/cdn/shop/products/Carla_Black_Silk_Corset_Top1.jpg",
+        "https://www.leaclothingco.com/cdn/shop/products/Carla_Black_Silk_Corset_Top2.jpg",
+    ]
+
+
+def test_product_fields_with_every_variant_sold_out_uses_the_first():
+    product = json.loads(load_fixture("carla-black-silk-corset-top.js"))
+    for variant in product["variants"]:
+        variant["available"] = False
+
+    assert product_fields(product)["price"] == 3490.0
+
+
+def test_product_fields_without_variants():
+    fields = product_fields({"title": "", "handle": "empty", "tags": "a, b,,c"})
+
+    assert fields["label"] is None
+    assert fields["price"] is None and fields["original_price"] is None
+    assert fields["tags"] == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("html, separator, text", [
+    (None, "", ""),
+    ("", "\n", ""),
+    ("<p>One</p><p>Two</p>", "", "OneTwo"),
+    ("<p>One</p><p>Two</p>", "\n", "One\nTwo"),
+    ("<ul><li> Lined </li><li>Zip &amp; hook</li></ul>", " ", "Lined Zip & hook"),
+    ("plain text", "", "plain text"),
+])
+def test_html_to_text(html, separator, text):
+    assert html_to_text(html, separator) == text
+
+
+def test_collection_handle_and_product_url():
+    assert collection_handle("https://www.leaclothingco.com/collections/tops?page=2") == "tops"
+    assert collection_handle("https://www.leaclothingco.com/collections/tops/") == "tops"
+    assert product_url(BASE_URL, "tops", "carla") == f"{BASE_URL}/collections/tops/products/carla"
@@ -0,0 +1,135 @@
+import uuid
+
+import pytest
+import sqlalchemy
+
+LEA_VENDOR_ID = "7c9e130b-8920-4914-853e-64ee867bb3b4"
+
+
+@pytest.fixture
+def user(api):
+    from app import db
+    from closets.models import Closet, User
+    with api.app_context():
+        closet = Closet()
+        db.session.add(closet)
+        db.session.flush()
+        user = User(currentClosetId=closet.id, meta={"PREFERRED_BRANDS": [LEA_VENDOR_ID]})
+        db.session.add(user)
+        db.session.commit()
+        return {"headers": {"X-User": str(user.id)}, "closet_id": closet.id}
+
+
+def closet_dict(api, closet_id):
+    from app import db
+    from closets.models import Closet
+    from swipes.models import closet_to_dict
+    with api.app_context():
+        return closet_to_dict(db.session.get(Closet, closet_id))
+
+
+def legacy_arrays(api, closet_id):
+    from app import db
+    from closets.models import Closet
+    with api.app_context():
+        closet = db.session.get(Closet, closet_id)
+        return closet.positiveIds, closet.negativeIds
+
+
+def swipe_rows(api, closet_id):
+    from swipes.models import ClosetSwipe
+    with api.app_context():
+        return [(str(row.product_id), row.response)
+                for row in ClosetSwipe.query.filter_by(closet_id=closet_id).order_by(ClosetSwipe.id)]
+
+
+def test_swipe_is_appended_and_the_closet_ids_derived_from_it(api, client, user):
+    liked, disliked = str(uuid.uuid4()), str(uuid.uuid4())
+
+    client.post("/closet/swipe", json={"productId": liked, "response": 1}, headers=user["headers"])
+    client.post("/closet/swipe", json={"productId": disliked, "response": -1}, headers=user["headers"])
+
+    assert swipe_rows(api, user["closet_id"]) == [(liked, 1), (disliked, -1)]
+    closet = closet_dict(api, user["closet_id"])
+    assert closet["id"] == str(user["closet_id"])
+    assert closet["positiveIds"] == [uuid.UUID(liked)]
+    assert closet["negativeIds"] == [uuid.UUID(disliked)]
+    # The legacy arrays are no longer written
+    assert legacy_arrays(api, user["closet_id"]) == (None, None)
+
+
+def test_batch_swipes(api, client, user):
+    products = [str(uuid.uuid4()) for _ in range(3)]
+    swipes = [{"productId": product_id, "response": 1} for product_id in products]
+    swipes.append({"productId": products[0], "response": -1})
+
+    response = client.post("/closets/swipes", json={"swipes": swipes}, headers=user["headers"])
+
+    assert response.json["recorded"] == 4
+    assert len(swipe_rows(api, user["closet_id"])) == 4
+    # Each product is listed under its latest response only
+    closet = closet_dict(api, user["closet_id"])
+    assert closet["positiveIds"] == [uuid.UUID(product_id) for product_id in products[1:]]
+    assert closet["negativeIds"] == [uuid.UUID(products[0])]
+    view = client.get("/closets/swipes", headers=user["headers"]).json
+    assert view == {"positiveIds": products[1:], "negativeIds": products[:1]}
+
+
+def test_invalid_batch_writes_nothing(api, client, user):
+    response = client.post("/closets/swipes", json=[{"productId": str(uuid.uuid4()), "response": 1},
+                                                    {"productId": str(uuid.uuid4()), "response": 0}],
+                           headers=user["headers"])
+
+    assert response.status_code == 400
+    assert swipe_rows(api, user["closet_id"]) == []
+    assert closet_dict(api, user["closet_id"])["positiveIds"] == []
+
+
+def test_legacy_arrays_are_imported_once(api, client, user):
+    from app import db
+    from closets.models import Closet
+    from swipes.models import import_legacy_swipes
+    kept, liked, disliked, both = (uuid.uuid4() for _ in range(4))
+    client.post("/closet/swipe", json={"productId": str(kept), "response": -1}, headers=user["headers"])
+    with api.app_context():
+        closet = db.session.get(Closet, user["closet_id"])
+        closet.positiveIds = [kept, liked, both]
+        closet.negativeIds = [disliked, both]
+        db.session.commit()
+
+        assert import_legacy_swipes(batch_size=1) == 4
+        assert import_legacy_swipes() == 0
+
+    closet = closet_dict(api, user["closet_id"])
+    # Swipes already in the table win over the arrays
+    assert closet["positiveIds"] == [liked]
+    assert closet["negativeIds"] == [kept, both, disliked]
+
+
+def test_swipe_endpoints_need_a_user(client):
+    assert client.post("/closet/swipe", json={"productId": str(uuid.uuid4()), "response": 1}).status_code == 401
+    assert client.get("/closets/swipes").status_code == 401
+
+
+def test_create_tables_is_idempotent(api):
+    from app import db
+    from create_tables import create_tables
+    with api.app_context():
+        db.session.execute(sqlalchemy.text("DROP TABLE closet_swipes"))
+        db.session.commit()
+
+        create_tables()
+        create_tables()
+
+        inspector = sqlalchemy.inspect(db.engine)
+        assert "closet_swipes" in inspector.get_table_names()
+        assert sorted(index["name"] for index in inspector.get_indexes("closet_swipes")) == [
+            "ix_closet_swipes_closet_id_id", "ix_closet_swipes_closet_id_ts",
+        ]
+
+        # A table created before its newer indexes gets them too
+        db.session.execute(sqlalchemy.text("DROP INDEX ix_closet_swipes_closet_id_ts"))
+        db.session.commit()
+        create_tables()
+        indexes = sqlalchemy.inspect(db.engine).get_indexes("closet_swipes")
+        assert "ix_closet_swipes_closet_id_ts" in [index["name"] for index in indexes]
@@ -0,0 +1,135 @@
+import collections
+import json
+import os
+
+import pytest
+
+from retag_catalog import BURGERBAE_VENDOR_ID, LEA_VENDOR_ID, burgerbae_category, retag_product
+from taxonomy import get_taxonomy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The scrapers' substring matching before the taxonomy, kept here as the baseline
+BASELINE_AVAILABLE_TAGS = [
+    "Hoodie", "Co-ords", "T-Shirts", "Baby Tees", "Cute Tops", "Tanks", "Tops", "Shades", "Bottoms", "Dresses",
+    "Accessories", "Sweatshirts", "Camisole", "Crop Tops", "dress", "Hat", "Skirt", "Sweater", "Y2K top",
+]
+BASELINE_TAG_MAPPINGS = {
+    "hoodie": "Hoodies", "hoody": "Hoodies", "co ord": "Co-ords", "co-ord": "Co-ords", "co ords": "Co-ords",
+    "co-ords": "Co-ords", "tshirt": "T-Shirts", "t shirt": "T-Shirts", "t-shirts": "T-Shirts",
+    "baby tee": "Baby Tees", "crop top": "Cute Tops", "cute top": "Cute Tops", "tank top": "Tanks",
+    "tanktop": "Tanks", "top": "Tops", "sunglasses": "Shades", "shade": "Shades", "pant": "Bottoms",
+    "pants": "Bottoms", "jeans": "Bottoms", "dress": "Dresses", "jewelry": "Accessories",
+    "jewellery": "Accessories", "accessory": "Accessories", "sweatshirt": "Sweatshirts",
+    "sweat shirt": "Sweatshirts",
+}
+BASELINE_COLORS = ["Black", "White", "Red", "Blue", "Green", "Yellow", "Pink", "Purple", "Orange", "Brown", "Grey",
+                   "Beige"]
+
+# label -> (baseline tags no longer given, tags the baseline missed), over the stored dumps.
+# Losses are substring false positives: "that"/"what" for Hat, "Dystopia"/"Stop"/"chart-topping"
+# for Tops, "dressing"/"dressed" for dress, "Panther" for Bottoms, "Sweatshirt" for T-Shirts,
+# "stRED"/"embroideRED" for Red and "Blues" (plurals are off for colors). The one loss each of
+# Skirt, Sweatshirts, Shades and Crop/Cute Tops is a word the dumps' get_text(strip=True) glued
+# to the next ("skirtpaired", "pinkshade"), which the scrapers no longer do. Category fallbacks
+# follow whether any tag was found.
+BURGERBAE_CHANGES = {
+    "Hat": (169, 0),
+    "Tops": (9, 0),
+    "dress": (5, 0),
+    "Dresses": (5, 0),
+    "Bottoms": (4, 1),
+    "T-Shirts": (5, 95),
+    "Crop Tops": (0, 14),
+    "Cute Tops": (1, 0),
+    "Skirt": (1, 0),
+    "Sweatshirts": (1, 0),
+    "Shades": (1, 0),
+    "Tanks": (0, 1),
+    "for-womens": (40, 2),
+}
+LEA_CHANGES = {
+    "Red": (147, 0),
+    "Blue": (1, 0),
+}
+
+
+def load_dump(*path):
+    with open(os.path.join(ROOT, *path), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def baseline_tags(name, description, category):
+    texts = [name.lower(), (description or "").lower(), (category or "").lower()]
+    tags = []
+    for text in texts:
+        for tag in BASELINE_AVAILABLE_TAGS:
+            if tag.lower() in text and tag not in tags:
+                tags.append(tag)
+    for key, tag in BASELINE_TAG_MAPPINGS.items():
+        if any(key in text for text in texts) and tag not in tags:
+            tags.append(tag)
+    if not tags and category:
+        tags.append(category)
+    return tags
+
+
+def baseline_colors(name, description):
+    text = (name + " " + description).lower()
+    return [color for color in BASELINE_COLORS if color.lower() in text]
+
+
+def tag_changes(pairs):
+    lost, gained = collections.Counter(), collections.Counter()
+    for before, after in pairs:
+        lost.update(set(before) - set(after))
+        gained.update(set(after) - set(before))
+    return {label: (lost[label], gained[label]) for label in lost | gained}
+
+
+def test_burgerbae_tags_only_drop_substring_false_positives():
+    pairs = []
+    for product in load_dump("BURGERBAE", "burgerbae_products.json"):
+        product = {**product, "vendor_id": BURGERBAE_VENDOR_ID}
+        category = burgerbae_category(product["meta"].get("productUrl"))
+        before = baseline_tags(product["label"] or "", product.get("description"), category)
+        pairs.append((before, retag_product(product)["meta"]["tags"]))
+
+    assert tag_changes(pairs) == BURGERBAE_CHANGES
+
+
+def test_lea_colors_only_drop_substring_false_positives():
+    pairs = []
+    for product in load_dump("LEA", "lea_products.json"):
+        product = {**product, "vendor_id": LEA_VENDOR_ID}
+        before = baseline_colors(product["label"] or "", product.get("description") or "")
+        pairs.append((before, retag_product(product)["meta"]["colors"]))
+
+    assert tag_changes(pairs) == LEA_CHANGES
+
+
+@pytest.mark.parametrize("text, tags", [
+    ("a classic pleated skirt paired with a sleek top", ["Skirt", "Tops"]),
+    ("bottle green sweatpants, creating a cozy set", ["Bottoms"]),
+    # Words that merely contain a term don't
+    ("Let That Shit Go", []),
+    ("Travis Scott : Dystopia", []),
+    ("Whether you're dressing it up", []),
+    ("Pink Panther & The Inspector", []),
+    # Lowercase to uppercase is a break, plurals match
+    ("Baby teeNet Quantity: 1", ["Baby Tees"]),
+    ("Two hoodies and jeans", ["Hoodie", "Hoodies", "Bottoms"]),
+])
+def test_burgerbae_terms(text, tags):
+    assert get_taxonomy("burgerbae_tags").classify(text) == tags
+
+
+def test_labels_come_back_in_first_occurrence_order():
+    taxonomy = get_taxonomy("burgerbae_tags")
+
+    assert taxonomy.classify("Co ord Set", "a crop top and a skirt", "hoodies") == [
+        "Co-ords", "Crop Tops", "Cute Tops", "Tops", "Skirt", "Hoodie", "Hoodies",
+    ]
+    assert taxonomy.classify("Skirt", "with a hoodie") == ["Skirt", "Hoodie", "Hoodies"]
+    assert get_taxonomy("lea_colors").classify("Black Dress", "in white and pink") == ["Black", "White", "Pink"]
+